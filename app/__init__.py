@@ -14,9 +14,19 @@ login_manager = LoginManager()
 
 
 def cdn_image(url, width=None):
-    """通过 CDN 代理加速图片加载"""
+    """
+    图片地址: 本地已生成缩略图时使用本地 WebP，
+    其他本地图片加内容指纹，尚未下载的官网图片通过 CDN 代理加速
+    """
     if not url:
         return url
+    from app.services.image_variants import local_variant
+    variant = local_variant(url, width)
+    if variant:
+        return variant
+    if url.startswith('/'):
+        from app.services.static_assets import static_url
+        return static_url(url)
     # 使用 wsrv.nl 免费图片 CDN
     # 文档: https://wsrv.nl/docs/
     cdn_url = f"https://wsrv.nl/?url={quote(url, safe='')}"
@@ -27,6 +37,12 @@ def cdn_image(url, width=None):
     return cdn_url
 
 
+def thumb_size(item, width=200):
+    """列表项首图的显示尺寸 (宽, 高)，用于 <img> 的 width/height 属性"""
+    from app.services.image_variants import thumbnail_size
+    return thumbnail_size(getattr(item, 'image_width', None), getattr(item, 'image_height', None), width)
+
+
 def create_app(config_name=None):
     """应用工厂函数"""
     app = Flask(__name__)
@@ -44,8 +60,17 @@ def create_app(config_name=None):
     login_manager.login_view = 'auth.login'
     login_manager.login_message = '请先登录'
     
+    # 缓存后端
+    from app.services.cache import init_cache
+    init_cache(app)
+    
+    # 静态文件: 内容指纹 + 长期缓存
+    from app.services.static_assets import init_static
+    init_static(app)
+    
     # 注册 Jinja2 过滤器
     app.jinja_env.filters['cdn_image'] = cdn_image
+    app.jinja_env.filters['thumb_size'] = thumb_size
     
     # 注册蓝图
     from app.routes import main, cards, auth, user, api, prices
@@ -60,6 +85,9 @@ def create_app(config_name=None):
     # 创建数据库表
     with app.app_context():
         db.create_all()
+        # 全文检索索引 (FTS5 虚拟表 / tsvector 表不在 ORM 元数据中)
+        from app.services.search import ensure_search_index
+        ensure_search_index()
         # DON 卡数据现在从官方 PDF 导入，使用 scripts/import_don_from_pdf.py
     
     return app
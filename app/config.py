@@ -16,6 +16,14 @@ class BaseConfig:
     
     # 图片存储路径
     CARD_IMAGES_PATH = os.path.join(basedir, 'static', 'images', 'cards')
+    
+    # 系列导航/统计缓存 (秒)；设置 REDIS_URL 时多个 worker 共享缓存
+    CACHE_TTL = int(os.environ.get('CACHE_TTL', 300))
+    CACHE_MAX_ENTRIES = 256
+    CACHE_REDIS_URL = os.environ.get('REDIS_URL')
+    
+    # 未带内容指纹的静态文件缓存时间 (秒)；带指纹的固定一年 + immutable
+    STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 3600))
 
 
 class DevelopmentConfig(BaseConfig):
@@ -2,17 +2,23 @@
 数据模型模块
 """
 from app.models.card import Card, CardVersion, CardImage
-from app.models.series import Series
+from app.models.series import Series, SeriesStats
 from app.models.user import User
 from app.models.collection import UserCollection, Wishlist
 from app.models.deck import Deck, DeckCard
-from app.models.price import PriceHistory
+from app.models.price import PriceHistory, PriceLatest, PriceRollup, PriceMover
+from app.models.listing import CardListing
+from app.models.fingerprint import SeriesFingerprint, CardFingerprint
+from app.models.image import ImageBlob, CardImageBlob
 
 __all__ = [
     'Card', 'CardVersion', 'CardImage',
-    'Series',
+    'Series', 'SeriesStats',
     'User',
     'UserCollection', 'Wishlist',
     'Deck', 'DeckCard',
-    'PriceHistory'
+    'PriceHistory', 'PriceLatest', 'PriceRollup', 'PriceMover',
+    'CardListing',
+    'SeriesFingerprint', 'CardFingerprint',
+    'ImageBlob', 'CardImageBlob'
 ]
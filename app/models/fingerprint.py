@@ -0,0 +1,47 @@
+"""
+爬取内容指纹 - 增量爬取时判断系列/卡片是否变化
+"""
+from app import db
+from datetime import datetime
+
+
+class SeriesFingerprint(db.Model):
+    """
+    系列内容指纹
+    content_hash 为该系列所有卡片指纹的汇总哈希，与上次相同时整个系列跳过写库。
+    由 app.services.fingerprint 维护。
+    """
+    __tablename__ = 'series_fingerprints'
+
+    series_id = db.Column(db.Integer, db.ForeignKey('series.id', ondelete='CASCADE'), primary_key=True)
+
+    content_hash = db.Column(db.String(64), nullable=False)
+
+    # 上次爬取到的卡片版本数
+    record_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # 上次检查时间 / 上次内容变化时间
+    checked_at = db.Column(db.DateTime, default=datetime.utcnow)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SeriesFingerprint {self.series_id} {self.content_hash[:8]}>'
+
+
+class CardFingerprint(db.Model):
+    """
+    卡片版本内容指纹
+    每个 (系列, 卡号, 版本后缀) 一行，content_hash 为官网 modalCol 解析结果规范化后的哈希。
+    """
+    __tablename__ = 'card_fingerprints'
+
+    series_id = db.Column(db.Integer, db.ForeignKey('series.id', ondelete='CASCADE'), primary_key=True)
+    card_number = db.Column(db.String(20), primary_key=True)
+    version_suffix = db.Column(db.String(10), primary_key=True, default='')
+
+    content_hash = db.Column(db.String(64), nullable=False)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CardFingerprint {self.series_id} {self.card_number}{self.version_suffix}>'
@@ -0,0 +1,49 @@
+"""
+图片存储清单 - 按内容寻址的图片 blob 及 CardImage 与 blob 的对应
+"""
+from app import db
+from datetime import datetime
+
+
+class ImageBlob(db.Model):
+    """
+    图片 blob
+    按内容 SHA-1 保存在 app/static/images/blobs/ab/abcdef....ext，
+    多个系列再录的相同图片只存一份。
+    """
+    __tablename__ = 'image_blobs'
+
+    sha1 = db.Column(db.String(40), primary_key=True)
+
+    # 扩展名: png / jpg / webp
+    ext = db.Column(db.String(10), nullable=False)
+
+    # 字节数
+    size = db.Column(db.Integer, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ImageBlob {self.sha1[:8]}.{self.ext}>'
+
+
+class CardImageBlob(db.Model):
+    """
+    CardImage -> blob 清单
+    每个 CardImage 一行，记录下载来源 URL 与对应的 blob，
+    由 app.services.image_manifest 维护。
+    """
+    __tablename__ = 'card_image_blobs'
+
+    image_id = db.Column(db.Integer, db.ForeignKey('card_images.id', ondelete='CASCADE'), primary_key=True)
+    sha1 = db.Column(db.String(40), db.ForeignKey('image_blobs.sha1'), nullable=False, index=True)
+
+    # 下载时使用的 URL
+    source_url = db.Column(db.String(500))
+
+    stored_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    blob = db.relationship('ImageBlob')
+
+    def __repr__(self):
+        return f'<CardImageBlob {self.image_id} -> {self.sha1[:8]}>'
@@ -0,0 +1,87 @@
+"""
+卡牌列表读模型 - 浏览/搜索用的反规范化表
+"""
+from app import db
+from datetime import datetime
+
+
+# 颜色位掩码: 多色卡按位或，筛选时按位与
+COLOR_BITS = {
+    '赤': 1,
+    '緑': 2,
+    '青': 4,
+    '紫': 8,
+    '黒': 16,
+    '黄': 32,
+}
+
+
+def color_mask(colors: str) -> int:
+    """将颜色字符串 (赤/緑 或 赤,緑) 转换为位掩码"""
+    mask = 0
+    for color in (colors or '').replace(',', '/').split('/'):
+        mask |= COLOR_BITS.get(color.strip(), 0)
+    return mask
+
+
+class CardListing(db.Model):
+    """
+    卡牌列表读模型
+    每个 CardVersion 一行，预先合并 Card + Series + 首图 + 最新价格，
+    使列表页和搜索只需扫描单表。
+    由写入路径 (爬虫/价格更新/DON 导入) 调用 app.services.card_listing 维护。
+    """
+    __tablename__ = 'card_listings'
+
+    # 与 CardVersion 一一对应
+    version_id = db.Column(db.Integer, db.ForeignKey('card_versions.id', ondelete='CASCADE'), primary_key=True)
+
+    card_id = db.Column(db.Integer, nullable=False, index=True)
+    card_number = db.Column(db.String(20), nullable=False)
+    language = db.Column(db.String(5), nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    card_type = db.Column(db.String(20), nullable=False)
+    rarity = db.Column(db.String(10), nullable=False)
+    colors = db.Column(db.String(50), nullable=False, default='')
+    color_mask = db.Column(db.Integer, nullable=False, default=0)
+
+    # 版本来源系列
+    series_id = db.Column(db.Integer)
+    series_code = db.Column(db.String(20))
+
+    version_type = db.Column(db.String(20))
+    version_suffix = db.Column(db.String(10), default='')
+    illustration_type = db.Column(db.String(20))
+    has_star_mark = db.Column(db.Boolean, default=False)
+    source_description = db.Column(db.String(500))
+
+    # 是否为该卡片的首个版本 (按卡片浏览时每个卡号只显示一次)
+    is_primary = db.Column(db.Boolean, nullable=False, default=False)
+
+    # 首图
+    image_local_path = db.Column(db.String(500))
+    image_original_url = db.Column(db.String(500))
+    # 首图原尺寸（生成缩略图时记录），模板据此输出 <img> width/height
+    image_width = db.Column(db.Integer)
+    image_height = db.Column(db.Integer)
+
+    # 最新价格
+    latest_price = db.Column(db.Float)
+    latest_price_currency = db.Column(db.String(5))
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_listing_series_number', 'series_id', 'language', 'card_number', 'version_suffix'),
+        db.Index('idx_listing_lang_primary_number', 'language', 'is_primary', 'card_number'),
+        db.Index('idx_listing_lang_type', 'language', 'card_type'),
+        db.Index('idx_listing_lang_rarity', 'language', 'rarity'),
+    )
+
+    def __repr__(self):
+        return f'<CardListing {self.card_number}{self.version_suffix} ({self.language})>'
+
+    @property
+    def image_url(self):
+        """优先使用本地图片"""
+        return self.image_local_path or self.image_original_url
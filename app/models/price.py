@@ -57,3 +57,135 @@ class PriceHistory(db.Model):
         elif self.currency == 'USD':
             return f'${self.price:,.2f}'
         return f'{self.price} {self.currency}'
+
+
+class PriceLatest(db.Model):
+    """
+    最新价格快照
+    每个 (版本, 来源, 货币) 一行，保存最新一次价格及上一次价格，
+    读取当前价格时不再对不断增长的 price_history 做 max(recorded_at) 分组。
+    由价格写入路径调用 app.services.price_latest 维护。
+    """
+    __tablename__ = 'price_latest'
+    
+    version_id = db.Column(db.Integer, db.ForeignKey('card_versions.id', ondelete='CASCADE'), primary_key=True)
+    source = db.Column(db.String(30), primary_key=True)
+    currency = db.Column(db.String(5), primary_key=True)
+    
+    # 最新价格
+    price = db.Column(db.Float, nullable=False)
+    recorded_at = db.Column(db.DateTime, nullable=False)
+    
+    # 上一次价格及涨跌幅 (%)
+    previous_price = db.Column(db.Float)
+    previous_recorded_at = db.Column(db.DateTime)
+    change_pct = db.Column(db.Float)
+    
+    # 最新一次的出品数量 (如果来源提供)
+    listing_count = db.Column(db.Integer)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('idx_price_latest_price', 'price'),
+    )
+    
+    def __repr__(self):
+        return f'<PriceLatest {self.version_id} {self.source} {self.price} {self.currency}>'
+    
+    @property
+    def display_price(self):
+        """格式化显示价格"""
+        if self.currency == 'JPY':
+            return f'¥{self.price:,.0f}'
+        elif self.currency == 'USD':
+            return f'${self.price:,.2f}'
+        return f'{self.price} {self.currency}'
+
+
+class PriceRollup(db.Model):
+    """
+    价格聚合 (OHLC)
+    每个 (版本, 来源, 货币, 粒度, 周期起点) 一行，粒度为 day / week / month，
+    长周期走势图读取聚合行而不是全部原始记录。
+    由 app.services.price_rollup 维护。
+    """
+    __tablename__ = 'price_rollups'
+    
+    version_id = db.Column(db.Integer, db.ForeignKey('card_versions.id', ondelete='CASCADE'), primary_key=True)
+    source = db.Column(db.String(30), primary_key=True)
+    currency = db.Column(db.String(5), primary_key=True)
+    resolution = db.Column(db.String(5), primary_key=True)
+    period_start = db.Column(db.DateTime, primary_key=True)
+    
+    open = db.Column(db.Float, nullable=False)
+    high = db.Column(db.Float, nullable=False)
+    low = db.Column(db.Float, nullable=False)
+    close = db.Column(db.Float, nullable=False)
+    avg = db.Column(db.Float, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    # 周期内最后一条原始记录的时间
+    last_recorded_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = (
+        db.Index('idx_rollup_version_resolution_period', 'version_id', 'resolution', 'period_start'),
+    )
+    
+    def __repr__(self):
+        return f'<PriceRollup {self.version_id} {self.resolution} {self.period_start:%Y-%m-%d} {self.close}>'
+
+
+class PriceMover(db.Model):
+    """
+    价格涨跌榜 (预计算)
+    每个 (版本, 来源, 货币, 区间) 一行: 当前价格与 1d / 7d / 30d 前价格的差额和涨跌幅，
+    附带卡片编号 / 名称 / 系列 / 稀有度，涨跌榜按系列、稀有度筛选时只查这一张表。
+    由 app.services.price_movers.refresh_movers() 定期重算。
+    """
+    __tablename__ = 'price_movers'
+    
+    version_id = db.Column(db.Integer, db.ForeignKey('card_versions.id', ondelete='CASCADE'), primary_key=True)
+    source = db.Column(db.String(30), primary_key=True)
+    currency = db.Column(db.String(5), primary_key=True)
+    # 1d / 7d / 30d
+    period = db.Column(db.String(5), primary_key=True)
+    
+    # 卡片信息 (反规范化)
+    card_id = db.Column(db.Integer, nullable=False)
+    card_number = db.Column(db.String(20), nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    rarity = db.Column(db.String(10))
+    series_id = db.Column(db.Integer)
+    version_type = db.Column(db.String(20))
+    
+    # 当前价格 / 区间起点价格
+    price = db.Column(db.Float, nullable=False)
+    base_price = db.Column(db.Float, nullable=False)
+    change_abs = db.Column(db.Float, nullable=False)
+    change_pct = db.Column(db.Float, nullable=False)
+    
+    # 出品数量 (如果来源提供)
+    listing_count = db.Column(db.Integer)
+    
+    recorded_at = db.Column(db.DateTime, nullable=False)
+    base_recorded_at = db.Column(db.DateTime, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('idx_mover_period_change', 'period', 'change_pct'),
+        db.Index('idx_mover_period_series_change', 'period', 'series_id', 'change_pct'),
+        db.Index('idx_mover_period_rarity_change', 'period', 'rarity', 'change_pct'),
+    )
+    
+    def __repr__(self):
+        return f'<PriceMover {self.card_number} {self.period} {self.change_pct:+.1f}%>'
+    
+    @property
+    def display_price(self):
+        """格式化显示价格"""
+        if self.currency == 'JPY':
+            return f'¥{self.price:,.0f}'
+        elif self.currency == 'USD':
+            return f'${self.price:,.2f}'
+        return f'{self.price} {self.currency}'
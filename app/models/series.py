@@ -42,6 +42,10 @@ class Series(db.Model):
     # 关系
     cards = db.relationship('Card', backref='series', lazy='dynamic')
     
+    # 预计算的统计 (SeriesStats)，由爬虫保存后刷新
+    stats = db.relationship('SeriesStats', uselist=False, backref='series',
+                            cascade='all, delete-orphan')
+    
     # 联合唯一约束: code + language
     __table_args__ = (
         db.UniqueConstraint('code', 'language', name='uq_series_code_language'),
@@ -49,3 +53,39 @@ class Series(db.Model):
     
     def __repr__(self):
         return f'<Series {self.code} ({self.language})>'
+
+
+class SeriesStats(db.Model):
+    """
+    系列统计（预计算）
+    版本数 / 卡片类型 / 稀有度 / 插画类型 / 星标计数，
+    由 app.services.series_stats.refresh_series_stats() 维护。
+    """
+    __tablename__ = 'series_stats'
+    
+    series_id = db.Column(db.Integer, db.ForeignKey('series.id', ondelete='CASCADE'), primary_key=True)
+    
+    # 该系列的版本总数（含平行卡/异画卡/再录卡）
+    total_versions = db.Column(db.Integer, nullable=False, default=0)
+    
+    # 首发于该系列的卡片数 (Card.series_id)
+    card_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    # 按卡片类型的版本数
+    leader_count = db.Column(db.Integer, nullable=False, default=0)
+    character_count = db.Column(db.Integer, nullable=False, default=0)
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+    stage_count = db.Column(db.Integer, nullable=False, default=0)
+    don_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    # 星标版本数
+    star_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    # {rarity: 版本数} / {illustration_type: 版本数}
+    rarity_counts = db.Column(db.JSON, nullable=False, default=dict)
+    illustration_counts = db.Column(db.JSON, nullable=False, default=dict)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SeriesStats {self.series_id}: {self.total_versions}>'
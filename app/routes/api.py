@@ -7,6 +7,9 @@ from app.models.card import Card, CardVersion
 from app.models.collection import UserCollection, Wishlist
 from app.models.deck import Deck, DeckCard
 from app.models.price import PriceHistory
+from app.models.listing import CardListing
+from app.services.card_listing import apply_card_filters
+from app.services.search import search_card_ids, take_ranked
 from app import db
 
 # 用于卡组编辑的卡片搜索
@@ -14,6 +17,9 @@ from sqlalchemy import and_
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
+# 卡组编辑搜索每页数量
+SEARCH_PER_PAGE = 50
+
 
 @bp.route('/cards/<int:card_id>/versions')
 def get_card_versions(card_id):
@@ -150,37 +156,39 @@ def remove_from_wishlist():
 
 @bp.route('/cards/search')
 def search_cards():
-    """搜索卡片 (用于卡组编辑)"""
+    """搜索卡片 (用于卡组编辑)，?page= 分页"""
     name = request.args.get('name', '').strip()
     card_type = request.args.get('type', '').strip()
     color = request.args.get('color', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    offset = (page - 1) * SEARCH_PER_PAGE
     
-    q = Card.query.filter_by(language='jp')
-    
-    if name:
-        q = q.filter(Card.name.contains(name))
-    if card_type:
-        q = q.filter(Card.card_type == card_type)
-    if color:
-        q = q.filter(Card.colors.contains(color))
+    # 读模型: 每张卡片取首个版本，单表查询
+    q = CardListing.query.filter_by(language='jp', is_primary=True)
+    q = apply_card_filters(q, card_type=card_type, color=color)
     
-    cards = q.order_by(Card.card_number).limit(50).all()
+    card_ids = search_card_ids(name, language='jp', fields=('name',), limit=None) if name else None
+    if card_ids is not None:
+        # 按相关度分页
+        rows = take_ranked(q, CardListing.card_id, card_ids, limit=SEARCH_PER_PAGE, offset=offset)
+    else:
+        if name:
+            # 索引不可用时回退到 LIKE
+            q = q.filter(CardListing.name.contains(name))
+        rows = q.order_by(CardListing.card_number).offset(offset).limit(SEARCH_PER_PAGE).all()
     
     result = []
-    for card in cards:
-        version = card.versions.first()
-        if version:
-            image = version.images.first()
-            result.append({
-                'id': card.id,
-                'card_number': card.card_number,
-                'name': card.name,
-                'card_type': card.card_type,
-                'rarity': card.rarity,
-                'colors': card.colors,
-                'version_id': version.id,
-                'image_url': image.original_url if image else None
-            })
+    for row in rows:
+        result.append({
+            'id': row.card_id,
+            'card_number': row.card_number,
+            'name': row.name,
+            'card_type': row.card_type,
+            'rarity': row.rarity,
+            'colors': row.colors,
+            'version_id': row.version_id,
+            'image_url': row.image_original_url
+        })
     
     return jsonify(result)
 
@@ -6,7 +6,11 @@ from flask_login import current_user
 from app.models.series import Series
 from app.models.card import Card, CardVersion, CardImage
 from app.models.collection import UserCollection, Wishlist
-from app.models.price import PriceHistory
+from app.models.listing import CardListing
+from app.services.card_listing import paginate_card_list
+from app.services.catalog import find_series, get_language_stats, get_series_groups, get_series_list
+from app.services.price_latest import latest_by_version
+from app.services.series_stats import stats_by_series
 from app import db
 from sqlalchemy import func
 
@@ -34,88 +38,29 @@ def card_list():
     
     # 当选择了系列时，基于 CardVersion 查询（包含平行卡/异画卡）
     # 当没有选择系列时，基于 Card 查询（每个卡号只显示一次）
-    if series_id:
-        # 基于版本查询 - 显示该系列所有版本（包括平行卡）
-        q = CardVersion.query.filter(CardVersion.series_id == series_id)\
-            .join(Card, CardVersion.card_id == Card.id)\
-            .filter(Card.language == lang)
-        
-        if card_type:
-            q = q.filter(Card.card_type == card_type)
-        if color:
-            q = q.filter(Card.colors.contains(color))
-        if rarity:
-            # SP 需要匹配多个变体
-            if rarity == 'SP':
-                q = q.filter(db.or_(Card.rarity == 'SP CARD', Card.rarity == 'SPカード'))
-            else:
-                q = q.filter(Card.rarity == rarity)
-        if illustration:
-            q = q.filter(CardVersion.illustration_type == illustration)
-        if star == '1':
-            q = q.filter(CardVersion.has_star_mark == True)
-        elif star == '0':
-            q = q.filter(CardVersion.has_star_mark == False)
-        
-        pagination = q.order_by(Card.card_number, CardVersion.version_suffix).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        # 将版本转换为统一的显示格式
-        versions = pagination.items
-        cards = []
-        for v in versions:
-            card = Card.query.get(v.card_id)
-            # 创建一个包装对象，包含版本信息
-            card_display = CardDisplay(card, v)
-            cards.append(card_display)
-    else:
-        # 没有选择系列时，按卡片查询（每个卡号只显示一次）
-        q = Card.query.filter(Card.language == lang)
-        
-        if card_type:
-            q = q.filter(Card.card_type == card_type)
-        if color:
-            q = q.filter(Card.colors.contains(color))
-        if rarity:
-            # SP 需要匹配多个变体
-            if rarity == 'SP':
-                q = q.filter(db.or_(Card.rarity == 'SP CARD', Card.rarity == 'SPカード'))
-            else:
-                q = q.filter(Card.rarity == rarity)
-        
-        # 插画类型或星标筛选（需要 JOIN CardVersion）
-        if illustration or star:
-            q = q.join(CardVersion, Card.id == CardVersion.card_id)
-            if illustration:
-                q = q.filter(CardVersion.illustration_type == illustration)
-            if star == '1':
-                q = q.filter(CardVersion.has_star_mark == True)
-            elif star == '0':
-                q = q.filter(CardVersion.has_star_mark == False)
-            q = q.distinct()
-        
-        pagination = q.order_by(Card.card_number).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        cards = [CardDisplay(c, None) for c in pagination.items]
-    
-    series_list = Series.query.filter_by(language=lang).order_by(Series.code).all()
+    pagination, cards = paginate_card_list(
+        lang, page, per_page,
+        series_id=series_id,
+        card_type=card_type,
+        color=color,
+        rarity=rarity,
+        illustration=illustration,
+        star=star
+    )
+    
+    # 系列列表 / 分组 / 语言统计均来自缓存
+    series_list = sorted(get_series_list(lang), key=lambda s: s['code'])
     
     # 系列分组（用于侧边栏树形导航）
-    series_groups = _get_series_groups(lang)
+    series_groups = get_series_groups(lang)
     
     # 当前选中的系列
     current_series = None
     if series_id:
-        current_series = Series.query.get(series_id)
+        current_series = find_series(lang, series_id) or Series.query.get(series_id)
     
     # 语言统计
-    stats = {
-        'jp_count': Card.query.filter_by(language='jp').count(),
-        'en_count': Card.query.filter_by(language='en').count()
-    }
+    stats = get_language_stats()
     
     return render_template('cards/list.html', 
                           cards=cards, 
@@ -127,92 +72,6 @@ def card_list():
                           current_lang=lang)
 
 
-class CardDisplay:
-    """卡片显示包装类，统一卡片和版本的显示接口"""
-    def __init__(self, card, version=None):
-        self.card = card
-        self.version = version
-        self.card_number = card.card_number
-        self.name = card.name
-        self.card_type = card.card_type
-        self.rarity = card.rarity
-        self.colors = card.colors
-        
-    @property
-    def versions(self):
-        """兼容模板中的 card.versions.first() 调用"""
-        return self
-    
-    def first(self):
-        """返回指定版本或卡片的第一个版本"""
-        if self.version:
-            return self.version
-        return self.card.versions.first()
-    
-    @property
-    def display_version_id(self):
-        """用于详情页链接的版本ID"""
-        if self.version:
-            return self.version.id
-        return None
-    
-    @property
-    def source_description(self):
-        """获取入手情报（版本级别）"""
-        if self.version:
-            return self.version.source_description
-        return None
-    
-    @property
-    def illustration_type(self):
-        """获取插画类型（版本级别）"""
-        if self.version:
-            return self.version.illustration_type
-        return None
-    
-    @property
-    def has_star_mark(self):
-        """获取星标状态（版本级别）"""
-        if self.version:
-            return self.version.has_star_mark
-        return False
-
-
-def _get_series_groups(lang: str) -> dict:
-    """获取系列分组数据"""
-    series_all = Series.query.filter_by(language=lang).order_by(Series.code.desc()).all()
-    
-    # 分组映射
-    type_names = {
-        'booster': '📦 补充包 (Booster)',
-        'starter': '🎴 起始套牌 (Starter)',
-        'extra': '✨ 额外补充 (Extra)',
-        'premium': '👑 高级补充 (Premium)',
-        'promo': '🎁 促销卡 (Promo)',
-        'don': '🔴 DON卡 (DON!!)',
-        'limited': '🔒 限定商品 (Limited)',
-        'ultimate': '⚔️ 终极套牌 (Ultimate)',
-        'family': '👨‍👩‍👧 家庭套牌 (Family)',
-        'other': '📁 其他'
-    }
-    
-    groups = {}
-    for s in series_all:
-        group_name = type_names.get(s.series_type, type_names['other'])
-        if group_name not in groups:
-            groups[group_name] = []
-        groups[group_name].append(s)
-    
-    # 排序：按定义顺序
-    ordered_groups = {}
-    for type_key in ['booster', 'starter', 'extra', 'premium', 'promo', 'don', 'limited', 'ultimate', 'family', 'other']:
-        group_name = type_names.get(type_key)
-        if group_name and group_name in groups:
-            ordered_groups[group_name] = groups[group_name]
-    
-    return ordered_groups
-
-
 @bp.route('/<card_number>/all-versions')
 def card_all_versions(card_number):
     """查看同一语种内所有系列中该卡号的全部版本"""
@@ -350,11 +209,11 @@ def card_detail(card_number):
             version_id=first_version_id
         ).first()
     
-    # 获取最新价格（每个版本取最新一条）
+    # 获取最新价格（读取快照，每个版本一条）
+    latest = latest_by_version([v.id for v in versions])
     prices = []
     for v in versions:
-        latest_price = PriceHistory.query.filter_by(version_id=v.id)\
-            .order_by(PriceHistory.recorded_at.desc()).first()
+        latest_price = latest.get(v.id)
         if latest_price:
             latest_price.version = v
             prices.append(latest_price)
@@ -379,30 +238,26 @@ def series_list():
     if lang not in ('jp', 'en'):
         lang = 'jp'
     
-    q = Series.query.filter_by(language=lang)
+    series_all = get_series_list(lang)
     
     if series_type:
-        q = q.filter(Series.series_type == series_type)
-    
-    series_all = q.order_by(Series.code.desc()).all()
+        series_all = [s for s in series_all if s['series_type'] == series_type]
     
-    # 版本数统计
+    # 版本数统计（预计算，一条查询）
+    series_stats = stats_by_series([s['id'] for s in series_all])
     series_list_data = []
     for s in series_all:
-        version_count = CardVersion.query.filter_by(series_id=s.id).count()
+        stats_row = series_stats.get(s['id'])
         series_list_data.append({
-            'id': s.id,
-            'code': s.code,
-            'name': s.name,
-            'series_type': s.series_type,
-            'card_count': version_count
+            'id': s['id'],
+            'code': s['code'],
+            'name': s['name'],
+            'series_type': s['series_type'],
+            'card_count': stats_row.total_versions if stats_row else 0
         })
     
     # 语言统计
-    stats = {
-        'jp_count': Card.query.filter_by(language='jp').count(),
-        'en_count': Card.query.filter_by(language='en').count()
-    }
+    stats = get_language_stats()
     
     return render_template('cards/series_list.html', 
                           series_list=series_list_data,
@@ -417,34 +272,25 @@ def series_detail(series_id):
     
     card_type = request.args.get('type', '').strip()
     
-    # 新逻辑：按 series_id 获取该系列的所有版本，然后关联到卡片
-    versions_query = CardVersion.query.filter_by(series_id=series_id)\
-        .join(Card, CardVersion.card_id == Card.id)
+    # 按 series_id 读取该系列所有版本的读模型行（已合并卡片信息和首图）
+    versions_query = CardListing.query.filter_by(series_id=series_id)
     
     if card_type:
-        versions_query = versions_query.filter(Card.card_type == card_type)
-    
-    versions = versions_query.order_by(Card.card_number, CardVersion.version_suffix).all()
+        versions_query = versions_query.filter(CardListing.card_type == card_type)
     
-    # 为每个版本加载卡片信息
-    for v in versions:
-        v.card_info = Card.query.get(v.card_id)
-        v.images_list = v.images.all()
+    versions = versions_query.order_by(CardListing.card_number, CardListing.version_suffix).all()
     
-    # 统计（按版本所属卡片的类型统计）
+    # 统计（按版本所属卡片的类型统计，预计算）
+    series_stats = series.stats
     stats = {
-        'leader': CardVersion.query.filter_by(series_id=series_id)\
-            .join(Card).filter(Card.card_type == 'LEADER').count(),
-        'character': CardVersion.query.filter_by(series_id=series_id)\
-            .join(Card).filter(Card.card_type == 'CHARACTER').count(),
-        'event': CardVersion.query.filter_by(series_id=series_id)\
-            .join(Card).filter(Card.card_type == 'EVENT').count(),
-        'stage': CardVersion.query.filter_by(series_id=series_id)\
-            .join(Card).filter(Card.card_type == 'STAGE').count()
+        'leader': series_stats.leader_count if series_stats else 0,
+        'character': series_stats.character_count if series_stats else 0,
+        'event': series_stats.event_count if series_stats else 0,
+        'stage': series_stats.stage_count if series_stats else 0
     }
     
     # 总版本数
-    total_versions = CardVersion.query.filter_by(series_id=series_id).count()
+    total_versions = series_stats.total_versions if series_stats else 0
     
     return render_template('cards/series_detail.html', 
                           series=series, 
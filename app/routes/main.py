@@ -4,39 +4,40 @@
 from flask import Blueprint, render_template, request
 from app.models.series import Series
 from app.models.card import Card, CardVersion, CardImage
+from app.services.catalog import get_series_list, get_site_stats
+from app.services.search import card_number_ids, search_card_ids, take_ranked
+from app.services.series_stats import stats_by_series
 from app import db
 
 bp = Blueprint('main', __name__)
 
+# 搜索页最多显示的卡片数
+SEARCH_LIMIT = 100
+
+# 全文检索候选数量 (再与颜色/类型/稀有度筛选组合)
+SEARCH_CANDIDATES = 500
+
 
 @bp.route('/')
 def index():
     """首页"""
-    # 统计信息
-    stats = {
-        'series_count': Series.query.count(),
-        'card_count': Card.query.count(),
-        'leader_count': Card.query.filter_by(card_type='LEADER').count(),
-        'version_count': CardVersion.query.count(),
-        'jp_count': Card.query.filter_by(language='jp').count(),
-        'en_count': Card.query.filter_by(language='en').count()
-    }
+    # 统计信息（缓存）
+    stats = get_site_stats()
     
-    # 最新系列
+    # 最新系列（只显示前6个）
+    latest = get_series_list('jp')[:6]
+    series_stats = stats_by_series([s['id'] for s in latest])
     recent_series = []
-    for s in Series.query.filter_by(language='jp').order_by(Series.code.desc()).limit(20).all():
-        card_count = Card.query.filter_by(series_id=s.id).count()
+    for s in latest:
+        stats_row = series_stats.get(s['id'])
         recent_series.append({
-            'id': s.id,
-            'code': s.code,
-            'name': s.name,
-            'series_type': s.series_type,
-            'card_count': card_count
+            'id': s['id'],
+            'code': s['code'],
+            'name': s['name'],
+            'series_type': s['series_type'],
+            'card_count': stats_row.card_count if stats_row else 0
         })
     
-    # 只显示前6个
-    recent_series = recent_series[:6]
-    
     return render_template('index.html', stats=stats, recent_series=recent_series)
 
 
@@ -53,14 +54,26 @@ def search():
     if query or color or card_type or rarity:
         q = Card.query
         
+        ranked_ids = None
         if query:
-            q = q.filter(
-                db.or_(
-                    Card.name.contains(query),
-                    Card.card_number.contains(query),
-                    Card.traits.contains(query)
+            # 全文检索 (名称/特征/效果/触发)，卡号按前缀走索引
+            # 有筛选条件时多取候选，保证筛选后仍有足够结果
+            candidates = SEARCH_CANDIDATES if (color or card_type or rarity) else SEARCH_LIMIT
+            ranked_ids = search_card_ids(query, limit=candidates)
+            if ranked_ids is None:
+                # 索引不可用时回退到 LIKE
+                q = q.filter(
+                    db.or_(
+                        Card.name.contains(query),
+                        Card.card_number.contains(query),
+                        Card.traits.contains(query)
+                    )
                 )
-            )
+            else:
+                # 卡号命中的排在最前
+                numbered = card_number_ids(query, limit=candidates)
+                ranked_ids = list(dict.fromkeys(numbered + ranked_ids))[:candidates]
+                q = q.filter(Card.id.in_(ranked_ids))
         
         if color:
             q = q.filter(Card.colors.contains(color))
@@ -71,6 +84,10 @@ def search():
         if rarity:
             q = q.filter(Card.rarity == rarity)
         
-        cards = q.order_by(Card.card_number).limit(100).all()
+        if ranked_ids is None:
+            cards = q.order_by(Card.card_number).limit(SEARCH_LIMIT).all()
+        else:
+            # 按相关度排序
+            cards = take_ranked(q, Card.id, ranked_ids, limit=SEARCH_LIMIT)
     
     return render_template('search.html', cards=cards, query=query)
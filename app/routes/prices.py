@@ -1,39 +1,50 @@
 """
 価格ルート - 価格追跡と走勢図表
 """
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, abort
 from app.models.card import Card, CardVersion, CardImage
 from app.models.series import Series
-from app.models.price import PriceHistory
+from app.models.price import PriceLatest
+from app.services.catalog import get_series_list
+from app.services import price_analytics as analytics
+from app.services.price_movers import DEFAULT_PERIOD, PERIODS, top_movers
+from app.services.price_rollup import RESOLUTIONS, compare_series, pick_resolution, price_points
 from app import db
 from sqlalchemy import func, desc
-from datetime import datetime, timedelta
 
 bp = Blueprint('prices', __name__, url_prefix='/prices')
 
+RESOLUTION_CHOICES = ('auto', 'raw') + RESOLUTIONS
+
+# 価格比較APIで一度に指定できるバージョン数（デッキ / シリーズ単位）
+MAX_COMPARE_VERSIONS = 300
+
+# 分析APIの期間上限（日）
+MAX_ANALYTICS_DAYS = 365 * 5
+
 
 @bp.route('/')
 def price_list():
     """価格一覧ページ - 価格変動が大きいカードなどを表示"""
-    # 最新価格があるカードを取得
-    subq = db.session.query(
-        PriceHistory.version_id,
-        func.max(PriceHistory.recorded_at).label('latest')
-    ).group_by(PriceHistory.version_id).subquery()
-    
-    latest_prices = db.session.query(PriceHistory)\
-        .join(subq, (PriceHistory.version_id == subq.c.version_id) & 
-              (PriceHistory.recorded_at == subq.c.latest))\
-        .order_by(desc(PriceHistory.price))\
+    # 最新価格スナップショットから価格順に取得（カード/バージョンは JOIN で一括取得）
+    rows = db.session.query(PriceLatest, CardVersion, Card)\
+        .join(CardVersion, PriceLatest.version_id == CardVersion.id)\
+        .join(Card, CardVersion.card_id == Card.id)\
+        .order_by(desc(PriceLatest.price))\
         .limit(50).all()
     
-    # 各価格にカード情報を付加
-    for p in latest_prices:
-        version = CardVersion.query.get(p.version_id)
-        if version:
-            p.version = version
-            p.card = Card.query.get(version.card_id)
-            p.image = version.images.first()
+    images = {}
+    version_ids = [version.id for _, version, _ in rows]
+    if version_ids:
+        for image in CardImage.query.filter(CardImage.version_id.in_(version_ids)).order_by(CardImage.id):
+            images.setdefault(image.version_id, image)
+    
+    latest_prices = []
+    for p, version, card in rows:
+        p.version = version
+        p.card = card
+        p.image = images.get(version.id)
+        latest_prices.append(p)
     
     return render_template('prices/list.html', prices=latest_prices)
 
@@ -53,32 +64,25 @@ def card_price_history(card_number):
 
 @bp.route('/api/history/<int:version_id>')
 def api_price_history(version_id):
-    """価格履歴APIエンドポイント - グラフデータ用"""
+    """
+    価格履歴APIエンドポイント - グラフデータ用
+    
+    resolution: raw / day / week / month / auto (デフォルト、days から自動選択)
+    """
     days = request.args.get('days', 30, type=int)
     source = request.args.get('source', None)
+    resolution = request.args.get('resolution', 'auto')
     
-    since = datetime.utcnow() - timedelta(days=days)
-    
-    q = PriceHistory.query.filter(
-        PriceHistory.version_id == version_id,
-        PriceHistory.recorded_at >= since
-    )
+    if resolution not in RESOLUTION_CHOICES:
+        return jsonify({'error': f'resolution must be one of {", ".join(RESOLUTION_CHOICES)}'}), 400
+    if resolution == 'auto':
+        resolution = pick_resolution(days)
     
-    if source:
-        q = q.filter(PriceHistory.source == source)
-    
-    prices = q.order_by(PriceHistory.recorded_at).all()
-    
-    data = [{
-        'date': p.recorded_at.isoformat(),
-        'price': p.price,
-        'currency': p.currency,
-        'source': p.source,
-        'condition': p.condition
-    } for p in prices]
+    data = price_points([version_id], days, source=source, resolution=resolution)[version_id]
     
     return jsonify({
         'version_id': version_id,
+        'resolution': resolution,
         'count': len(data),
         'data': data
     })
@@ -86,40 +90,172 @@ def api_price_history(version_id):
 
 @bp.route('/api/compare')
 def api_compare_prices():
-    """複数カードの価格比較API"""
+    """
+    複数カードの価格比較API（列形式）
+    
+    ids: バージョンID（複数指定、最大 MAX_COMPARE_VERSIONS）
+    series_id: 指定するとシリーズ内の全バージョンを比較
+    """
     version_ids = request.args.getlist('ids', type=int)
+    series_id = request.args.get('series_id', type=int)
     days = request.args.get('days', 30, type=int)
+    resolution = request.args.get('resolution', 'auto')
     
-    if not version_ids or len(version_ids) > 10:
-        return jsonify({'error': 'Please provide 1-10 version IDs'}), 400
-    
-    since = datetime.utcnow() - timedelta(days=days)
-    
-    result = {}
-    for vid in version_ids:
-        prices = PriceHistory.query.filter(
-            PriceHistory.version_id == vid,
-            PriceHistory.recorded_at >= since
-        ).order_by(PriceHistory.recorded_at).all()
-        
-        version = CardVersion.query.get(vid)
-        card = Card.query.get(version.card_id) if version else None
-        
-        result[vid] = {
-            'card_number': card.card_number if card else None,
-            'card_name': card.name if card else None,
-            'data': [{
-                'date': p.recorded_at.isoformat(),
-                'price': p.price,
-                'currency': p.currency
-            } for p in prices]
-        }
-    
-    return jsonify(result)
+    if series_id:
+        version_ids += [vid for (vid,) in db.session.query(CardVersion.id)
+                        .filter(CardVersion.series_id == series_id)
+                        .order_by(CardVersion.id)
+                        .limit(MAX_COMPARE_VERSIONS + 1)]
+        version_ids = list(dict.fromkeys(version_ids))
+    
+    if not version_ids or len(version_ids) > MAX_COMPARE_VERSIONS:
+        return jsonify({'error': f'Please provide 1-{MAX_COMPARE_VERSIONS} version IDs'}), 400
+    if resolution not in RESOLUTION_CHOICES:
+        return jsonify({'error': f'resolution must be one of {", ".join(RESOLUTION_CHOICES)}'}), 400
+    
+    return jsonify(compare_series(version_ids, days, resolution=resolution))
+
+
+@bp.route('/api/analytics/<int:version_id>')
+def api_version_analytics(version_id):
+    """
+    単一バージョンの価格分析API（列形式）
+    
+    days: 期間, window: 移動平均 / 標準偏差のウィンドウ, currency, source
+    """
+    days, currency, source = _analytics_args()
+    window = min(max(request.args.get('window', 7, type=int), 2), 90)
+    
+    matrix = analytics.load_prices([version_id], days=days, currency=currency, source=source)
+    prices = matrix.row(version_id)
+    filled = analytics.forward_fill(prices)
+    
+    return jsonify({
+        'version_id': version_id,
+        'currency': currency,
+        'window': window,
+        'dates': matrix.date_strings(),
+        'prices': analytics.to_json(prices),
+        'moving_avg': analytics.to_json(analytics.rolling_mean(filled, window)),
+        'moving_std': analytics.to_json(analytics.rolling_std(filled, window)),
+        'returns': analytics.to_json(analytics.log_returns(prices), 6),
+        'volatility': analytics.to_json(analytics.volatility(prices, window))
+    })
+
+
+@bp.route('/api/analytics/series/<int:series_id>')
+def api_series_index(series_id):
+    """シリーズ価格指数API（等権重、初日 = 100）"""
+    days, currency, source = _analytics_args()
+    version_ids = [vid for (vid,) in db.session.query(CardVersion.id)
+                   .filter(CardVersion.series_id == series_id)]
+    
+    matrix = analytics.load_prices(version_ids, days=days, currency=currency, source=source)
+    
+    return jsonify({
+        'series_id': series_id,
+        'currency': currency,
+        'constituents': matrix.constituents(),
+        'dates': matrix.date_strings(),
+        'index': analytics.to_json(analytics.series_index(matrix))
+    })
+
+
+@bp.route('/api/analytics/card/<card_number>')
+def api_card_correlation(card_number):
+    """同一カードの各バージョンと通常版の価格相関API（日次対数収益率）"""
+    days, currency, source = _analytics_args()
+    card = Card.query.filter_by(card_number=card_number).first_or_404()
+    versions = card.versions.order_by(CardVersion.id).all()
+    normal = next((v for v in versions if v.version_type == 'normal'), versions[0] if versions else None)
+    
+    matrix = analytics.load_prices([v.id for v in versions], days=days, currency=currency, source=source)
+    
+    return jsonify({
+        'card_number': card_number,
+        'currency': currency,
+        'base_version_id': normal.id if normal else None,
+        'data': [{
+            'version_id': v.id,
+            'version_type': v.version_type,
+            'volatility': analytics.last_valid(analytics.volatility(matrix.row(v.id), min(30, max(days // 3, 2)))),
+            'correlation': analytics.correlation(matrix.row(normal.id), matrix.row(v.id))
+        } for v in versions if v.id != normal.id]
+    })
+
+
+def _analytics_args():
+    """分析APIの共通パラメータ (days, currency, source)"""
+    days = min(max(request.args.get('days', 90, type=int), 1), MAX_ANALYTICS_DAYS)
+    return days, request.args.get('currency', 'USD'), request.args.get('source') or None
 
 
 @bp.route('/trending')
 def trending():
     """価格上昇/下落トレンドページ"""
-    # TODO: 実装 - 価格変動が大きいカードを表示
-    return render_template('prices/trending.html')
+    filters = _trending_filters()
+    if filters is None:
+        abort(400)
+    
+    gainers = top_movers(direction='gainers', **filters)
+    losers = top_movers(direction='losers', **filters)
+    
+    return render_template('prices/trending.html',
+                          gainers=gainers,
+                          losers=losers,
+                          periods=list(PERIODS),
+                          series_list=get_series_list('jp'),
+                          filters=filters)
+
+
+@bp.route('/api/trending')
+def api_trending():
+    """
+    値上がり/値下がりランキングAPI
+    
+    period: 1d / 7d / 30d, direction: gainers / losers, series_id, rarity, currency, limit
+    """
+    filters = _trending_filters()
+    direction = request.args.get('direction', 'gainers')
+    if filters is None or direction not in ('gainers', 'losers'):
+        return jsonify({'error': f'period must be one of {", ".join(PERIODS)}; '
+                                 f'direction must be gainers or losers'}), 400
+    
+    movers = top_movers(direction=direction, **filters)
+    
+    return jsonify({
+        'period': filters['period'],
+        'direction': direction,
+        'count': len(movers),
+        'data': [{
+            'version_id': m.version_id,
+            'card_number': m.card_number,
+            'name': m.name,
+            'rarity': m.rarity,
+            'series_id': m.series_id,
+            'version_type': m.version_type,
+            'source': m.source,
+            'currency': m.currency,
+            'price': m.price,
+            'base_price': m.base_price,
+            'change_abs': m.change_abs,
+            'change_pct': m.change_pct,
+            'listing_count': m.listing_count,
+            'date': m.recorded_at.isoformat(),
+            'base_date': m.base_recorded_at.isoformat()
+        } for m in movers]
+    })
+
+
+def _trending_filters():
+    """ランキングの絞り込み条件（period が不正な場合は None）"""
+    period = request.args.get('period', DEFAULT_PERIOD)
+    if period not in PERIODS:
+        return None
+    return {
+        'period': period,
+        'series_id': request.args.get('series_id', type=int),
+        'rarity': request.args.get('rarity') or None,
+        'currency': request.args.get('currency') or None,
+        'limit': min(max(request.args.get('limit', 20, type=int), 1), 100),
+    }
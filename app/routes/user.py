@@ -195,7 +195,7 @@ def deck_create():
 @login_required
 def stats():
     """收藏统计页面"""
-    from app.models.price import PriceHistory
+    from app.services.price_latest import current_prices
     
     # 基础统计
     collection_count = current_user.collections.count()
@@ -204,44 +204,39 @@ def stats():
     ).scalar() or 0
     
     # 收藏总价值估算
-    # 获取每个收藏版本的最新价格
-    subq = db.session.query(
-        PriceHistory.version_id,
-        func.max(PriceHistory.recorded_at).label('latest')
-    ).group_by(PriceHistory.version_id).subquery()
+    # 每个收藏版本的当前价格（price_latest 快照）
+    latest = current_prices()
     
     # 计算总价值 (价格 * 数量)
     total_value_usd = db.session.query(
-        func.sum(PriceHistory.price * UserCollection.quantity)
-    ).join(subq, (PriceHistory.version_id == subq.c.version_id) & 
-           (PriceHistory.recorded_at == subq.c.latest))\
-     .join(UserCollection, PriceHistory.version_id == UserCollection.version_id)\
+        func.sum(latest.c.price * UserCollection.quantity)
+    ).select_from(latest)\
+     .join(UserCollection, latest.c.version_id == UserCollection.version_id)\
      .filter(
          UserCollection.user_id == current_user.id,
-         PriceHistory.currency == 'USD'
+         latest.c.currency == 'USD'
      ).scalar() or 0
     
     # 有价格数据的卡片数量
     cards_with_price = db.session.query(func.count(func.distinct(UserCollection.version_id)))\
-        .join(PriceHistory, UserCollection.version_id == PriceHistory.version_id)\
+        .join(latest, UserCollection.version_id == latest.c.version_id)\
         .filter(UserCollection.user_id == current_user.id).scalar() or 0
     
     # 最有价值的卡片 Top 5
     top_value_cards = db.session.query(
         Card.card_number,
         Card.name,
-        PriceHistory.price,
+        latest.c.price,
         UserCollection.quantity,
-        (PriceHistory.price * UserCollection.quantity).label('total_value')
-    ).join(subq, (PriceHistory.version_id == subq.c.version_id) & 
-           (PriceHistory.recorded_at == subq.c.latest))\
-     .join(UserCollection, PriceHistory.version_id == UserCollection.version_id)\
+        (latest.c.price * UserCollection.quantity).label('total_value')
+    ).select_from(latest)\
+     .join(UserCollection, latest.c.version_id == UserCollection.version_id)\
      .join(CardVersion, UserCollection.version_id == CardVersion.id)\
      .join(Card, CardVersion.card_id == Card.id)\
      .filter(
          UserCollection.user_id == current_user.id,
-         PriceHistory.currency == 'USD'
-     ).order_by((PriceHistory.price * UserCollection.quantity).desc())\
+         latest.c.currency == 'USD'
+     ).order_by((latest.c.price * UserCollection.quantity).desc())\
      .limit(5).all()
     
     # 稀有度分布
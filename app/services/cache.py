@@ -0,0 +1,144 @@
+"""
+缓存层 - 进程内 LRU + TTL，可选 Redis 共享后端
+
+只缓存可 JSON 序列化的普通数据 (dict/list/数字)，不缓存 ORM 对象。
+默认使用进程内缓存：每个 worker 各自一份，过期时间兜底；
+配置 CACHE_REDIS_URL 后改用 Redis，爬虫进程中的 invalidate() 会同步到所有 worker。
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from loguru import logger
+
+try:
+    import redis
+except ImportError:  # 可选依赖
+    redis = None
+
+# 未命中标记（缓存值本身可能是 None / 0）
+_MISSING = object()
+
+
+class TTLCache:
+    """进程内 LRU 缓存，条目超过 ttl 秒后失效"""
+
+    def __init__(self, max_entries: int = 256, ttl: int = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Redis 共享缓存（值以 JSON 存储）"""
+
+    def __init__(self, url: str, ttl: int = 300, prefix: str = 'opcg:'):
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return default
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=ttl)
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*[self.prefix + k for k in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+_backend = TTLCache()
+
+
+def init_cache(app):
+    """根据应用配置初始化缓存后端（create_app 调用）"""
+    global _backend
+    ttl = app.config.get('CACHE_TTL', 300)
+    redis_url = app.config.get('CACHE_REDIS_URL')
+
+    if redis_url and redis is not None:
+        _backend = RedisCache(redis_url, ttl=ttl)
+    else:
+        if redis_url:
+            logger.warning("未安装 redis，使用进程内缓存")
+        _backend = TTLCache(max_entries=app.config.get('CACHE_MAX_ENTRIES', 256), ttl=ttl)
+
+
+def get_cache():
+    """当前缓存后端"""
+    return _backend
+
+
+def cached(key: str, loader: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+    """
+    读取缓存，未命中时调用 loader 计算并写入
+
+    后端不可用 (如 Redis 连接失败) 时直接返回 loader 结果。
+    """
+    try:
+        value = _backend.get(key, _MISSING)
+    except Exception as e:
+        logger.warning(f"读取缓存失败 {key}: {e}")
+        return loader()
+
+    if value is _MISSING:
+        value = loader()
+        try:
+            _backend.set(key, value, ttl)
+        except Exception as e:
+            logger.warning(f"写入缓存失败 {key}: {e}")
+    return value
+
+
+def invalidate(*keys: str):
+    """删除指定缓存键"""
+    try:
+        _backend.delete(*keys)
+    except Exception as e:
+        logger.warning(f"清除缓存失败 {keys}: {e}")
@@ -0,0 +1,327 @@
+"""
+卡牌列表查询层 - 基于 card_listings 读模型
+
+浏览/搜索路径原先在请求时拼接 Card + CardVersion + Series + CardImage，
+现在读取预先合并好的 CardListing 单表（每页固定 2 条语句: 计数 + 数据）。
+读模型由写入路径调用 refresh_listings() 维护，或通过
+`python scripts/cli.py listings --rebuild` 全量重建。
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Boolean, Integer, String, cast, func, inspect, null
+
+from app import db
+from app.models.card import Card, CardVersion, CardImage
+from app.models.listing import CardListing, COLOR_BITS, color_mask
+from app.models.series import Series
+from app.services.price_latest import latest_by_version
+
+# 重建读模型时每批处理的版本数
+REFRESH_CHUNK_SIZE = 500
+
+
+@dataclass
+class CardListItem:
+    """列表页单张卡片的展示数据（模板无需再访问数据库）"""
+    card_number: str
+    name: str
+    card_type: str
+    rarity: str
+    colors: str
+    # 系列模式下为具体版本ID，用于详情页链接；卡片模式下为 None
+    display_version_id: Optional[int] = None
+    source_description: Optional[str] = None
+    illustration_type: Optional[str] = None
+    has_star_mark: bool = False
+    image_local_path: Optional[str] = None
+    image_original_url: Optional[str] = None
+    image_width: Optional[int] = None
+    image_height: Optional[int] = None
+
+    @property
+    def image_url(self) -> Optional[str]:
+        """优先使用本地图片"""
+        return self.image_local_path or self.image_original_url
+
+
+def apply_card_filters(q, card_type: str = '', color: str = '', rarity: str = '', model=CardListing):
+    """卡片级别的筛选条件（model 为 CardListing 或 Card）"""
+    if card_type:
+        q = q.filter(model.card_type == card_type)
+    if color:
+        bit = COLOR_BITS.get(color)
+        if bit and model is CardListing:
+            q = q.filter(CardListing.color_mask.op('&')(bit) != 0)
+        else:
+            q = q.filter(model.colors.contains(color))
+    if rarity:
+        # SP 需要匹配多个变体
+        if rarity == 'SP':
+            q = q.filter(model.rarity.in_(['SP CARD', 'SPカード']))
+        else:
+            q = q.filter(model.rarity == rarity)
+    return q
+
+
+def _version_filters(illustration: str, star: str) -> list:
+    """版本级别的筛选条件"""
+    conditions = []
+    if illustration:
+        conditions.append(CardListing.illustration_type == illustration)
+    if star == '1':
+        conditions.append(CardListing.has_star_mark == True)
+    elif star == '0':
+        conditions.append(CardListing.has_star_mark == False)
+    return conditions
+
+
+def first_images(version_ids: List[int]) -> Dict[int, tuple]:
+    """
+    批量获取每个版本的第一张图片（一条语句）
+
+    Returns:
+        {version_id: (local_path, original_url, width, height)}
+    """
+    if not version_ids:
+        return {}
+
+    first_ids = db.session.query(func.min(CardImage.id))\
+        .filter(CardImage.version_id.in_(version_ids))\
+        .group_by(CardImage.version_id)
+
+    rows = db.session.query(CardImage.version_id, CardImage.local_path, CardImage.original_url,
+                            CardImage.width, CardImage.height)\
+        .filter(CardImage.id.in_(first_ids.scalar_subquery()))\
+        .all()
+
+    return {r.version_id: (r.local_path, r.original_url, r.width, r.height) for r in rows}
+
+
+def first_versions(card_ids: List[int]) -> Dict[int, int]:
+    """
+    批量获取每张卡片的第一个版本ID（一条语句）
+
+    Returns:
+        {card_id: version_id}
+    """
+    if not card_ids:
+        return {}
+
+    rows = db.session.query(CardVersion.card_id, func.min(CardVersion.id))\
+        .filter(CardVersion.card_id.in_(card_ids))\
+        .group_by(CardVersion.card_id)\
+        .all()
+
+    return {card_id: version_id for card_id, version_id in rows}
+
+
+def latest_prices(version_ids: List[int]) -> Dict[int, Tuple[float, str]]:
+    """
+    批量获取每个版本的最新价格（读取 price_latest 快照）
+
+    Returns:
+        {version_id: (price, currency)}
+    """
+    if not version_ids:
+        return {}
+
+    return {vid: (snap.price, snap.currency) for vid, snap in latest_by_version(version_ids).items()}
+
+
+def _build_listing_rows(version_ids: List[int]) -> List[dict]:
+    """为一批版本组装读模型行（固定 4 条查询）"""
+    versions = db.session.query(CardVersion, Card, Series.code)\
+        .join(Card, CardVersion.card_id == Card.id)\
+        .outerjoin(Series, CardVersion.series_id == Series.id)\
+        .filter(CardVersion.id.in_(version_ids))\
+        .all()
+
+    images = first_images(version_ids)
+    primary_ids = set(first_versions(list({card.id for _, card, _ in versions})).values())
+    prices = latest_prices(version_ids)
+
+    rows = []
+    for version, card, series_code in versions:
+        local_path, original_url, width, height = images.get(version.id, (None, None, None, None))
+        price, currency = prices.get(version.id, (None, None))
+        rows.append({
+            'version_id': version.id,
+            'card_id': card.id,
+            'card_number': card.card_number,
+            'language': card.language,
+            'name': card.name,
+            'card_type': card.card_type,
+            'rarity': card.rarity,
+            'colors': card.colors or '',
+            'color_mask': color_mask(card.colors),
+            'series_id': version.series_id,
+            'series_code': series_code,
+            'version_type': version.version_type,
+            'version_suffix': version.version_suffix or '',
+            'illustration_type': version.illustration_type,
+            'has_star_mark': bool(version.has_star_mark),
+            'source_description': version.source_description,
+            'is_primary': version.id in primary_ids,
+            'image_local_path': local_path,
+            'image_original_url': original_url,
+            'image_width': width,
+            'image_height': height,
+            'latest_price': price,
+            'latest_price_currency': currency,
+        })
+    return rows
+
+
+def _chunks(ids: List[int], size: int = REFRESH_CHUNK_SIZE) -> Iterable[List[int]]:
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def refresh_listings(version_ids: List[int] = None, card_ids: List[int] = None,
+                     series_ids: List[int] = None) -> int:
+    """
+    刷新指定版本/卡片/系列的读模型行（不提交事务，由调用方 commit）
+
+    Args:
+        version_ids: 版本ID列表
+        card_ids: 卡片ID列表（卡片信息变化时刷新其全部版本）
+        series_ids: 系列ID列表（爬取一个系列后刷新）
+
+    Returns:
+        刷新的行数
+    """
+    ids = set(version_ids or [])
+    if card_ids:
+        ids.update(v for (v,) in db.session.query(CardVersion.id)
+                   .filter(CardVersion.card_id.in_(card_ids)))
+    if series_ids:
+        ids.update(v for (v,) in db.session.query(CardVersion.id)
+                   .filter(CardVersion.series_id.in_(series_ids)))
+    if not ids:
+        return 0
+
+    db.session.flush()
+    table = CardListing.__table__
+    total = 0
+    for chunk in _chunks(sorted(ids)):
+        rows = _build_listing_rows(chunk)
+        db.session.execute(table.delete().where(table.c.version_id.in_(chunk)))
+        if rows:
+            db.session.execute(table.insert(), rows)
+        total += len(rows)
+    return total
+
+
+def rebuild_listings() -> int:
+    """全量重建读模型（不提交事务）"""
+    db.session.execute(CardListing.__table__.delete())
+    version_ids = [v for (v,) in db.session.query(CardVersion.id).order_by(CardVersion.id)]
+    return refresh_listings(version_ids=version_ids)
+
+
+def _listing_schema_outdated() -> bool:
+    """card_listings 表缺少模型中新增的列（create_all 不会给已有表加列）"""
+    existing = {c['name'] for c in inspect(db.engine).get_columns(CardListing.__tablename__)}
+    return not set(CardListing.__table__.columns.keys()) <= existing
+
+
+def ensure_listing_schema() -> bool:
+    """
+    表结构落后于模型时删表重建（由 `cli.py listings --rebuild` 在全量重建前调用）
+
+    读模型可由源表完整重建，删表不丢数据；不在应用启动时执行，
+    避免多个 worker 同时删表/重建。
+
+    Returns:
+        是否重建了表
+    """
+    if not _listing_schema_outdated():
+        return False
+    db.session.commit()
+    CardListing.__table__.drop(db.engine)
+    CardListing.__table__.create(db.engine)
+    return True
+
+
+# 卡片模式下与读模型合并的列（没有版本的卡片用 NULL 补齐版本/图片列）
+_LISTING_COLUMNS = ('version_id', 'card_number', 'name', 'card_type', 'rarity', 'colors',
+                    'source_description', 'illustration_type', 'has_star_mark',
+                    'image_local_path', 'image_original_url', 'image_width', 'image_height')
+_VERSIONLESS_NULLS = {
+    'version_id': Integer, 'source_description': String, 'illustration_type': String,
+    'has_star_mark': Boolean, 'image_local_path': String, 'image_original_url': String,
+    'image_width': Integer, 'image_height': Integer,
+}
+
+
+def _versionless_cards(lang: str, card_type: str, color: str, rarity: str):
+    """
+    还没有任何 CardVersion 的卡片（读模型按版本建行，不包含这些卡片）
+
+    列与 _LISTING_COLUMNS 对齐，用于 UNION ALL。
+    """
+    has_version = db.session.query(CardVersion.id).filter(CardVersion.card_id == Card.id).exists()
+    columns = [
+        cast(null(), _VERSIONLESS_NULLS[name]).label(name) if name in _VERSIONLESS_NULLS
+        else getattr(Card, name).label(name)
+        for name in _LISTING_COLUMNS
+    ]
+    q = db.session.query(*columns).filter(Card.language == lang, ~has_version)
+    return apply_card_filters(q, card_type, color, rarity, model=Card)
+
+
+def _item_from_listing(row: CardListing, by_version: bool) -> CardListItem:
+    return CardListItem(
+        card_number=row.card_number,
+        name=row.name,
+        card_type=row.card_type,
+        rarity=row.rarity,
+        colors=row.colors,
+        display_version_id=row.version_id if by_version else None,
+        source_description=row.source_description if by_version else None,
+        illustration_type=row.illustration_type if by_version else None,
+        has_star_mark=bool(row.has_star_mark) if by_version else False,
+        image_local_path=row.image_local_path,
+        image_original_url=row.image_original_url,
+        image_width=row.image_width,
+        image_height=row.image_height
+    )
+
+
+def paginate_card_list(lang: str, page: int, per_page: int, series_id: int = None,
+                       card_type: str = '', color: str = '', rarity: str = '',
+                       illustration: str = '', star: str = ''):
+    """
+    卡牌列表分页查询
+
+    选择了系列时按版本展示（包含平行卡/异画卡），
+    否则按卡片展示（每个卡号只显示一次，取首个版本的图片；
+    还没有版本的卡片从 cards 表 UNION ALL 补上）。
+    每次调用固定 2 条查询，与每页数量无关。
+
+    Returns:
+        (pagination, List[CardListItem])
+    """
+    q = CardListing.query.filter(CardListing.language == lang)
+    q = apply_card_filters(q, card_type, color, rarity)
+    version_conditions = _version_filters(illustration, star)
+
+    if series_id:
+        q = q.filter(CardListing.series_id == series_id, *version_conditions)
+        q = q.order_by(CardListing.card_number, CardListing.version_suffix)
+    else:
+        q = q.filter(CardListing.is_primary == True)
+        # 插画类型或星标筛选: 任一版本满足即可（没有版本的卡片不可能满足）
+        if version_conditions:
+            matching = db.session.query(CardListing.card_id)\
+                .filter(CardListing.language == lang, *version_conditions)
+            q = q.filter(CardListing.card_id.in_(matching))
+        else:
+            q = q.with_entities(*[getattr(CardListing, name) for name in _LISTING_COLUMNS])\
+                 .union_all(_versionless_cards(lang, card_type, color, rarity))
+        q = q.order_by(CardListing.card_number)
+
+    pagination = q.paginate(page=page, per_page=per_page, error_out=False)
+    items = [_item_from_listing(row, by_version=bool(series_id)) for row in pagination.items]
+    return pagination, items
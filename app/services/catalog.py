@@ -0,0 +1,98 @@
+"""
+目录数据 - 系列导航 / 语言统计（带缓存）
+
+这些数据只在爬虫或导入脚本运行后变化，页面渲染时从缓存读取。
+写入路径 (scrape_all / sync_data / DON 导入) 保存后调用 invalidate_catalog()。
+"""
+from typing import List, Optional
+
+from app.models.card import Card, CardVersion
+from app.models.series import Series
+from app.services.cache import cached, invalidate
+
+LANGUAGES = ('jp', 'en')
+
+# 侧边栏分组 (按定义顺序显示)
+SERIES_GROUP_NAMES = {
+    'booster': '📦 补充包 (Booster)',
+    'starter': '🎴 起始套牌 (Starter)',
+    'extra': '✨ 额外补充 (Extra)',
+    'premium': '👑 高级补充 (Premium)',
+    'promo': '🎁 促销卡 (Promo)',
+    'don': '🔴 DON卡 (DON!!)',
+    'limited': '🔒 限定商品 (Limited)',
+    'ultimate': '⚔️ 终极套牌 (Ultimate)',
+    'family': '👨‍👩‍👧 家庭套牌 (Family)',
+    'other': '📁 其他'
+}
+
+
+def _series_key(lang: str) -> str:
+    return f'catalog:series:{lang}'
+
+
+LANG_STATS_KEY = 'catalog:lang_stats'
+SITE_STATS_KEY = 'catalog:site_stats'
+
+
+def _load_series(lang: str) -> List[dict]:
+    rows = Series.query.filter_by(language=lang).order_by(Series.code.desc()).all()
+    return [{
+        'id': s.id,
+        'code': s.code,
+        'name': s.name,
+        'series_type': s.series_type,
+        'official_series_id': s.official_series_id,
+    } for s in rows]
+
+
+def get_series_list(lang: str) -> List[dict]:
+    """某语言的全部系列（按 code 倒序）"""
+    return cached(_series_key(lang), lambda: _load_series(lang))
+
+
+def find_series(lang: str, series_id: int) -> Optional[dict]:
+    """从缓存的系列列表中查找系列"""
+    for s in get_series_list(lang):
+        if s['id'] == series_id:
+            return s
+    return None
+
+
+def get_series_groups(lang: str) -> dict:
+    """系列分组数据（侧边栏树形导航）"""
+    groups = {}
+    for s in get_series_list(lang):
+        group_name = SERIES_GROUP_NAMES.get(s['series_type'], SERIES_GROUP_NAMES['other'])
+        groups.setdefault(group_name, []).append(s)
+
+    # 排序：按定义顺序
+    return {name: groups[name] for name in SERIES_GROUP_NAMES.values() if name in groups}
+
+
+def get_language_stats() -> dict:
+    """各语言卡片数"""
+    return cached(LANG_STATS_KEY, lambda: {
+        'jp_count': Card.query.filter_by(language='jp').count(),
+        'en_count': Card.query.filter_by(language='en').count()
+    })
+
+
+def get_site_stats() -> dict:
+    """首页统计"""
+    def load():
+        stats = {
+            'series_count': Series.query.count(),
+            'card_count': Card.query.count(),
+            'leader_count': Card.query.filter_by(card_type='LEADER').count(),
+            'version_count': CardVersion.query.count(),
+        }
+        stats.update(get_language_stats())
+        return stats
+
+    return cached(SITE_STATS_KEY, load)
+
+
+def invalidate_catalog():
+    """清除系列导航 / 统计缓存（新增系列或卡片后调用）"""
+    invalidate(LANG_STATS_KEY, SITE_STATS_KEY, *[_series_key(lang) for lang in LANGUAGES])
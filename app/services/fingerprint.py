@@ -0,0 +1,160 @@
+"""
+内容指纹 - 增量爬取
+
+scrape_all 原先跳过已有卡片的系列，否则整系列重新写库，发现不了已有系列中
+效果文本修改（勘误）、新增异画等变化。现在每次都抓取系列页，对每个卡片版本的
+解析结果（即 .modalCol 的内容）做规范化哈希，与 card_fingerprints 中上次的指纹比较:
+    系列汇总哈希未变    整个系列跳过写库
+    部分卡片变化        只把新增/变化的版本交给 ingest_cards()
+首发卡的勘误字段用 ERRATA_FIELDS 覆盖已有 Card；再录卡只补充缺失的版本/图片。
+"""
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from app import db
+from app.models.fingerprint import CardFingerprint, SeriesFingerprint
+from app.models.series import Series
+from app.services.ingest import IngestRecord, IngestResult, ingest_cards, is_reprint, to_record
+
+# 指纹不包含的字段（本地状态，不属于官网内容）
+IGNORED_FIELDS = ('image_local_path',)
+
+# 首发卡内容变化时覆盖到已有 Card 的字段（source_info / block_icon 因系列而异，不覆盖）
+ERRATA_FIELDS = (
+    'name', 'card_type', 'colors', 'cost', 'life', 'power', 'counter',
+    'attribute', 'traits', 'effect_text', 'trigger_text'
+)
+
+# 批量写入每批的行数
+FINGERPRINT_CHUNK_SIZE = 500
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _chunks(items: List, size: int = FINGERPRINT_CHUNK_SIZE) -> Iterable[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@dataclass
+class SeriesDiff:
+    """一个系列本次爬取结果与上次指纹的比较"""
+    series_hash: str
+    hashes: Dict[Tuple[str, str], str]
+    changed: List[IngestRecord] = field(default_factory=list)
+    new_count: int = 0
+    removed: List[Tuple[str, str]] = field(default_factory=list)
+    unchanged: bool = False
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return _WHITESPACE.sub(' ', value).strip()
+    return value
+
+
+def record_hash(record: IngestRecord) -> str:
+    """卡片版本内容指纹（字段规范化后的 JSON 的 SHA-1）"""
+    payload = {f.name: _normalize(getattr(record, f.name))
+               for f in fields(record) if f.name not in IGNORED_FIELDS}
+    data = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def series_hash(hashes: Dict[Tuple[str, str], str]) -> str:
+    """系列指纹: 所有 (卡号, 后缀, 指纹) 排序后的 SHA-1"""
+    digest = hashlib.sha1()
+    for (number, suffix), value in sorted(hashes.items()):
+        digest.update(f"{number}{suffix}:{value}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def diff_series(series: Series, items: Iterable) -> SeriesDiff:
+    """
+    比较爬取结果与已保存的指纹
+
+    Args:
+        series: 系列
+        items: CardData / CardDataEN / IngestRecord
+
+    Returns:
+        SeriesDiff；changed 为新增或内容变化的记录（同一版本重复出现时全部保留，交给 ingest 合并）
+    """
+    records = [to_record(item) for item in items]
+    hashes = {}
+    keyed = []
+    for record in records:
+        key = (record.card_number, record.version_suffix or '')
+        value = record_hash(record)
+        hashes.setdefault(key, value)
+        keyed.append((key, value, record))
+
+    diff = SeriesDiff(series_hash=series_hash(hashes), hashes=hashes)
+    stored_series = db.session.get(SeriesFingerprint, series.id)
+    if stored_series and stored_series.content_hash == diff.series_hash:
+        diff.unchanged = True
+        return diff
+
+    stored = {(fp.card_number, fp.version_suffix or ''): fp.content_hash
+              for fp in CardFingerprint.query.filter_by(series_id=series.id)}
+    changed_keys = set()
+    for key, value, record in keyed:
+        if stored.get(key) != value or key in changed_keys:
+            changed_keys.add(key)
+            diff.changed.append(record)
+    diff.new_count = sum(1 for key in changed_keys if key not in stored)
+    diff.removed = sorted(set(stored) - set(hashes))
+    return diff
+
+
+def save_fingerprints(series: Series, diff: SeriesDiff, now: datetime = None):
+    """保存本次的指纹（不提交事务）"""
+    now = now or datetime.utcnow()
+    stored_series = db.session.get(SeriesFingerprint, series.id)
+    if diff.unchanged:
+        stored_series.checked_at = now
+        return
+
+    table = CardFingerprint.__table__
+    db.session.execute(table.delete().where(table.c.series_id == series.id))
+    rows = [{
+        'series_id': series.id,
+        'card_number': number,
+        'version_suffix': suffix,
+        'content_hash': value,
+        'updated_at': now,
+    } for (number, suffix), value in diff.hashes.items()]
+    for chunk in _chunks(rows):
+        db.session.execute(table.insert(), chunk)
+
+    if stored_series is None:
+        stored_series = SeriesFingerprint(series_id=series.id)
+        db.session.add(stored_series)
+    stored_series.content_hash = diff.series_hash
+    stored_series.record_count = len(diff.hashes)
+    stored_series.checked_at = now
+    stored_series.changed_at = now
+
+
+def ingest_changed(series: Series, items: Iterable, lang: str) -> Tuple[IngestResult, SeriesDiff]:
+    """
+    只写入新增/变化的卡片版本并更新指纹（不提交事务，由调用方 publish_series）
+
+    Returns:
+        (IngestResult, SeriesDiff)
+    """
+    diff = diff_series(series, items)
+    result = IngestResult()
+    if diff.changed:
+        originals = [r for r in diff.changed if not is_reprint(r.card_number, series.code)]
+        reprints = [r for r in diff.changed if is_reprint(r.card_number, series.code)]
+        if originals:
+            result.merge(ingest_cards(series, originals, lang, update_fields=ERRATA_FIELDS))
+        if reprints:
+            result.merge(ingest_cards(series, reprints, lang))
+    save_fingerprints(series, diff)
+    return result, diff
@@ -0,0 +1,174 @@
+"""
+图片清单 - CardImage 与按内容寻址的 blob 的对应 (card_image_blobs)
+
+backfill_images() 找出还没有清单行（或 local_path 已指向别的 blob）的 CardImage，
+按 URL 去重后交给下载器并发下载，每批一次性写入 image_blobs / card_image_blobs，
+把 CardImage.local_path 改为 blob 地址并刷新列表读模型。
+已有本地文件（DON 卡、旧版按卡号命名的图片）直接导入 blob 存储，不重新下载。
+
+blob 存储和下载器由调用方传入 (scrapers.utils.images)，服务层不依赖爬虫模块；
+不传下载器时只登记已有 blob / 本地文件。
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import bindparam, or_
+
+from app import db
+from app.models.card import CardImage, CardVersion
+from app.models.image import CardImageBlob, ImageBlob
+from app.services.card_listing import refresh_listings
+
+# 每批处理的 CardImage 行数（下载完一批写库提交一次）
+IMAGE_BATCH_SIZE = 500
+
+# 读取本地文件导入 blob 存储时的分块大小
+FILE_CHUNK_SIZE = 64 * 1024
+
+_STATIC_ROOT = Path(__file__).parent.parent / 'static'
+
+
+@dataclass
+class ImageBackfillResult:
+    """一次图片回填的统计"""
+    images: int = 0
+    registered: int = 0
+    imported: int = 0
+    downloaded: int = 0
+    skipped: int = 0
+    failed: int = 0
+    blobs_created: int = 0
+    bytes: int = 0
+
+
+def _chunks(items: Sequence, size: int = IMAGE_BATCH_SIZE) -> Iterable[Sequence]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def local_file(local_path: Optional[str]) -> Optional[Path]:
+    """CardImage.local_path -> 磁盘文件（/static/... 或相对 static/images/cards/ 的旧路径）"""
+    if not local_path or local_path.startswith(('http://', 'https://')):
+        return None
+    if local_path.startswith('/static/'):
+        path = _STATIC_ROOT / local_path[len('/static/'):]
+    else:
+        path = _STATIC_ROOT / 'images' / 'cards' / local_path
+    return path if path.is_file() else None
+
+
+def pending_images(series_id: int = None, limit: int = None) -> List[tuple]:
+    """
+    需要回填的图片: 没有清单行，或 local_path 不再指向清单记录的 blob
+
+    Returns:
+        [(image_id, version_id, original_url, local_path)]
+    """
+    q = db.session.query(CardImage.id, CardImage.version_id, CardImage.original_url, CardImage.local_path)\
+        .outerjoin(CardImageBlob, CardImageBlob.image_id == CardImage.id)\
+        .filter(or_(CardImage.original_url.isnot(None), CardImage.local_path.isnot(None)))\
+        .filter(or_(
+            CardImageBlob.image_id.is_(None),
+            CardImage.local_path.is_(None),
+            ~CardImage.local_path.contains(CardImageBlob.sha1),
+        ))
+    if series_id:
+        q = q.join(CardVersion, CardImage.version_id == CardVersion.id)\
+             .filter(CardVersion.series_id == series_id)
+    q = q.order_by(CardImage.id)
+    if limit:
+        q = q.limit(limit)
+    return q.all()
+
+
+def _record_batch(stored: Dict[int, tuple], now: datetime):
+    """
+    写入一批结果（不提交事务）
+
+    Args:
+        stored: {image_id: (StoredImage, source_url)}
+    """
+    if not stored:
+        return 0
+    blobs = {s.sha1: s for s, _ in stored.values()}
+    existing = {sha for (sha,) in db.session.query(ImageBlob.sha1).filter(ImageBlob.sha1.in_(list(blobs)))}
+    new_blobs = [{'sha1': s.sha1, 'ext': s.ext, 'size': s.size, 'created_at': now}
+                 for sha, s in blobs.items() if sha not in existing]
+    if new_blobs:
+        db.session.execute(ImageBlob.__table__.insert(), new_blobs)
+
+    table = CardImageBlob.__table__
+    image_ids = list(stored)
+    db.session.execute(table.delete().where(table.c.image_id.in_(image_ids)))
+    db.session.execute(table.insert(), [{
+        'image_id': image_id,
+        'sha1': s.sha1,
+        'source_url': url,
+        'stored_at': now,
+    } for image_id, (s, url) in stored.items()])
+
+    images = CardImage.__table__
+    db.session.execute(
+        images.update().where(images.c.id == bindparam('row_id')).values(local_path=bindparam('path')),
+        [{'row_id': image_id, 'path': s.url} for image_id, (s, _) in stored.items()]
+    )
+    return len(new_blobs)
+
+
+def backfill_images(store, downloader=None, series_id: int = None, limit: int = None,
+                    batch_size: int = IMAGE_BATCH_SIZE) -> ImageBackfillResult:
+    """
+    下载/导入图片到 blob 存储并写入清单（每批提交）
+
+    Args:
+        store: BlobStore
+        downloader: ImageDownloader；None 时不下载，需要下载的图片计入 skipped
+        series_id: 只处理该系列的版本
+        limit: 最多处理的 CardImage 行数
+        batch_size: 每批行数
+
+    Returns:
+        ImageBackfillResult
+    """
+    result = ImageBackfillResult()
+    pending = pending_images(series_id, limit)
+    result.images = len(pending)
+
+    for batch in _chunks(pending, batch_size):
+        stored = {}
+        to_download = []
+        for image_id, version_id, url, local_path in batch:
+            parsed = store.parse_url(local_path)
+            known = store.find(parsed[0]) if parsed else None
+            if known:
+                stored[image_id] = (known, url)
+                result.registered += 1
+                continue
+            path = local_file(local_path)
+            if path:
+                with open(path, 'rb') as f:
+                    blob = store.write_stream(iter(lambda: f.read(FILE_CHUNK_SIZE), b''), path.suffix.lstrip('.').lower())
+                stored[image_id] = (blob, url)
+                result.imported += 1
+            elif url:
+                to_download.append((image_id, url))
+
+        if downloader is None:
+            result.skipped += len(to_download)
+            to_download = []
+        downloaded = downloader.download_many(url for _, url in to_download) if to_download else {}
+        for image_id, url in to_download:
+            if url in downloaded:
+                stored[image_id] = (downloaded[url], url)
+                result.downloaded += 1
+            else:
+                result.failed += 1
+        result.bytes += sum(s.size for s in downloaded.values() if s.created)
+
+        result.blobs_created += _record_batch(stored, datetime.utcnow())
+        refresh_listings(version_ids=list({row[1] for row in batch if row[0] in stored}))
+        db.session.commit()
+
+    return result
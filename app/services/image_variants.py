@@ -0,0 +1,220 @@
+"""
+图片缩略图 - 由 blob 生成 200px / 400px / 原尺寸的 WebP 与 JPEG
+
+原先 cdn_image 过滤器把每张官网图片都改写为 wsrv.nl 代理地址做缩放和 WebP 转换，
+列表页每次渲染都依赖第三方免费服务。现在入库时 (scrape_all --images /
+cli.py images --backfill) 用 Pillow 在本地生成缩略图，同时写入 CardImage.width/height。
+
+缩略图与 blob 一样按内容寻址: app/static/images/variants/ab/{sha1}_w200.webp，
+路径可由 blob 地址直接推出，过滤器不需要查库。
+"""
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PIL import Image
+from sqlalchemy import bindparam
+
+from app import db
+from app.models.card import CardImage, CardVersion
+from app.services.card_listing import refresh_listings
+from app.services.image_manifest import local_file
+
+_STATIC_ROOT = Path(__file__).parent.parent / 'static'
+VARIANT_ROOT = _STATIC_ROOT / 'images' / 'variants'
+VARIANT_URL_PREFIX = '/static/images/variants'
+BLOB_URL_PREFIX = '/static/images/blobs'
+
+# 缩略图宽度，None 为原尺寸
+VARIANT_WIDTHS = (200, 400, None)
+VARIANT_FORMATS = ('webp', 'jpg')
+QUALITY = 85
+
+# 官方卡图宽高比 (63 x 88 mm)，图片尺寸未知时使用
+CARD_ASPECT = 88 / 63
+
+# 每批更新 width/height 的行数
+VARIANT_BATCH_SIZE = 500
+DEFAULT_WORKERS = 4
+
+
+@dataclass
+class VariantResult:
+    """一次缩略图生成的统计"""
+    images: int = 0
+    blobs: int = 0
+    files_created: int = 0
+    failed: int = 0
+
+
+def _chunks(items: Sequence, size: int = VARIANT_BATCH_SIZE) -> Iterable[Sequence]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _blob_sha1(url: Optional[str]) -> Optional[str]:
+    """blob 地址 -> sha1；不是 blob 地址时返回 None"""
+    if not url or not url.startswith(BLOB_URL_PREFIX + '/'):
+        return None
+    sha1 = url.rsplit('/', 1)[-1].partition('.')[0]
+    return sha1 if len(sha1) == 40 else None
+
+
+def _variant_name(sha1: str, width: Optional[int], fmt: str) -> str:
+    return f"{sha1[:2]}/{sha1}_{f'w{width}' if width else 'full'}.{fmt}"
+
+
+def variant_path(sha1: str, width: Optional[int], fmt: str, root: Optional[Path] = None) -> Path:
+    return Path(root or VARIANT_ROOT) / _variant_name(sha1, width, fmt)
+
+
+def local_variant(url: Optional[str], width: Optional[int] = None, fmt: str = 'webp') -> Optional[str]:
+    """
+    blob 地址 -> 不小于 width 的最小缩略图地址
+
+    Returns:
+        缩略图 URL；不是 blob 地址或缩略图尚未生成时返回 None
+    """
+    sha1 = _blob_sha1(url)
+    if not sha1:
+        return None
+    size = next((w for w in VARIANT_WIDTHS if w and width and w >= width), None)
+    if not (VARIANT_ROOT / _variant_name(sha1, size, fmt)).is_file():
+        return None
+    return f'{VARIANT_URL_PREFIX}/{_variant_name(sha1, size, fmt)}'
+
+
+def thumbnail_size(width: Optional[int], height: Optional[int], target: int = 200) -> Tuple[int, int]:
+    """按原图比例缩放到 target 宽的显示尺寸；尺寸未知时按卡牌比例"""
+    if width and height:
+        return target, round(height * target / width)
+    return target, round(target * CARD_ASPECT)
+
+
+def _save(image: Image.Image, path: Path, fmt: str):
+    """写入临时文件后 rename，生成中途失败不会留下半个文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if fmt == 'jpg':
+                image.save(f, 'JPEG', quality=QUALITY, optimize=True, progressive=True)
+            else:
+                image.save(f, 'WEBP', quality=QUALITY, method=4)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def build_variants(source: Path, sha1: str, root: Optional[Path] = None,
+                   force: bool = False) -> Tuple[int, int, int]:
+    """
+    为一个 blob 生成全部缩略图（已存在的跳过，不放大小图）
+
+    Returns:
+        (原图宽, 原图高, 新生成的文件数)
+    """
+    created = 0
+    with Image.open(source) as original:
+        original.load()
+        width, height = original.size
+        if original.mode in ('RGBA', 'LA', 'P'):
+            rgba = original.convert('RGBA')
+            image = Image.new('RGB', rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        else:
+            image = original.convert('RGB')
+
+    for target in VARIANT_WIDTHS:
+        paths = {fmt: variant_path(sha1, target, fmt, root) for fmt in VARIANT_FORMATS}
+        todo = [fmt for fmt, path in paths.items() if force or not path.exists()]
+        if not todo:
+            continue
+        resized = image
+        if target and target < width:
+            resized = image.resize((target, round(height * target / width)), Image.LANCZOS)
+        for fmt in todo:
+            _save(resized, paths[fmt], fmt)
+            created += 1
+    return width, height, created
+
+
+def pending_variants(series_id: int = None, limit: int = None, force: bool = False) -> List[tuple]:
+    """
+    需要生成缩略图的图片: local_path 是 blob 地址且尚未记录宽高
+
+    Returns:
+        [(image_id, local_path)]
+    """
+    q = db.session.query(CardImage.id, CardImage.local_path)\
+        .filter(CardImage.local_path.like(BLOB_URL_PREFIX + '/%'))
+    if not force:
+        q = q.filter(CardImage.width.is_(None))
+    if series_id:
+        q = q.join(CardVersion, CardImage.version_id == CardVersion.id)\
+             .filter(CardVersion.series_id == series_id)
+    q = q.order_by(CardImage.id)
+    if limit:
+        q = q.limit(limit)
+    return q.all()
+
+
+def generate_variants(series_id: int = None, limit: int = None, force: bool = False,
+                      workers: int = DEFAULT_WORKERS, root: Optional[Path] = None,
+                      batch_size: int = VARIANT_BATCH_SIZE) -> VariantResult:
+    """
+    生成缩略图并写入 CardImage.width/height，同步刷新读模型中的首图尺寸（每批提交）
+
+    同一 blob 只处理一次；Pillow 缩放/编码时释放 GIL，用线程池并行。
+
+    Args:
+        series_id: 只处理该系列的版本
+        limit: 最多处理的 CardImage 行数
+        force: 重新生成已有的缩略图
+        workers: 并行数
+        root: 缩略图目录，默认 app/static/images/variants
+
+    Returns:
+        VariantResult
+    """
+    result = VariantResult()
+    pending = pending_variants(series_id, limit, force)
+    result.images = len(pending)
+
+    def build(local_path):
+        source = local_file(local_path)
+        if not source:
+            return None
+        try:
+            return build_variants(source, _blob_sha1(local_path), root, force)
+        except OSError:
+            return None
+
+    images = CardImage.__table__
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for batch in _chunks(pending, batch_size):
+            paths = list(dict.fromkeys(path for _, path in batch))
+            sizes: Dict[str, Tuple[int, int, int]] = dict(zip(paths, pool.map(build, paths)))
+            result.blobs += len(paths)
+            result.failed += sum(1 for s in sizes.values() if s is None)
+            result.files_created += sum(s[2] for s in sizes.values() if s)
+
+            rows = [{'row_id': image_id, 'w': sizes[path][0], 'h': sizes[path][1]}
+                    for image_id, path in batch if sizes[path]]
+            if rows:
+                db.session.execute(
+                    images.update().where(images.c.id == bindparam('row_id'))
+                          .values(width=bindparam('w'), height=bindparam('h')),
+                    rows
+                )
+                version_ids = [v for (v,) in db.session.query(CardImage.version_id)
+                               .filter(CardImage.id.in_([r['row_id'] for r in rows])).distinct()]
+                refresh_listings(version_ids=version_ids)
+            db.session.commit()
+
+    return result
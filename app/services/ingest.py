@@ -0,0 +1,373 @@
+"""
+卡片批量入库 - 所有爬虫/导入脚本共用
+
+原先 scrape_all / sync_data / DON 导入 / legacy 脚本各自逐张
+SELECT Card / card_series / CardVersion / CardImage 并 flush（约 5 次往返/张）。
+现在统一调用 ingest_cards()，每批记录只需固定数量的 IN 查询和批量写入:
+    cards        INSERT ... ON CONFLICT (card_number, language) DO NOTHING / DO UPDATE
+    card_series  INSERT ... ON CONFLICT (card_id, series_id) DO NOTHING
+    card_versions / card_images 没有唯一约束，先用 IN 查询解析已有行再批量插入
+SQLite 与 PostgreSQL 都支持 ON CONFLICT。重复入库是幂等的。
+
+写入完成后调用 publish_series() 刷新读模型/系列统计/检索索引、提交并清除目录缓存，
+各脚本不再各自维护这些钩子。
+"""
+from dataclasses import dataclass, fields
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam
+
+from app import db
+from app.models.card import Card, CardVersion, CardImage, card_series
+from app.models.series import Series
+from app.services.card_listing import refresh_listings
+from app.services.catalog import invalidate_catalog
+from app.services.search import index_cards
+from app.services.series_stats import refresh_series_stats
+
+# IN 查询 / 批量写入每批的行数
+INGEST_CHUNK_SIZE = 500
+
+# 新建 Card 时从记录复制的字段
+CARD_FIELDS = (
+    'name', 'card_type', 'rarity', 'colors', 'cost', 'life', 'power', 'counter',
+    'attribute', 'traits', 'effect_text', 'trigger_text', 'source_info', 'block_icon'
+)
+
+
+@dataclass
+class IngestRecord:
+    """
+    一条入库记录 = 一张卡片的一个版本
+    CardData / CardDataEN 通过 from_card_data() 转换；DON 等非官网来源直接构造。
+    """
+    card_number: str
+    name: str
+    card_type: str
+    rarity: str
+    colors: str = ''
+    cost: Optional[int] = None
+    life: Optional[int] = None
+    power: Optional[int] = None
+    counter: Optional[int] = None
+    attribute: Optional[str] = None
+    traits: Optional[str] = None
+    effect_text: Optional[str] = None
+    trigger_text: Optional[str] = None
+    source_info: Optional[str] = None
+    block_icon: Optional[int] = None
+
+    # 版本
+    version_suffix: str = ''
+    version_type: str = 'normal'
+    source_description: Optional[str] = None
+    illustration_type: Optional[str] = None
+    has_star_mark: bool = False
+
+    # 图片: 版本没有图片时新增；给出 image_local_path 时同时更新已有图片的本地路径
+    image_url: Optional[str] = None
+    image_local_path: Optional[str] = None
+
+    @classmethod
+    def from_card_data(cls, card_data) -> 'IngestRecord':
+        """官网爬虫的 CardData / CardDataEN -> IngestRecord"""
+        names = {f.name for f in fields(cls)}
+        values = {k: v for k, v in vars(card_data).items() if k in names}
+        values['colors'] = values.get('colors') or ''
+        values['has_star_mark'] = bool(values.get('has_star_mark'))
+        values['version_suffix'] = version_suffix(card_data)
+        values['version_type'] = 'normal' if card_data.version_index == 0 else 'alt_art'
+        values['source_description'] = card_data.source_info
+        return cls(**values)
+
+
+@dataclass
+class IngestResult:
+    """一次入库的统计"""
+    records: int = 0
+    cards_created: int = 0
+    cards_updated: int = 0
+    links_created: int = 0
+    versions_created: int = 0
+    versions_updated: int = 0
+    images_created: int = 0
+    images_updated: int = 0
+
+    def merge(self, other: 'IngestResult'):
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+def version_suffix(card_data) -> str:
+    """版本后缀: 第一个版本为空，其余为 _v{n}"""
+    return f"_v{card_data.version_index}" if card_data.version_index > 0 else ""
+
+
+def is_reprint(card_number: str, series_code: str) -> bool:
+    """卡号前缀与系列代码不一致时视为再录"""
+    card_prefix = card_number.split('-')[0] if '-' in card_number else ''
+    return card_prefix != series_code.replace('-', '')
+
+
+def to_record(item) -> IngestRecord:
+    return item if isinstance(item, IngestRecord) else IngestRecord.from_card_data(item)
+
+
+def _chunks(items: Sequence, size: int = INGEST_CHUNK_SIZE) -> Iterable[Sequence]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _insert(table):
+    """按方言返回支持 ON CONFLICT 的 INSERT"""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def _upsert(table, rows: List[dict], conflict_columns: Sequence[str],
+            update_columns: Sequence[str] = ()) -> int:
+    """
+    批量插入；冲突时跳过，或更新 update_columns
+
+    Returns:
+        驱动报告的影响行数（无法获取时为 0）
+    """
+    affected = 0
+    for chunk in _chunks(rows):
+        stmt = _insert(table)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(conflict_columns),
+                set_={c: stmt.excluded[c] for c in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        result = db.session.execute(stmt, list(chunk))
+        affected += max(result.rowcount or 0, 0)
+    return affected
+
+
+def _card_row(record: IngestRecord, series_id: int, lang: str) -> dict:
+    row = {field: getattr(record, field) for field in CARD_FIELDS}
+    row['colors'] = row['colors'] or ''
+    row.update(card_number=record.card_number, language=lang, series_id=series_id)
+    return row
+
+
+def _resolve_card_ids(card_numbers: List[str], lang: str) -> Dict[str, int]:
+    ids = {}
+    for chunk in _chunks(card_numbers):
+        rows = db.session.query(Card.card_number, Card.id)\
+            .filter(Card.language == lang, Card.card_number.in_(chunk))
+        ids.update(dict(rows))
+    return ids
+
+
+def _existing_versions(series_id: int, card_ids: List[int]) -> Dict[Tuple[int, str], tuple]:
+    """{(card_id, version_suffix): (id, illustration_type, has_star_mark)}"""
+    existing = {}
+    for chunk in _chunks(sorted(card_ids)):
+        rows = db.session.query(
+            CardVersion.card_id, CardVersion.version_suffix, CardVersion.id,
+            CardVersion.illustration_type, CardVersion.has_star_mark
+        ).filter(CardVersion.series_id == series_id, CardVersion.card_id.in_(chunk))\
+         .order_by(CardVersion.id)
+        for card_id, suffix, version_id, illustration, star in rows:
+            # 同键多行时与 .first() 一致取最早的
+            existing.setdefault((card_id, suffix or ''), (version_id, illustration, star))
+    return existing
+
+
+def _first_images(version_ids: List[int]) -> Dict[int, int]:
+    """{version_id: 第一张图片 id}"""
+    found = {}
+    for chunk in _chunks(sorted(version_ids)):
+        rows = db.session.query(CardImage.version_id, CardImage.id)\
+            .filter(CardImage.version_id.in_(chunk))\
+            .order_by(CardImage.id)
+        for version_id, image_id in rows:
+            found.setdefault(version_id, image_id)
+    return found
+
+
+def _bulk_update(table, rows: List[dict], column: str):
+    """按 id 批量更新单列: rows = [{'row_id': ..., 'value': ...}]"""
+    if rows:
+        db.session.execute(
+            table.update().where(table.c.id == bindparam('row_id')).values({column: bindparam('value')}),
+            rows
+        )
+
+
+def _ingest_chunk(series: Series, records: List[IngestRecord], lang: str,
+                  link_series: bool, update_fields: Sequence[str]) -> IngestResult:
+    result = IngestResult(records=len(records))
+
+    # 1. 卡片（同一卡号的多个版本以第一条为准）
+    first_by_number = {}
+    for record in records:
+        first_by_number.setdefault(record.card_number, record)
+    card_rows = [_card_row(r, series.id, lang) for r in first_by_number.values()]
+
+    if update_fields:
+        existing_numbers = set(_resolve_card_ids(list(first_by_number), lang))
+        _upsert(Card.__table__, card_rows, ('card_number', 'language'), update_fields)
+        result.cards_created = len(first_by_number) - len(existing_numbers)
+        result.cards_updated = len(existing_numbers)
+    else:
+        result.cards_created = _upsert(Card.__table__, card_rows, ('card_number', 'language'))
+    card_ids = _resolve_card_ids(list(first_by_number), lang)
+
+    # 2. 卡片-系列关联
+    if link_series:
+        result.links_created = _upsert(card_series, [{
+            'card_id': card_ids[number],
+            'series_id': series.id,
+            'is_reprint': is_reprint(number, series.code),
+            'source_info': record.source_info,
+        } for number, record in first_by_number.items()], ('card_id', 'series_id'))
+
+    # 3. 版本: 已有版本只补充缺失的插画类型/星标
+    existing = _existing_versions(series.id, list(card_ids.values()))
+    new_versions = {}
+    updates = {}
+    for record in records:
+        key = (card_ids[record.card_number], record.version_suffix or '')
+        if key in existing:
+            version_id, current_illustration, current_star = existing[key]
+            change = updates.setdefault(version_id, {})
+            if not current_illustration and record.illustration_type and 'illustration_type' not in change:
+                change['illustration_type'] = record.illustration_type
+            if not current_star and record.has_star_mark:
+                change['has_star_mark'] = True
+        elif key in new_versions:
+            # 同一批次重复出现的版本: 只补充缺失字段
+            version = new_versions[key]
+            version['illustration_type'] = version['illustration_type'] or record.illustration_type
+            version['has_star_mark'] = version['has_star_mark'] or bool(record.has_star_mark)
+        else:
+            new_versions[key] = {
+                'card_id': key[0],
+                'series_id': series.id,
+                'version_suffix': key[1],
+                'version_type': record.version_type,
+                'source_description': record.source_description,
+                'illustration_type': record.illustration_type,
+                'has_star_mark': bool(record.has_star_mark),
+            }
+
+    for chunk in _chunks(list(new_versions.values())):
+        db.session.execute(CardVersion.__table__.insert(), list(chunk))
+    result.versions_created = len(new_versions)
+
+    for field in ('illustration_type', 'has_star_mark'):
+        _bulk_update(CardVersion.__table__, [
+            {'row_id': vid, 'value': change[field]}
+            for vid, change in updates.items() if field in change
+        ], field)
+    result.versions_updated = sum(1 for change in updates.values() if change)
+
+    # 4. 图片（重新解析版本 id，包含刚插入的新版本）
+    images = {}
+    for record in records:
+        if record.image_url or record.image_local_path:
+            key = (card_ids[record.card_number], record.version_suffix or '')
+            images.setdefault(key, record)
+    if not images:
+        return result
+
+    versions = _existing_versions(series.id, list({key[0] for key in images}))
+    first_images = _first_images([v[0] for v in versions.values()])
+    image_rows = []
+    local_path_updates = []
+    for key, record in images.items():
+        version_id = versions[key][0]
+        if version_id not in first_images:
+            image_rows.append({
+                'version_id': version_id,
+                'original_url': record.image_url,
+                'local_path': record.image_local_path,
+            })
+        elif record.image_local_path:
+            local_path_updates.append({'row_id': first_images[version_id], 'value': record.image_local_path})
+
+    for chunk in _chunks(image_rows):
+        db.session.execute(CardImage.__table__.insert(), list(chunk))
+    _bulk_update(CardImage.__table__, local_path_updates, 'local_path')
+    result.images_created = len(image_rows)
+    result.images_updated = len(local_path_updates)
+
+    return result
+
+
+def ingest_cards(series: Series, items: Iterable, lang: str, link_series: bool = True,
+                 update_fields: Sequence[str] = (), chunk_size: int = INGEST_CHUNK_SIZE) -> IngestResult:
+    """
+    批量写入一个系列的卡片版本（不提交事务，由调用方 commit / publish_series）
+
+    语义与原逐张保存相同: 已有 Card 默认不覆盖；已有版本只补充缺失的插画类型/星标；
+    每个版本最多补一条图片记录。
+
+    Args:
+        series: 版本所属系列
+        items: CardData / CardDataEN / IngestRecord 的可迭代对象（可以是生成器）
+        lang: jp / en
+        link_series: 是否写入 card_series 关联 (DON 卡不关联)
+        update_fields: 已有 Card 需要用新数据覆盖的字段 (ON CONFLICT DO UPDATE)
+        chunk_size: 每批处理的记录数
+
+    Returns:
+        IngestResult
+    """
+    unknown = set(update_fields) - set(CARD_FIELDS)
+    if unknown:
+        raise ValueError(f"不支持更新的字段: {sorted(unknown)}")
+
+    result = IngestResult()
+    iterator = iter(items)
+    while True:
+        chunk = [to_record(item) for item in islice(iterator, chunk_size)]
+        if not chunk:
+            break
+        result.merge(_ingest_chunk(series, chunk, lang, link_series, update_fields))
+    return result
+
+
+def get_or_create_series(code: str, language: str, name: str, series_type: str,
+                         official_series_id: str = None) -> Tuple[Series, bool]:
+    """
+    按 code + language 获取系列，不存在时创建（flush，不提交）
+
+    Returns:
+        (series, 是否新建)
+    """
+    series = Series.query.filter_by(code=code, language=language).first()
+    if series:
+        return series, False
+
+    series = Series(
+        code=code,
+        name=name,
+        official_series_id=official_series_id,
+        series_type=series_type,
+        language=language
+    )
+    db.session.add(series)
+    db.session.flush()
+    return series, True
+
+
+def publish_series(series_ids: Sequence[int]):
+    """
+    入库完成后统一收尾: 刷新列表读模型 / 系列统计 / 检索索引，提交事务，清除目录缓存
+    """
+    ids = list(series_ids)
+    refresh_listings(series_ids=ids)
+    refresh_series_stats(ids)
+    index_cards(series_ids=ids)
+    db.session.commit()
+    invalidate_catalog()
@@ -0,0 +1,214 @@
+"""
+价格分析 - 基于 NumPy 的列式计算
+
+波动率、移动平均、异画与普通版相关性、系列指数等分析需要整段价格历史，
+逐行读取 ORM 对象太慢。这里一次查询取回 (version_id, recorded_at, price) 三列，
+放进 版本 × 日期 的二维数组（当天无价格为 NaN），所有指标对整个数组向量化计算。
+
+同一版本同一天有多条记录（多个来源）时取平均值。
+"""
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from app import db
+from app.models.price import PriceHistory
+
+# 年化波动率使用的天数（卡牌市场每天都有成交）
+TRADING_DAYS = 365
+
+# IN 查询每批的版本数
+ANALYTICS_CHUNK_SIZE = 500
+
+
+def _chunks(items: List, size: int = ANALYTICS_CHUNK_SIZE) -> Iterable[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@dataclass
+class PriceMatrix:
+    """
+    版本 × 日期 的日价格矩阵
+
+    version_ids: (n,) 版本ID，升序
+    dates: (t,) datetime64[D]，连续日期
+    prices: (n, t) float64，NaN 表示当天无价格
+    """
+    version_ids: np.ndarray
+    dates: np.ndarray
+    prices: np.ndarray
+
+    def row(self, version_id: int) -> np.ndarray:
+        """单个版本的价格序列；版本不在矩阵中时全部为 NaN"""
+        index = np.searchsorted(self.version_ids, version_id)
+        if index < len(self.version_ids) and self.version_ids[index] == version_id:
+            return self.prices[index]
+        return np.full(len(self.dates), np.nan)
+
+    def date_strings(self) -> List[str]:
+        return [str(d) for d in self.dates]
+
+    def constituents(self) -> int:
+        """至少有一个价格的版本数"""
+        return int((~np.isnan(self.prices)).any(axis=-1).sum()) if self.prices.size else 0
+
+
+def load_prices(version_ids: List[int] = None, days: Optional[int] = None,
+                currency: str = 'USD', source: str = None) -> PriceMatrix:
+    """
+    读取价格历史为日价格矩阵
+
+    Args:
+        version_ids: 只读取这些版本；None 表示全部版本
+        days: 只读取最近 days 天；None 表示全部历史
+        currency: 货币（不同货币不可混算）
+        source: 只读取该来源；None 表示全部来源（同日取平均）
+    """
+    stmt = select(PriceHistory.version_id, PriceHistory.recorded_at, PriceHistory.price)\
+        .where(PriceHistory.currency == currency)
+    if source:
+        stmt = stmt.where(PriceHistory.source == source)
+    if days is not None:
+        stmt = stmt.where(PriceHistory.recorded_at >= datetime.utcnow() - timedelta(days=days))
+
+    if version_ids is None:
+        rows = db.session.execute(stmt).all()
+    else:
+        rows = []
+        for chunk in _chunks(sorted(set(version_ids))):
+            rows.extend(db.session.execute(stmt.where(PriceHistory.version_id.in_(chunk))).all())
+
+    if not rows:
+        return PriceMatrix(np.array(version_ids or [], dtype=np.int64),
+                           np.array([], dtype='datetime64[D]'),
+                           np.empty((len(version_ids or []), 0)))
+
+    vids, recorded, prices = zip(*rows)
+    day = np.array(recorded, dtype='datetime64[D]')
+    start, end = day.min(), day.max()
+    dates = np.arange(start, end + 1)
+
+    if version_ids is None:
+        ids, row_index = np.unique(np.array(vids, dtype=np.int64), return_inverse=True)
+    else:
+        ids = np.array(sorted(set(version_ids)), dtype=np.int64)
+        row_index = np.searchsorted(ids, np.array(vids, dtype=np.int64))
+    col_index = (day - start).astype(np.int64)
+
+    totals = np.zeros((len(ids), len(dates)))
+    counts = np.zeros((len(ids), len(dates)))
+    np.add.at(totals, (row_index, col_index), np.array(prices, dtype=np.float64))
+    np.add.at(counts, (row_index, col_index), 1)
+    with np.errstate(invalid='ignore'):
+        matrix = totals / counts
+    return PriceMatrix(ids, dates, matrix)
+
+
+def forward_fill(prices: np.ndarray) -> np.ndarray:
+    """沿最后一维用前一个有效价格填充 NaN（开头的 NaN 保留）"""
+    prices = np.asarray(prices, dtype=np.float64)
+    valid = ~np.isnan(prices)
+    index = np.where(valid, np.arange(prices.shape[-1]), 0)
+    np.maximum.accumulate(index, axis=-1, out=index)
+    # 第一个有效价格之前的位置取到第 0 列，仍为 NaN
+    return np.take_along_axis(prices, index, axis=-1)
+
+
+def _window_sums(values: np.ndarray, window: int):
+    """沿最后一维的滑动窗口 (有效个数, 和, 平方和)，与输入对齐，前 window-1 个位置为 0"""
+    valid = ~np.isnan(values)
+    clean = np.where(valid, values, 0.0)
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    sums = []
+    for series in (valid.astype(np.float64), clean, clean * clean):
+        cum = np.pad(np.cumsum(series, axis=-1), pad)
+        windowed = cum[..., window:] - cum[..., :-window]
+        sums.append(np.concatenate([np.zeros(values.shape[:-1] + (window - 1,)), windowed], axis=-1))
+    return sums
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """滑动平均；窗口内有 NaN 或不足 window 个点时为 NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    if window < 1:
+        raise ValueError("window 必须大于 0")
+    if values.shape[-1] < window:
+        return np.full(values.shape, np.nan)
+    count, total, _ = _window_sums(values, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count == window, total / window, np.nan)
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """滑动样本标准差 (ddof=1)；窗口内有 NaN 或不足 window 个点时为 NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    if window < 2:
+        raise ValueError("window 必须大于 1")
+    if values.shape[-1] < window:
+        return np.full(values.shape, np.nan)
+    count, total, squares = _window_sums(values, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (squares - total * total / window) / (window - 1)
+        return np.where(count == window, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    """日对数收益率（先向前填充），与输入对齐，第一列为 NaN"""
+    filled = forward_fill(prices)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.log(filled[..., 1:] / filled[..., :-1])
+    returns[~np.isfinite(returns)] = np.nan
+    first = np.full(filled.shape[:-1] + (1,), np.nan)
+    return np.concatenate([first, returns], axis=-1)
+
+
+def volatility(prices: np.ndarray, window: int = 30) -> np.ndarray:
+    """年化滑动波动率: 日对数收益率的滑动标准差 × sqrt(TRADING_DAYS)"""
+    return rolling_std(log_returns(prices), window) * math.sqrt(TRADING_DAYS)
+
+
+def correlation(a: np.ndarray, b: np.ndarray, min_points: int = 3) -> Optional[float]:
+    """两条价格序列日对数收益率的皮尔逊相关系数；共同有效点不足 min_points 时为 None"""
+    ra, rb = log_returns(a), log_returns(b)
+    both = ~np.isnan(ra) & ~np.isnan(rb)
+    if both.sum() < min_points:
+        return None
+    ra, rb = ra[both], rb[both]
+    if ra.std() == 0 or rb.std() == 0:
+        return None
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def series_index(matrix: PriceMatrix, base: float = 100.0) -> np.ndarray:
+    """
+    等权链式价格指数
+
+    每天取前后两天都有价格（向前填充后）的成分版本的平均日收益率，连乘得到指数，起点为 base。
+    没有可比成分的日子指数不变。
+    """
+    if matrix.prices.shape[-1] == 0:
+        return np.array([])
+    filled = forward_fill(matrix.prices)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        simple = filled[:, 1:] / filled[:, :-1] - 1.0
+    simple[~np.isfinite(simple)] = np.nan
+    valid = ~np.isnan(simple)
+    count = valid.sum(axis=0)
+    daily = np.where(count > 0, np.where(valid, simple, 0.0).sum(axis=0) / np.maximum(count, 1), 0.0)
+    return base * np.concatenate([[1.0], np.cumprod(1.0 + daily)])
+
+
+def last_valid(values: np.ndarray, digits: int = 4) -> Optional[float]:
+    """最后一个有效值；全部为 NaN 时为 None"""
+    valid = values[~np.isnan(values)]
+    return round(float(valid[-1]), digits) if valid.size else None
+
+
+def to_json(values: np.ndarray, digits: int = 4) -> List[Optional[float]]:
+    """数组转 JSON 列表，NaN 转为 None"""
+    return [None if math.isnan(v) else round(v, digits) for v in np.asarray(values, dtype=np.float64).tolist()]
@@ -0,0 +1,137 @@
+"""
+价格批量入库 - update_prices_in_db 的写入路径
+
+原先每条价格依次查询 Card、card.versions、当天是否已有记录（func.date(recorded_at)
+无法使用 idx_price_version_source_time），再逐条 add。
+现在每批记录只需固定数量的语句:
+    卡号 -> 版本      一次 JOIN + IN 查询
+    当天已有记录      一次按 (version_id IN, source, recorded_at 区间) 的范围查询
+    新记录            一次批量 INSERT
+新记录同时写入 price_latest 快照 (app.services.price_latest)。
+写入不提交事务，由调用方 commit。
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from app import db
+from app.models.card import Card, CardVersion
+from app.models.price import PriceHistory
+from app.services.price_latest import record_latest
+
+# IN 查询 / 批量写入每批的行数
+PRICE_CHUNK_SIZE = 500
+
+
+@dataclass
+class PriceWriteResult:
+    """一次价格入库的统计"""
+    records: int = 0
+    inserted: int = 0
+    skipped_no_price: int = 0
+    skipped_no_card: int = 0
+    skipped_existing: int = 0
+    version_ids: List[int] = field(default_factory=list)
+
+
+def _chunks(items: Sequence, size: int = PRICE_CHUNK_SIZE) -> Iterable[Sequence]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _version_map(card_numbers: List[str], lang: str) -> Dict[str, Dict[str, int]]:
+    """
+    {card_number: {version_type: 最早的版本id, None: 该卡最早的版本id}}
+
+    与原 card.versions.filter_by(version_type=...).first() / card.versions.first() 的取法一致
+    """
+    versions = {}
+    for chunk in _chunks(card_numbers):
+        rows = db.session.query(Card.card_number, CardVersion.version_type, CardVersion.id)\
+            .join(CardVersion, CardVersion.card_id == Card.id)\
+            .filter(Card.language == lang, Card.card_number.in_(chunk))\
+            .order_by(CardVersion.id)
+        for number, version_type, version_id in rows:
+            by_type = versions.setdefault(number, {})
+            by_type.setdefault(version_type, version_id)
+            by_type.setdefault(None, version_id)
+    return versions
+
+
+def _recorded_on(version_ids: List[int], source: str, day) -> set:
+    """当天已有 source 价格记录的版本（范围条件，可走 idx_price_version_source_time）"""
+    start = datetime.combine(day, time.min)
+    end = start + timedelta(days=1)
+    found = set()
+    for chunk in _chunks(sorted(version_ids)):
+        rows = db.session.query(PriceHistory.version_id).filter(
+            PriceHistory.version_id.in_(chunk),
+            PriceHistory.source == source,
+            PriceHistory.recorded_at >= start,
+            PriceHistory.recorded_at < end,
+        ).distinct()
+        found.update(v for (v,) in rows)
+    return found
+
+
+def write_prices(prices: Iterable[dict], source: str = 'optcg_api', currency: str = 'USD',
+                 lang: str = 'jp', recorded_at: Optional[datetime] = None) -> PriceWriteResult:
+    """
+    批量写入价格记录，每个版本每天每个来源最多一条（不提交事务）
+
+    Args:
+        prices: PriceScraper 返回的价格数据
+        source: 价格来源
+        currency: 货币
+        lang: 卡片语言
+        recorded_at: 记录时间，默认当前 UTC 时间
+
+    Returns:
+        PriceWriteResult；version_ids 为新写入价格的版本，供刷新读模型
+    """
+    recorded_at = recorded_at or datetime.utcnow()
+    prices = list(prices)
+    result = PriceWriteResult(records=len(prices))
+
+    valid = [p for p in prices if p.get('market_price')]
+    result.skipped_no_price = len(prices) - len(valid)
+
+    versions = _version_map(sorted({p['card_number'] for p in valid if p.get('card_number')}), lang)
+
+    # 同一版本在本批中只取第一条价格
+    new_prices = {}
+    for price_data in valid:
+        by_type = versions.get(price_data.get('card_number'))
+        if not by_type:
+            result.skipped_no_card += 1
+            continue
+        version_type = 'alt_art' if price_data.get('is_alt_art') else 'normal'
+        version_id = by_type.get(version_type, by_type[None])
+        if version_id in new_prices:
+            result.skipped_existing += 1
+            continue
+        new_prices[version_id] = price_data
+
+    existing = _recorded_on(list(new_prices), source, recorded_at.date())
+    rows = []
+    for version_id, price_data in new_prices.items():
+        if version_id in existing:
+            result.skipped_existing += 1
+            continue
+        rows.append({
+            'version_id': version_id,
+            'source': source,
+            'currency': currency,
+            'price': price_data['market_price'],
+            'condition': 'unsealed',
+            'price_type': 'average',
+            'listing_count': price_data.get('listing_count'),
+            'recorded_at': recorded_at,
+        })
+
+    for chunk in _chunks(rows):
+        db.session.execute(PriceHistory.__table__.insert(), list(chunk))
+    record_latest(rows)
+    result.inserted = len(rows)
+    result.version_ids = [row['version_id'] for row in rows]
+    return result
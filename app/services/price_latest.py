@@ -0,0 +1,193 @@
+"""
+最新价格快照 - price_latest 表
+
+价格列表 / 收藏统计 / 卡片详情 / 列表读模型原先对 price_history 做
+max(recorded_at) 分组子查询或逐版本 order_by(recorded_at.desc()).first()，
+耗时随历史增长。现在读取 PriceLatest（每个版本/来源/货币一行）。
+写入路径 write_prices() 调用 record_latest() 增量维护；
+`python scripts/cli.py listings --rebuild` 时由 rebuild_latest() 从历史全量重建。
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func
+
+from app import db
+from app.models.price import PriceHistory, PriceLatest
+
+# IN 查询 / 批量写入每批的行数
+LATEST_CHUNK_SIZE = 500
+
+
+def _chunks(items: List, size: int = LATEST_CHUNK_SIZE) -> Iterable[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def change_pct(price: Optional[float], previous: Optional[float]) -> Optional[float]:
+    """涨跌幅 (%)；没有上一次价格时为 None"""
+    if price is None or not previous:
+        return None
+    return round((price - previous) / previous * 100, 2)
+
+
+def _snapshot_row(version_id: int, source: str, currency: str, price: float, recorded_at,
+                  previous_price: Optional[float] = None, previous_recorded_at=None,
+                  listing_count: Optional[int] = None) -> dict:
+    return {
+        'version_id': version_id,
+        'source': source,
+        'currency': currency,
+        'price': price,
+        'recorded_at': recorded_at,
+        'previous_price': previous_price,
+        'previous_recorded_at': previous_recorded_at,
+        'change_pct': change_pct(price, previous_price),
+        'listing_count': listing_count,
+    }
+
+
+def _replace(rows: List[dict]):
+    """按 (version_id, source, currency) 删除旧快照后批量插入"""
+    table = PriceLatest.__table__
+    by_key = defaultdict(list)
+    for row in rows:
+        by_key[(row['source'], row['currency'])].append(row)
+    for (source, currency), group in by_key.items():
+        for chunk in _chunks(group):
+            db.session.execute(table.delete().where(and_(
+                table.c.source == source,
+                table.c.currency == currency,
+                table.c.version_id.in_([row['version_id'] for row in chunk]),
+            )))
+            db.session.execute(table.insert(), chunk)
+
+
+def record_latest(price_rows: List[dict]) -> int:
+    """
+    用新写入的价格记录更新快照（不提交事务）
+
+    Args:
+        price_rows: PriceHistory 行 (version_id / source / currency / price / recorded_at)
+
+    Returns:
+        更新的快照行数；比现有快照更早的记录（补录历史）不会覆盖快照
+    """
+    if not price_rows:
+        return 0
+
+    # 同一键只取本批最新的一条
+    newest = {}
+    for row in price_rows:
+        key = (row['version_id'], row['source'], row['currency'])
+        if key not in newest or row['recorded_at'] >= newest[key]['recorded_at']:
+            newest[key] = row
+
+    existing = {}
+    version_ids = sorted({key[0] for key in newest})
+    for chunk in _chunks(version_ids):
+        for snap in PriceLatest.query.filter(PriceLatest.version_id.in_(chunk)):
+            existing[(snap.version_id, snap.source, snap.currency)] = snap
+
+    rows = []
+    for key, row in newest.items():
+        current = existing.get(key)
+        if current is None:
+            rows.append(_snapshot_row(*key, row['price'], row['recorded_at'],
+                                      listing_count=row.get('listing_count')))
+        elif row['recorded_at'] > current.recorded_at:
+            rows.append(_snapshot_row(*key, row['price'], row['recorded_at'],
+                                      current.price, current.recorded_at, row.get('listing_count')))
+
+    _replace(rows)
+    return len(rows)
+
+
+def rebuild_latest(version_ids: List[int] = None) -> int:
+    """
+    从 price_history 重建快照（不提交事务）
+
+    Args:
+        version_ids: 只重建这些版本；None 表示全量重建
+
+    Returns:
+        快照行数
+    """
+    table = PriceLatest.__table__
+    if version_ids is None:
+        db.session.execute(table.delete())
+        return _rebuild_chunk(None)
+
+    total = 0
+    for chunk in _chunks(sorted(set(version_ids))):
+        db.session.execute(table.delete().where(table.c.version_id.in_(chunk)))
+        total += _rebuild_chunk(chunk)
+    return total
+
+
+def _rebuild_chunk(version_ids: Optional[List[int]]) -> int:
+    """每个 (版本, 来源, 货币) 取最近两条价格（窗口函数，一条语句）"""
+    rank = func.row_number().over(
+        partition_by=(PriceHistory.version_id, PriceHistory.source, PriceHistory.currency),
+        order_by=(PriceHistory.recorded_at.desc(), PriceHistory.id.desc())
+    ).label('rank')
+    q = db.session.query(
+        PriceHistory.version_id, PriceHistory.source, PriceHistory.currency,
+        PriceHistory.price, PriceHistory.recorded_at, PriceHistory.listing_count, rank
+    )
+    if version_ids is not None:
+        q = q.filter(PriceHistory.version_id.in_(version_ids))
+    ranked = q.subquery()
+
+    latest = {}
+    previous = {}
+    for r in db.session.query(ranked).filter(ranked.c.rank <= 2):
+        key = (r.version_id, r.source, r.currency)
+        (latest if r.rank == 1 else previous)[key] = r
+
+    rows = []
+    for key, r in latest.items():
+        prev = previous.get(key)
+        rows.append(_snapshot_row(*key, r.price, r.recorded_at,
+                                  prev.price if prev else None, prev.recorded_at if prev else None,
+                                  r.listing_count))
+
+    for chunk in _chunks(rows):
+        db.session.execute(PriceLatest.__table__.insert(), chunk)
+    return len(rows)
+
+
+def current_prices(currency: str = None):
+    """
+    每个版本一行的当前价格子查询（多个来源时取最新的一条）
+
+    列: version_id / source / currency / price / recorded_at / previous_price / change_pct
+    """
+    rank = func.row_number().over(
+        partition_by=PriceLatest.version_id,
+        order_by=PriceLatest.recorded_at.desc()
+    ).label('rank')
+    q = db.session.query(
+        PriceLatest.version_id, PriceLatest.source, PriceLatest.currency, PriceLatest.price,
+        PriceLatest.recorded_at, PriceLatest.previous_price, PriceLatest.change_pct, rank
+    )
+    if currency:
+        q = q.filter(PriceLatest.currency == currency)
+    ranked = q.subquery()
+    return db.session.query(ranked).filter(ranked.c.rank == 1).subquery()
+
+
+def latest_by_version(version_ids: List[int]) -> Dict[int, PriceLatest]:
+    """
+    批量获取每个版本的当前价格快照（多个来源时取最新的一条）
+
+    Returns:
+        {version_id: PriceLatest}
+    """
+    found = {}
+    for chunk in _chunks(sorted(set(version_ids))):
+        rows = PriceLatest.query.filter(PriceLatest.version_id.in_(chunk))\
+            .order_by(PriceLatest.recorded_at)
+        for snap in rows:
+            found[snap.version_id] = snap
+    return found
@@ -0,0 +1,149 @@
+"""
+价格涨跌榜 - price_movers 表
+
+prices.trending 需要按 1d / 7d / 30d 区间比较当前价格与区间起点价格。
+请求时对 price_history 计算代价太大，改为 update_prices_in_db 之后调用 refresh_movers() 重算，
+页面和 JSON 接口按 (period, [series_id | rarity], change_pct) 索引单表查询。
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+
+from app import db
+from app.models.card import Card, CardVersion
+from app.models.price import PriceHistory, PriceLatest, PriceMover
+from app.services.price_latest import change_pct
+
+# 区间 -> 天数
+PERIODS = {
+    '1d': 1,
+    '7d': 7,
+    '30d': 30,
+}
+DEFAULT_PERIOD = '7d'
+
+# 区间起点没有价格时，最多向前再找几天
+BASE_LOOKBACK_DAYS = 7
+
+# 批量写入每批的行数
+MOVER_CHUNK_SIZE = 500
+
+
+def _chunks(items: List, size: int = MOVER_CHUNK_SIZE) -> Iterable[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _base_prices(cutoff: datetime) -> Dict[tuple, tuple]:
+    """
+    每个 (版本, 来源, 货币) 在 cutoff 时刻的价格（cutoff 之前最近的一条，一条语句）
+
+    只扫描 [cutoff - BASE_LOOKBACK_DAYS, cutoff] 区间的记录
+
+    Returns:
+        {(version_id, source, currency): (price, recorded_at)}
+    """
+    rank = func.row_number().over(
+        partition_by=(PriceHistory.version_id, PriceHistory.source, PriceHistory.currency),
+        order_by=(PriceHistory.recorded_at.desc(), PriceHistory.id.desc())
+    ).label('rank')
+    ranked = db.session.query(
+        PriceHistory.version_id, PriceHistory.source, PriceHistory.currency,
+        PriceHistory.price, PriceHistory.recorded_at, rank
+    ).filter(
+        PriceHistory.recorded_at <= cutoff,
+        PriceHistory.recorded_at >= cutoff - timedelta(days=BASE_LOOKBACK_DAYS)
+    ).subquery()
+
+    rows = db.session.query(ranked).filter(ranked.c.rank == 1)
+    return {(r.version_id, r.source, r.currency): (r.price, r.recorded_at) for r in rows}
+
+
+def refresh_movers(now: Optional[datetime] = None) -> int:
+    """
+    全量重算涨跌榜（不提交事务）
+
+    当前价格取 price_latest；区间起点价格取 now - 区间 时刻之前最近的原始记录。
+    当前价格早于区间起点（区间内没有新价格）或起点价格为 0 的版本不上榜。
+
+    Returns:
+        写入的行数
+    """
+    now = now or datetime.utcnow()
+
+    current = db.session.query(
+        PriceLatest, Card.id, Card.card_number, Card.name, Card.rarity,
+        CardVersion.series_id, CardVersion.version_type
+    ).join(CardVersion, PriceLatest.version_id == CardVersion.id)\
+     .join(Card, CardVersion.card_id == Card.id)\
+     .all()
+
+    rows = []
+    for period, days in PERIODS.items():
+        cutoff = now - timedelta(days=days)
+        base = _base_prices(cutoff)
+        for snap, card_id, card_number, name, rarity, series_id, version_type in current:
+            if snap.recorded_at <= cutoff:
+                continue
+            base_price, base_recorded_at = base.get((snap.version_id, snap.source, snap.currency), (None, None))
+            if not base_price:
+                continue
+            rows.append({
+                'version_id': snap.version_id,
+                'source': snap.source,
+                'currency': snap.currency,
+                'period': period,
+                'card_id': card_id,
+                'card_number': card_number,
+                'name': name,
+                'rarity': rarity,
+                'series_id': series_id,
+                'version_type': version_type,
+                'price': snap.price,
+                'base_price': base_price,
+                'change_abs': round(snap.price - base_price, 4),
+                'change_pct': change_pct(snap.price, base_price),
+                'listing_count': snap.listing_count,
+                'recorded_at': snap.recorded_at,
+                'base_recorded_at': base_recorded_at,
+                'computed_at': now,
+            })
+
+    db.session.execute(PriceMover.__table__.delete())
+    for chunk in _chunks(rows):
+        db.session.execute(PriceMover.__table__.insert(), chunk)
+    return len(rows)
+
+
+def top_movers(period: str = DEFAULT_PERIOD, direction: str = 'gainers', series_id: int = None,
+               rarity: str = None, currency: str = None, limit: int = 20) -> List[PriceMover]:
+    """
+    涨幅 / 跌幅榜（一条索引查询）
+
+    Args:
+        period: 1d / 7d / 30d
+        direction: gainers (涨幅降序) / losers (跌幅降序)
+        series_id: 只看该系列的版本
+        rarity: 只看该稀有度
+        currency: 只看该货币
+        limit: 条数
+    """
+    if period not in PERIODS:
+        raise ValueError(f"不支持的区间: {period}")
+    if direction not in ('gainers', 'losers'):
+        raise ValueError(f"不支持的方向: {direction}")
+
+    q = PriceMover.query.filter(PriceMover.period == period)
+    if series_id:
+        q = q.filter(PriceMover.series_id == series_id)
+    if rarity:
+        q = q.filter(PriceMover.rarity == rarity)
+    if currency:
+        q = q.filter(PriceMover.currency == currency)
+
+    if direction == 'gainers':
+        q = q.filter(PriceMover.change_pct > 0).order_by(PriceMover.change_pct.desc())
+    else:
+        q = q.filter(PriceMover.change_pct < 0).order_by(PriceMover.change_pct)
+    return q.limit(limit).all()
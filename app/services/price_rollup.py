@@ -0,0 +1,298 @@
+"""
+价格聚合 - price_rollups 表 (day / week / month OHLC)
+
+price_history 每个版本/来源每天一行且永久保留，走势图 API 原先返回区间内全部原始记录。
+现在按请求的时间跨度自动选择粒度（pick_resolution），长区间读取聚合行，
+返回点数保持在几百个以内，与历史长度无关。
+
+update_prices_in_db 写入后调用 refresh_rollups() 重算受影响版本的当前周期；
+`python scripts/cli.py prices --rollup` 全量重建。
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_
+
+from app import db
+from app.models.card import Card, CardVersion
+from app.models.price import PriceHistory, PriceRollup
+
+RESOLUTIONS = ('day', 'week', 'month')
+
+# 时间跨度（天）不超过阈值时使用的粒度，超过最后一档用 month
+AUTO_RESOLUTION = (
+    (90, 'raw'),
+    (365, 'day'),
+    (365 * 5, 'week'),
+)
+
+# IN 查询 / 批量写入每批的行数
+ROLLUP_CHUNK_SIZE = 500
+# 读取原始记录时每批的行数
+STREAM_BATCH_SIZE = 5000
+
+
+def _chunks(items: List, size: int = ROLLUP_CHUNK_SIZE) -> Iterable[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def pick_resolution(days: int) -> str:
+    """按时间跨度选择粒度: raw / day / week / month"""
+    for limit, resolution in AUTO_RESOLUTION:
+        if days <= limit:
+            return resolution
+    return 'month'
+
+
+def period_start(moment: datetime, resolution: str) -> datetime:
+    """moment 所在周期的起点（周从周一开始）"""
+    day = datetime(moment.year, moment.month, moment.day)
+    if resolution == 'day':
+        return day
+    if resolution == 'week':
+        return day - timedelta(days=day.weekday())
+    if resolution == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"不支持的粒度: {resolution}")
+
+
+def _refresh_start(since: datetime) -> datetime:
+    """
+    增量重算的起点: since 所在月第一天所在周的周一
+
+    从这里开始的原始记录覆盖 since 之后所有 day / week / month 周期的完整数据
+    """
+    return period_start(period_start(since, 'month'), 'week')
+
+
+class _Bucket:
+    __slots__ = ('open', 'high', 'low', 'close', 'total', 'count', 'last')
+
+    def __init__(self, price: float, recorded_at: datetime):
+        self.open = self.high = self.low = self.close = price
+        self.total = price
+        self.count = 1
+        self.last = recorded_at
+
+    def add(self, price: float, recorded_at: datetime):
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.close = price
+        self.total += price
+        self.count += 1
+        self.last = recorded_at
+
+
+def _bucket_rows(key: tuple, buckets: Dict[tuple, _Bucket]) -> List[dict]:
+    version_id, source, currency = key
+    return [{
+        'version_id': version_id,
+        'source': source,
+        'currency': currency,
+        'resolution': resolution,
+        'period_start': start,
+        'open': b.open,
+        'high': b.high,
+        'low': b.low,
+        'close': b.close,
+        'avg': round(b.total / b.count, 4),
+        'count': b.count,
+        'last_recorded_at': b.last,
+    } for (resolution, start), b in buckets.items()]
+
+
+def refresh_rollups(version_ids: List[int] = None, since: Optional[datetime] = None) -> int:
+    """
+    从 price_history 重算聚合（不提交事务）
+
+    Args:
+        version_ids: 只重算这些版本；None 表示全部版本
+        since: 只重算包含 since 及之后的周期；None 表示全部历史
+
+    Returns:
+        写入的聚合行数
+    """
+    if version_ids is not None and not version_ids:
+        return 0
+
+    start = _refresh_start(since) if since else None
+    table = PriceRollup.__table__
+
+    if version_ids is None:
+        db.session.execute(table.delete().where(table.c.period_start >= start) if start else table.delete())
+        return _rollup(None, start)
+
+    total = 0
+    for chunk in _chunks(sorted(set(version_ids))):
+        condition = table.c.version_id.in_(chunk)
+        if start:
+            condition = and_(condition, table.c.period_start >= start)
+        db.session.execute(table.delete().where(condition))
+        total += _rollup(chunk, start)
+    return total
+
+
+def _rollup(version_ids: Optional[List[int]], start: Optional[datetime]) -> int:
+    """按 (版本, 来源, 货币) 顺序流式读取原始记录，逐组聚合写入"""
+    q = db.session.query(
+        PriceHistory.version_id, PriceHistory.source, PriceHistory.currency,
+        PriceHistory.price, PriceHistory.recorded_at
+    )
+    if version_ids is not None:
+        q = q.filter(PriceHistory.version_id.in_(version_ids))
+    if start:
+        q = q.filter(PriceHistory.recorded_at >= start)
+    q = q.order_by(PriceHistory.version_id, PriceHistory.source, PriceHistory.currency,
+                   PriceHistory.recorded_at, PriceHistory.id)
+
+    pending = []
+    written = 0
+    current_key = None
+    buckets = {}
+    for version_id, source, currency, price, recorded_at in q.yield_per(STREAM_BATCH_SIZE):
+        key = (version_id, source, currency)
+        if key != current_key:
+            if current_key:
+                pending.extend(_bucket_rows(current_key, buckets))
+            current_key, buckets = key, {}
+        for resolution in RESOLUTIONS:
+            bucket_start = period_start(recorded_at, resolution)
+            # 起点之前的周期只覆盖了部分数据，保留原有聚合行
+            if start and bucket_start < start:
+                continue
+            bucket = buckets.get((resolution, bucket_start))
+            if bucket:
+                bucket.add(price, recorded_at)
+            else:
+                buckets[(resolution, bucket_start)] = _Bucket(price, recorded_at)
+        if len(pending) >= ROLLUP_CHUNK_SIZE:
+            db.session.execute(PriceRollup.__table__.insert(), pending)
+            written += len(pending)
+            pending = []
+    if current_key:
+        pending.extend(_bucket_rows(current_key, buckets))
+
+    for chunk in _chunks(pending):
+        db.session.execute(PriceRollup.__table__.insert(), chunk)
+    return written + len(pending)
+
+
+def price_points(version_ids: List[int], days: int, source: str = None,
+                 resolution: str = 'auto') -> Dict[int, List[dict]]:
+    """
+    走势图数据点
+
+    Args:
+        version_ids: 版本ID列表
+        days: 时间跨度（天）
+        source: 只取该来源
+        resolution: raw / day / week / month / auto（按 days 自动选择）
+
+    Returns:
+        {version_id: [点]}，点包含 date / price / currency / source；
+        聚合粒度的点另有 open / high / low / close / count，price 为收盘价
+    """
+    if resolution == 'auto':
+        resolution = pick_resolution(days)
+    since = datetime.utcnow() - timedelta(days=days)
+    points = {vid: [] for vid in version_ids}
+    if not version_ids:
+        return points
+
+    if resolution == 'raw':
+        q = PriceHistory.query.filter(
+            PriceHistory.version_id.in_(version_ids),
+            PriceHistory.recorded_at >= since
+        )
+        if source:
+            q = q.filter(PriceHistory.source == source)
+        for p in q.order_by(PriceHistory.recorded_at):
+            points[p.version_id].append({
+                'date': p.recorded_at.isoformat(),
+                'price': p.price,
+                'currency': p.currency,
+                'source': p.source,
+                'condition': p.condition
+            })
+        return points
+
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"不支持的粒度: {resolution}")
+
+    q = PriceRollup.query.filter(
+        PriceRollup.version_id.in_(version_ids),
+        PriceRollup.resolution == resolution,
+        PriceRollup.period_start >= period_start(since, resolution)
+    )
+    if source:
+        q = q.filter(PriceRollup.source == source)
+    for r in q.order_by(PriceRollup.period_start):
+        points[r.version_id].append({
+            'date': r.period_start.isoformat(),
+            'price': r.close,
+            'currency': r.currency,
+            'source': r.source,
+            'open': r.open,
+            'high': r.high,
+            'low': r.low,
+            'close': r.close,
+            'count': r.count
+        })
+    return points
+
+
+def compare_series(version_ids: List[int], days: int, resolution: str = 'auto') -> Dict[int, dict]:
+    """
+    多版本价格比较（列式，一条语句）
+
+    CardVersion + Card 左连接区间内的原始记录或聚合行，一次取回所有版本的卡片信息和价格点。
+
+    Returns:
+        {version_id: {card_number, card_name, currency, dates: [...], prices: [...]}}；
+        同一版本有多种货币时 currency 为 None，另附 currencies 数组；不存在的版本 card_number 为 None
+    """
+    if resolution == 'auto':
+        resolution = pick_resolution(days)
+    since = datetime.utcnow() - timedelta(days=days)
+
+    if resolution == 'raw':
+        date_col, price_col, currency_col = PriceHistory.recorded_at, PriceHistory.price, PriceHistory.currency
+        join_on = and_(PriceHistory.version_id == CardVersion.id, PriceHistory.recorded_at >= since)
+        target = PriceHistory
+    elif resolution in RESOLUTIONS:
+        date_col, price_col, currency_col = PriceRollup.period_start, PriceRollup.close, PriceRollup.currency
+        join_on = and_(PriceRollup.version_id == CardVersion.id,
+                       PriceRollup.resolution == resolution,
+                       PriceRollup.period_start >= period_start(since, resolution))
+        target = PriceRollup
+    else:
+        raise ValueError(f"不支持的粒度: {resolution}")
+
+    result = {vid: {'card_number': None, 'card_name': None, 'currency': None, 'dates': [], 'prices': []}
+              for vid in version_ids}
+    currencies = {vid: [] for vid in version_ids}
+
+    for chunk in _chunks(sorted(set(version_ids))):
+        rows = db.session.query(CardVersion.id, Card.card_number, Card.name, date_col, price_col, currency_col)\
+            .join(Card, CardVersion.card_id == Card.id)\
+            .outerjoin(target, join_on)\
+            .filter(CardVersion.id.in_(chunk))\
+            .order_by(CardVersion.id, date_col)
+        for vid, card_number, name, date, price, currency in rows:
+            entry = result[vid]
+            entry['card_number'] = card_number
+            entry['card_name'] = name
+            if date is None:
+                continue
+            entry['dates'].append(date.isoformat())
+            entry['prices'].append(price)
+            currencies[vid].append(currency)
+
+    for vid, values in currencies.items():
+        distinct = set(values)
+        if len(distinct) == 1:
+            result[vid]['currency'] = values[0]
+        elif distinct:
+            result[vid]['currencies'] = values
+    return result
@@ -0,0 +1,327 @@
+"""
+卡牌全文检索 - SQLite FTS5 (开发) / PostgreSQL tsvector + pg_trgm (生产)
+
+索引覆盖 Card 的 name / traits / effect_text / trigger_text，
+由 create_app() 建表，爬虫保存后调用 index_cards() 增量更新，
+或通过 `python scripts/cli.py search --rebuild` 全量重建。
+索引内容与查询都经过 app.services.tokenizer 切分为 n-gram，
+分词规则变化后需要全量重建。
+索引不可用时 search_card_ids() 返回 None，调用方回退到 LIKE 查询。
+卡号不进索引: card_number_ids() 按前缀走 card_number 的 B-tree 索引范围查询。
+"""
+import re
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models.card import Card, CardVersion
+from app.services.tokenizer import QueryTerm, index_text, parse_query
+
+SEARCH_TABLE = 'card_search'
+
+# 可检索字段及权重 (name 最高)
+SEARCH_FIELDS = ('name', 'traits', 'effect_text', 'trigger_text')
+FIELD_WEIGHTS = {'name': 'A', 'traits': 'B', 'effect_text': 'C', 'trigger_text': 'D'}
+
+# 按相关度排序的字段；其余字段的命中排在后面，不计算相关度
+RANKED_FIELDS = ('name', 'traits')
+
+# 卡号前缀只含字母数字和连字符 (OP14-001 / ST01 / P-001)
+CARD_NUMBER_PREFIX = re.compile(r'^[A-Za-z0-9-]+$')
+
+# take_ranked() 每次 IN 查询的卡片数
+RANK_CHUNK_SIZE = 100
+
+# 增量索引时每批处理的卡片数
+INDEX_CHUNK_SIZE = 500
+
+_SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+    f"USING fts5(name, traits, effect_text, trigger_text, tokenize='unicode61')"
+)
+
+_POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+    " card_id INTEGER PRIMARY KEY REFERENCES cards(id) ON DELETE CASCADE,"
+    " name TEXT, traits TEXT, effect_text TEXT, trigger_text TEXT,"
+    " document TSVECTOR)",
+    f"CREATE INDEX IF NOT EXISTS idx_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)",
+    f"CREATE INDEX IF NOT EXISTS idx_{SEARCH_TABLE}_name_trgm ON {SEARCH_TABLE} USING GIN (name gin_trgm_ops)",
+)
+
+_POSTGRES_DOCUMENT = " || ".join(
+    f"setweight(to_tsvector('simple', :{field}_tokens), '{weight}')"
+    for field, weight in FIELD_WEIGHTS.items()
+)
+
+
+def _dialect() -> str:
+    return db.engine.dialect.name
+
+
+def ensure_search_index() -> bool:
+    """
+    创建检索索引表（幂等）
+
+    Returns:
+        索引是否可用
+    """
+    dialect = _dialect()
+    try:
+        if dialect == 'sqlite':
+            db.session.execute(text(_SQLITE_DDL))
+        elif dialect == 'postgresql':
+            for ddl in _POSTGRES_DDL:
+                db.session.execute(text(ddl))
+        else:
+            return False
+        db.session.commit()
+        return True
+    except SQLAlchemyError:
+        # SQLite 未编译 FTS5 / 数据库用户无权创建扩展时回退到 LIKE
+        db.session.rollback()
+        return False
+
+
+def is_available() -> bool:
+    """检索索引表是否存在"""
+    dialect = _dialect()
+    if dialect == 'sqlite':
+        sql = "SELECT 1 FROM sqlite_master WHERE name = :name"
+    elif dialect == 'postgresql':
+        sql = "SELECT 1 FROM pg_class WHERE relname = :name"
+    else:
+        return False
+    return db.session.execute(text(sql), {'name': SEARCH_TABLE}).first() is not None
+
+
+def _document_fields(card) -> dict:
+    """Card 行 -> 原文字段 + 分词后的字段 ({field}_tokens)"""
+    fields = {}
+    for field in SEARCH_FIELDS:
+        value = getattr(card, field) or ''
+        fields[field] = value
+        fields[f'{field}_tokens'] = index_text(value)
+    return fields
+
+
+def _chunks(ids: List[int], size: int = INDEX_CHUNK_SIZE) -> Iterable[List[int]]:
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _write_documents(card_ids: List[int]) -> int:
+    """重写一批卡片的索引行"""
+    rows = db.session.query(Card.id, *[getattr(Card, f) for f in SEARCH_FIELDS])\
+        .filter(Card.id.in_(card_ids)).all()
+    params = [{'card_id': r.id, **_document_fields(r)} for r in rows]
+
+    id_list = ', '.join(str(int(i)) for i in card_ids)
+    if _dialect() == 'sqlite':
+        db.session.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({id_list})"))
+        # FTS5 只存分词结果，由 unicode61 按空格切分
+        insert = text(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, traits, effect_text, trigger_text) "
+            "VALUES (:card_id, :name_tokens, :traits_tokens, :effect_text_tokens, :trigger_text_tokens)"
+        )
+    else:
+        db.session.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE card_id IN ({id_list})"))
+        # 原文保留给 pg_trgm 相似度，document 由分词结果生成
+        insert = text(
+            f"INSERT INTO {SEARCH_TABLE} (card_id, name, traits, effect_text, trigger_text, document) "
+            f"VALUES (:card_id, :name, :traits, :effect_text, :trigger_text, {_POSTGRES_DOCUMENT})"
+        )
+    if params:
+        db.session.execute(insert, params)
+    return len(params)
+
+
+def index_cards(card_ids: Sequence[int] = None, series_ids: Sequence[int] = None) -> int:
+    """
+    增量更新检索索引（不提交事务，由调用方 commit）
+
+    Args:
+        card_ids: 卡片ID列表
+        series_ids: 系列ID列表（爬取一个系列后，索引该系列所有版本对应的卡片）
+
+    Returns:
+        索引的卡片数
+    """
+    ids = set(card_ids or [])
+    if series_ids:
+        ids.update(c for (c,) in db.session.query(CardVersion.card_id)
+                   .filter(CardVersion.series_id.in_(series_ids)).distinct())
+    if not ids or not is_available():
+        return 0
+
+    db.session.flush()
+    total = 0
+    for chunk in _chunks(sorted(ids)):
+        total += _write_documents(chunk)
+    return total
+
+
+def rebuild_search_index() -> int:
+    """全量重建检索索引（不提交事务）"""
+    if not is_available():
+        return 0
+    db.session.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    card_ids = [c for (c,) in db.session.query(Card.id).order_by(Card.id)]
+    total = 0
+    for chunk in _chunks(card_ids):
+        total += _write_documents(chunk)
+    return total
+
+
+def _sqlite_match(terms: List[QueryTerm], fields: Optional[Sequence[str]]) -> str:
+    """构造 FTS5 MATCH 表达式: 每个检索项为相邻 token 短语，检索项之间 AND"""
+    phrases = ' '.join(
+        '"{}"{}'.format(' '.join(term.tokens), '*' if term.prefix else '')
+        for term in terms
+    )
+    if fields:
+        return '{%s} : (%s)' % (' '.join(fields), phrases)
+    return phrases
+
+
+def _postgres_tsquery(terms: List[QueryTerm], fields: Optional[Sequence[str]]) -> str:
+    """构造 to_tsquery 表达式: 相邻 token 用 <-> 连接，可按权重限制字段"""
+    weights = ''.join(FIELD_WEIGHTS[f] for f in fields) if fields else ''
+    parts = []
+    for term in terms:
+        # token 只含字母数字/假名/汉字，无需转义
+        lexemes = [f"'{t}':{weights}" for t in term.tokens[:-1]]
+        last = term.tokens[-1]
+        lexemes.append(f"'{last}':{'*' if term.prefix else ''}{weights}")
+        parts.append('(' + ' <-> '.join(lexemes) + ')')
+    return ' & '.join(parts)
+
+
+def _match_ids(terms: List[QueryTerm], query: str, fields: Sequence[str], language: Optional[str],
+               limit: Optional[int], ranked: bool) -> List[int]:
+    """执行一次检索；ranked=False 时按卡片ID排序，不计算相关度"""
+    params = {'limit': limit, 'language': language}
+    lang_filter = "AND c.language = :language" if language else ""
+    limit_clause = "LIMIT :limit" if limit is not None else ""
+
+    if _dialect() == 'sqlite':
+        params['match'] = _sqlite_match(terms, fields)
+        # 相关度相同时按卡片ID；FTS5 按 rowid 升序输出，不按相关度时无需排序
+        order = f"{SEARCH_TABLE}.rowid"
+        if ranked:
+            order = f"bm25({SEARCH_TABLE}, 10.0, 5.0, 1.0, 1.0), {order}"
+        # 只有按语言筛选时才需要关联 cards
+        join = f"JOIN cards c ON c.id = {SEARCH_TABLE}.rowid" if language else ""
+        sql = (
+            f"SELECT {SEARCH_TABLE}.rowid FROM {SEARCH_TABLE} {join} "
+            f"WHERE {SEARCH_TABLE} MATCH :match {lang_filter} "
+            f"ORDER BY {order} {limit_clause}"
+        )
+    else:
+        params['tsquery'] = _postgres_tsquery(terms, fields)
+        params['raw'] = query
+        match = "s.document @@ to_tsquery('simple', :tsquery)"
+        order = "s.card_id"
+        if ranked:
+            # tsvector 命中 + 名称三元组相似度 (容错拼写)
+            if 'name' in fields:
+                match = f"({match} OR s.name % :raw)"
+            order = ("ts_rank_cd(s.document, to_tsquery('simple', :tsquery)) "
+                     "+ similarity(s.name, :raw) DESC, s.card_id")
+        join = "JOIN cards c ON c.id = s.card_id" if language else ""
+        sql = (
+            f"SELECT s.card_id FROM {SEARCH_TABLE} s {join} "
+            f"WHERE {match} {lang_filter} "
+            f"ORDER BY {order} {limit_clause}"
+        )
+    return [row[0] for row in db.session.execute(text(sql), params)]
+
+
+def search_card_ids(query: str, language: str = None, fields: Sequence[str] = None,
+                    limit: Optional[int] = 100) -> Optional[List[int]]:
+    """
+    全文检索，按相关度返回卡片ID
+
+    名称/特征命中的卡片按相关度排在前面；只在效果/触发文本中命中的卡片随后按卡片ID（入库顺序）排列。
+    两三个字的前缀会在效果文本中命中上千张卡，逐行计算 bm25 是检索的主要开销，
+    而这部分结果的相关度排序意义不大。
+
+    Args:
+        query: 用户输入
+        language: jp / en，None 表示不限
+        fields: 限定检索字段 (SEARCH_FIELDS 的子集)，None 表示全部
+        limit: 返回数量上限，None 表示返回全部命中
+
+    Returns:
+        按相关度排序的卡片ID列表；索引不可用时返回 None
+    """
+    terms = parse_query(query)
+    if not terms:
+        return []
+    if not is_available():
+        return None
+
+    fields = tuple(fields or SEARCH_FIELDS)
+    ranked_fields = tuple(f for f in fields if f in RANKED_FIELDS)
+    try:
+        ids = _match_ids(terms, query, ranked_fields, language, limit, ranked=True) if ranked_fields else []
+        if len(ranked_fields) < len(fields) and (limit is None or len(ids) < limit):
+            seen = set(ids)
+            more = _match_ids(terms, query, fields, language,
+                              None if limit is None else limit + len(ids), ranked=False)
+            ids += [card_id for card_id in more if card_id not in seen]
+    except SQLAlchemyError:
+        db.session.rollback()
+        return None
+    return ids if limit is None else ids[:limit]
+
+
+def card_number_ids(query: str, language: str = None, limit: Optional[int] = 100) -> List[int]:
+    """
+    卡号前缀匹配，按卡号排序返回卡片ID
+
+    用 card_number >= 'OP14' AND card_number < 'OP15' 的范围条件代替 LIKE '%q%'，
+    走 card_number 索引（SQLite 默认 BINARY 排序规则下 LIKE 'q%' 也不会用索引）。
+    """
+    prefix = query.strip().upper()
+    if not CARD_NUMBER_PREFIX.match(prefix):
+        return []
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    q = db.session.query(Card.id).filter(Card.card_number >= prefix, Card.card_number < upper)
+    if language:
+        q = q.filter(Card.language == language)
+    q = q.order_by(Card.card_number)
+    if limit is not None:
+        q = q.limit(limit)
+    return [card_id for (card_id,) in q]
+
+
+def take_ranked(query, column, ranked_ids: Sequence[int], limit: int, offset: int = 0,
+                chunk_size: int = RANK_CHUNK_SIZE) -> list:
+    """
+    按 ranked_ids 的顺序取出满足 query 其余条件（颜色/类型等）的行，支持分页
+
+    逐块 IN 查询并在内存中按位置排序，取够 offset + limit 行即停止；
+    不用 ORDER BY CASE（几百个分支在 SQLite 中逐行求值，比查询本身还慢）。
+
+    Args:
+        query: 已加好筛选条件的查询
+        column: 与 ranked_ids 对应的列 (Card.id / CardListing.card_id)
+    """
+    rows = []
+    skip = offset
+    for chunk in _chunks(list(ranked_ids), chunk_size):
+        position = {card_id: i for i, card_id in enumerate(chunk)}
+        found = sorted(query.filter(column.in_(chunk)).all(),
+                       key=lambda row: position[getattr(row, column.key)])
+        if skip >= len(found):
+            skip -= len(found)
+            continue
+        rows.extend(found[skip:])
+        skip = 0
+        if len(rows) >= limit:
+            break
+    return rows[:limit]
@@ -0,0 +1,118 @@
+"""
+系列统计 - series_stats 聚合表
+
+系列列表/详情/首页原先对每个系列分别 count()，
+现在读取预计算的 SeriesStats（每页一条语句）。
+写入路径在 refresh_listings() 旁调用 refresh_series_stats()，
+或通过 `python scripts/cli.py listings --rebuild` 全量重建。
+"""
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import func
+
+from app import db
+from app.models.card import Card, CardVersion
+from app.models.series import Series, SeriesStats
+
+# 卡片类型 -> SeriesStats 列
+TYPE_COLUMNS = {
+    'LEADER': 'leader_count',
+    'CHARACTER': 'character_count',
+    'EVENT': 'event_count',
+    'STAGE': 'stage_count',
+    'DON': 'don_count',
+}
+
+
+def _empty_row(series_id: int) -> dict:
+    row = {
+        'series_id': series_id,
+        'total_versions': 0,
+        'card_count': 0,
+        'star_count': 0,
+        'rarity_counts': {},
+        'illustration_counts': {},
+    }
+    row.update({column: 0 for column in TYPE_COLUMNS.values()})
+    return row
+
+
+def _build_stats_rows(series_ids: List[int]) -> List[dict]:
+    """聚合一批系列的统计（固定 2 条查询）"""
+    rows = {sid: _empty_row(sid) for sid in series_ids}
+
+    grouped = db.session.query(
+        CardVersion.series_id, Card.card_type, Card.rarity,
+        CardVersion.illustration_type, CardVersion.has_star_mark,
+        func.count(CardVersion.id)
+    ).join(Card, CardVersion.card_id == Card.id)\
+     .filter(CardVersion.series_id.in_(series_ids))\
+     .group_by(CardVersion.series_id, Card.card_type, Card.rarity,
+               CardVersion.illustration_type, CardVersion.has_star_mark)\
+     .all()
+
+    rarity_counts = defaultdict(lambda: defaultdict(int))
+    illustration_counts = defaultdict(lambda: defaultdict(int))
+    for series_id, card_type, rarity, illustration, star, count in grouped:
+        row = rows[series_id]
+        row['total_versions'] += count
+        column = TYPE_COLUMNS.get(card_type)
+        if column:
+            row[column] += count
+        if star:
+            row['star_count'] += count
+        rarity_counts[series_id][rarity] += count
+        if illustration:
+            illustration_counts[series_id][illustration] += count
+
+    card_counts = db.session.query(Card.series_id, func.count(Card.id))\
+        .filter(Card.series_id.in_(series_ids))\
+        .group_by(Card.series_id)\
+        .all()
+    for series_id, count in card_counts:
+        rows[series_id]['card_count'] = count
+
+    for series_id, row in rows.items():
+        row['rarity_counts'] = dict(rarity_counts[series_id])
+        row['illustration_counts'] = dict(illustration_counts[series_id])
+    return list(rows.values())
+
+
+def refresh_series_stats(series_ids: List[int]) -> int:
+    """
+    刷新指定系列的统计（不提交事务，由调用方 commit）
+
+    Returns:
+        刷新的系列数
+    """
+    ids = sorted(set(series_ids or []))
+    if not ids:
+        return 0
+
+    db.session.flush()
+    rows = _build_stats_rows(ids)
+    table = SeriesStats.__table__
+    db.session.execute(table.delete().where(table.c.series_id.in_(ids)))
+    db.session.execute(table.insert(), rows)
+    return len(rows)
+
+
+def rebuild_series_stats() -> int:
+    """全量重建系列统计（不提交事务）"""
+    db.session.execute(SeriesStats.__table__.delete())
+    series_ids = [s for (s,) in db.session.query(Series.id)]
+    return refresh_series_stats(series_ids)
+
+
+def stats_by_series(series_ids: List[int]) -> Dict[int, SeriesStats]:
+    """
+    批量读取系列统计（一条语句）
+
+    Returns:
+        {series_id: SeriesStats}，尚未统计的系列不在结果中
+    """
+    if not series_ids:
+        return {}
+    rows = SeriesStats.query.filter(SeriesStats.series_id.in_(series_ids)).all()
+    return {row.series_id: row for row in rows}
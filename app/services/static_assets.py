@@ -0,0 +1,181 @@
+"""
+静态文件服务 - 内容指纹 URL + 长期缓存 + 预压缩
+
+Flask 默认的 static 处理不设置长期缓存，URL 也不带版本，浏览器每次都要重新验证。
+init_static() 替换 static 视图:
+
+- blobs/ 与 variants/ 下的图片按内容寻址，路径本身就是指纹
+- 其他文件 (DON 卡图片、CSS/JS) 由 url_for('static') / static_url() 追加 ?v={内容哈希}
+- 带指纹的请求返回 Cache-Control: public, max-age=31536000, immutable；
+  指纹缺失或已过期时使用 STATIC_MAX_AGE 短缓存
+- ETag / 304 与 Range (206) 由 send_from_directory(conditional=True) 处理
+- CSS/JS 有预压缩的 .br / .gz 文件时按 Accept-Encoding 直接返回 (cli.py static --compress 生成)
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # 可选依赖
+    brotli = None
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# 按内容寻址的目录（相对 static/）
+CONTENT_ADDRESSED = ('images/blobs/', 'images/variants/')
+
+# 预压缩的文件类型（图片本身已压缩）
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt')
+
+# 预压缩文件后缀，按优先级
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+FINGERPRINT_LENGTH = 12
+_READ_CHUNK = 64 * 1024
+
+
+class AssetFingerprints:
+    """文件内容哈希缓存（线程安全），文件修改时间或大小变化后重新计算"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, root: str, filename: str) -> Optional[str]:
+        """文件指纹；文件不存在时返回 None"""
+        path = os.path.join(root, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            return entry[2]
+
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_READ_CHUNK), b''):
+                digest.update(chunk)
+        fingerprint = digest.hexdigest()[:FINGERPRINT_LENGTH]
+        with self._lock:
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, fingerprint)
+        return fingerprint
+
+
+_fingerprints = AssetFingerprints()
+
+
+def is_content_addressed(filename: str) -> bool:
+    return filename.startswith(CONTENT_ADDRESSED)
+
+
+def static_url(url: Optional[str]) -> Optional[str]:
+    """
+    /static/... 地址追加内容指纹（按内容寻址的文件、外部地址、文件不存在时原样返回）
+    """
+    prefix = current_app.static_url_path + '/'
+    if not url or not url.startswith(prefix) or '?' in url:
+        return url
+    filename = url[len(prefix):]
+    if is_content_addressed(filename):
+        return url
+    fingerprint = _fingerprints.get(current_app.static_folder, filename)
+    return f'{url}?v={fingerprint}' if fingerprint else url
+
+
+def _inject_fingerprint(endpoint, values):
+    """url_for('static', filename=...) 自动带上 v=指纹"""
+    if endpoint != 'static' or 'v' in values or not values.get('filename'):
+        return
+    if is_content_addressed(values['filename']):
+        return
+    fingerprint = _fingerprints.get(current_app.static_folder, values['filename'])
+    if fingerprint:
+        values['v'] = fingerprint
+
+
+def _precompressed(root: str, filename: str) -> Optional[Tuple[str, str]]:
+    """客户端接受且比原文件新的预压缩文件 (文件名, 编码)"""
+    try:
+        source_mtime = os.stat(os.path.join(root, filename)).st_mtime_ns
+    except OSError:
+        return None
+    for encoding, suffix in ENCODINGS:
+        if encoding not in request.accept_encodings:
+            continue
+        try:
+            if os.stat(os.path.join(root, filename + suffix)).st_mtime_ns >= source_mtime:
+                return filename + suffix, encoding
+        except OSError:
+            continue
+    return None
+
+
+def serve_static(filename):
+    """替换 Flask 默认的 static 视图"""
+    root = current_app.static_folder
+    version = request.args.get('v')
+    immutable = is_content_addressed(filename) or \
+        (version is not None and version == _fingerprints.get(root, filename))
+    max_age = IMMUTABLE_MAX_AGE if immutable else current_app.config.get('STATIC_MAX_AGE', 3600)
+
+    compressible = filename.lower().endswith(COMPRESSIBLE)
+    compressed = _precompressed(root, filename) if compressible else None
+    if compressed:
+        response = send_from_directory(root, compressed[0], conditional=True, max_age=max_age,
+                                       mimetype=mimetypes.guess_type(filename)[0])
+        response.headers['Content-Encoding'] = compressed[1]
+    else:
+        response = send_from_directory(root, filename, conditional=True, max_age=max_age)
+
+    if compressible:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
+def init_static(app):
+    """替换 static 视图并为 url_for('static') 注入指纹（create_app 调用）"""
+    if 'static' not in app.view_functions:
+        return
+    app.view_functions['static'] = serve_static
+    app.url_defaults(_inject_fingerprint)
+
+
+def precompress(root: Optional[str] = None, force: bool = False) -> Dict[str, int]:
+    """
+    为 static/ 下的 CSS/JS 等文本文件生成 .gz（安装 brotli 时另生成 .br）
+
+    Returns:
+        {'files': 处理的文件数, 'written': 新写入的压缩文件数}
+    """
+    root = Path(root or Path(__file__).parent.parent / 'static')
+    stats = {'files': 0, 'written': 0}
+    for path in root.rglob('*'):
+        if not path.is_file() or not path.name.lower().endswith(COMPRESSIBLE):
+            continue
+        stats['files'] += 1
+        data = None
+        for encoding, suffix in ENCODINGS:
+            if encoding == 'br' and brotli is None:
+                continue
+            target = path.with_name(path.name + suffix)
+            if not force and target.exists() and target.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+                continue
+            data = data if data is not None else path.read_bytes()
+            if encoding == 'br':
+                target.write_bytes(brotli.compress(data, quality=11))
+            else:
+                target.write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+            stats['written'] += 1
+    return stats
@@ -0,0 +1,125 @@
+"""
+卡牌文本分词 - 日文 n-gram
+
+日文卡名/特征没有空格分隔（モンキー・D・ルフィ、麦わらの一味/超新星），
+按空格分词的全文索引几乎无法命中。这里先做归一化：
+    NFKC (全角/半角折叠) -> 小写 -> 片假名转平假名 -> 去掉 `・`
+再把假名/汉字连续段切成 bigram，字母数字段保持为单词。
+建立索引 (app.services.search) 和解析查询时使用同一套规则。
+"""
+import unicodedata
+from typing import List, NamedTuple, Tuple
+
+# 日文连续段切分的 n-gram 长度
+NGRAM_SIZE = 2
+
+# 归一化时直接删除的分隔符（NFKC 会把半角 ･ 折叠为 ・）
+_STRIPPED_CHARS = '・'
+
+# 片假名 ァ..ヶ 与平假名相差 0x60
+_KATAKANA_START, _KATAKANA_END = 0x30A1, 0x30F6
+_KANA_OFFSET = 0x60
+
+
+class QueryTerm(NamedTuple):
+    """查询中的一个检索项"""
+    # 需按顺序相邻出现的 token
+    tokens: Tuple[str, ...]
+    # 最后一个 token 是否按前缀匹配（输入未完成的单词 / 单个假名汉字）
+    prefix: bool
+
+
+def _fold_kana(text: str) -> str:
+    """片假名 -> 平假名"""
+    return ''.join(
+        chr(ord(ch) - _KANA_OFFSET) if _KATAKANA_START <= ord(ch) <= _KATAKANA_END else ch
+        for ch in text
+    )
+
+
+def normalize(text: str) -> str:
+    """归一化文本（全角/半角、大小写、片假名/平假名、`・`）"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', text).lower()
+    text = _fold_kana(text)
+    for ch in _STRIPPED_CHARS:
+        text = text.replace(ch, '')
+    return text
+
+
+def is_cjk(ch: str) -> bool:
+    """是否为假名/汉字（按 n-gram 切分的字符）"""
+    code = ord(ch)
+    return (
+        0x3040 <= code <= 0x30FF        # 平假名/片假名 (含 ー)
+        or 0x3400 <= code <= 0x4DBF     # CJK 扩展 A
+        or 0x4E00 <= code <= 0x9FFF     # CJK 统一汉字
+        or 0xF900 <= code <= 0xFAFF     # CJK 兼容汉字
+        or code == 0x3005               # 々
+    )
+
+
+def _runs(text: str) -> List[Tuple[str, bool]]:
+    """
+    按字符类别切分为连续段
+
+    Returns:
+        [(段文本, 是否为日文段)]，标点/空白作为分隔丢弃
+    """
+    runs = []
+    current, current_cjk = '', False
+    for ch in text:
+        if is_cjk(ch):
+            kind = True
+        elif ch.isalnum():
+            kind = False
+        else:
+            if current:
+                runs.append((current, current_cjk))
+            current = ''
+            continue
+        if current and kind != current_cjk:
+            runs.append((current, current_cjk))
+            current = ''
+        current += ch
+        current_cjk = kind
+    if current:
+        runs.append((current, current_cjk))
+    return runs
+
+
+def ngrams(run: str, n: int = NGRAM_SIZE) -> List[str]:
+    """切分 n-gram（不足 n 个字符时原样返回）"""
+    if len(run) <= n:
+        return [run]
+    return [run[i:i + n] for i in range(len(run) - n + 1)]
+
+
+def tokenize(text: str) -> List[str]:
+    """文本 -> token 列表（建立索引用）"""
+    tokens = []
+    for run, cjk in _runs(normalize(text)):
+        tokens.extend(ngrams(run) if cjk else [run])
+    return tokens
+
+
+def index_text(text: str) -> str:
+    """文本 -> 空格分隔的 token 串，写入全文索引"""
+    return ' '.join(tokenize(text))
+
+
+def parse_query(text: str) -> List[QueryTerm]:
+    """
+    解析用户输入
+
+    日文段 -> 相邻 bigram 短语（单字时前缀匹配），
+    字母数字段 -> 单词前缀匹配（逐字输入时也能命中）。
+    """
+    terms = []
+    for run, cjk in _runs(normalize(text)):
+        if cjk:
+            terms.append(QueryTerm(tuple(ngrams(run)), prefix=len(run) < NGRAM_SIZE))
+        else:
+            terms.append(QueryTerm((run,), prefix=True))
+    return terms
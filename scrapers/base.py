@@ -2,12 +2,12 @@
 爬虫基类 - 通用逻辑
 """
 import os
-import time
 import hashlib
-import requests
-from pathlib import Path
 from loguru import logger
 
+from scrapers.utils.fetcher import HttpFetcher
+from scrapers.utils.images import ImageDownloader
+
 # 配置日志
 logger.add("logs/scraper_{time}.log", rotation="10 MB", retention="7 days")
 
@@ -17,53 +17,33 @@ class BaseScraper:
     
     def __init__(self, language='jp'):
         self.language = language
-        self.session = requests.Session()
-        self.session.headers.update({
+        # 图片请求限速 2 次/秒（替代每次下载后的固定 sleep）
+        self.fetcher = HttpFetcher(rate=2.0, timeout=30, headers={
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        self.session = self.fetcher.session
         
-        # 图片保存路径
-        self.image_base_path = Path(__file__).parent.parent / 'app' / 'static' / 'images' / 'cards' / language
-        self.image_base_path.mkdir(parents=True, exist_ok=True)
+        # 图片按内容保存到 app/static/images/blobs（共用上面的连接池和限速）
+        self.images = ImageDownloader(workers=4, fetcher=self.fetcher)
     
-    def download_image(self, url: str, card_number: str, version_suffix: str = '') -> str:
+    def download_image(self, url: str, card_number: str = None, version_suffix: str = '') -> str:
         """
-        下载图片并返回本地路径
+        下载图片到按内容寻址的 blob 存储并返回地址
+        
+        批量下载请使用 ImageDownloader.download_many()（并发）
         
         Args:
             url: 图片URL
-            card_number: 卡片编号
-            version_suffix: 版本后缀 (如 _alt, _comic)
+            card_number / version_suffix: 保留参数，文件名由图片内容决定
         
         Returns:
-            本地相对路径
+            blob 地址 (/static/images/blobs/...)；失败时为 None
         """
         try:
-            # 生成文件名
-            ext = url.split('.')[-1].split('?')[0]
-            if ext not in ['jpg', 'jpeg', 'png', 'webp']:
-                ext = 'jpg'
-            
-            filename = f"{card_number}{version_suffix}.{ext}"
-            local_path = self.image_base_path / filename
-            
-            # 如果已存在则跳过
-            if local_path.exists():
-                logger.debug(f"图片已存在: {filename}")
-                return f"{self.language}/{filename}"
-            
-            # 下载
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
-            
-            logger.info(f"下载图片: {filename}")
-            time.sleep(0.5)  # 礼貌延迟
-            
-            return f"{self.language}/{filename}"
-            
+            stored = self.images.download(url)
+            if stored.created:
+                logger.info(f"下载图片: {card_number}{version_suffix} -> {stored.sha1[:8]}")
+            return stored.url
         except Exception as e:
             logger.error(f"下载图片失败 {url}: {e}")
             return None
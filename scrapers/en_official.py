@@ -2,7 +2,6 @@
 英文官网爬虫 - 基于日文爬虫修改
 """
 import re
-import time
 import requests
 from typing import List, Dict, Optional
 from dataclasses import dataclass
@@ -10,6 +9,11 @@ from playwright.sync_api import sync_playwright
 from loguru import logger
 from pathlib import Path
 
+from scrapers.utils.waits import (
+    WaitStats, first_text, wait_for_network_idle, wait_for_selector, wait_for_stable_count,
+    wait_for_text_change
+)
+
 
 @dataclass
 class CardDataEN:
@@ -39,6 +43,12 @@ class EnglishOfficialScraper:
     BASE_URL = "https://en.onepiece-cardgame.com"
     CARD_LIST_URL = f"{BASE_URL}/cardlist/"
     
+    CARD_SELECTOR = '.resultCol .modalCol'
+    # 当前页第一张卡的编号，翻页后变化
+    FIRST_CARD_NUMBER_SELECTOR = '.resultCol .modalCol .infoCol span'
+    SERIES_OPTION_SELECTOR = 'select.selectModal option'
+    COOKIE_BUTTON_SELECTOR = 'button:has-text("Accept All")'
+    
     # 动态计算项目根目录
     _PROJECT_ROOT = Path(__file__).parent.parent
     IMAGE_DIR = _PROJECT_ROOT / "data" / "images" / "en"
@@ -66,6 +76,10 @@ class EnglishOfficialScraper:
         self.playwright = None
         self.browser = None
         self.page = None
+        # 全局限速器（并行爬取时由 ScraperPool 设置，多个 worker 共享）
+        self.rate_limiter = None
+        # 各类等待的实际耗时（并行爬取时由 ScraperPool 共享）
+        self.wait_stats = WaitStats()
         self.IMAGE_DIR.mkdir(parents=True, exist_ok=True)
     
     def start_browser(self):
@@ -79,22 +93,30 @@ class EnglishOfficialScraper:
         self.page.set_viewport_size({"width": 1920, "height": 1080})
         logger.info("浏览器已启动 (EN)")
     
+    def _throttle(self):
+        """请求官网前等待限速"""
+        if self.rate_limiter:
+            self.rate_limiter.wait()
+    
     def close_browser(self):
         """关闭浏览器"""
         if self.browser:
             self.browser.close()
+            self.browser = None
         if self.playwright:
             self.playwright.stop()
+            self.playwright = None
         logger.info("浏览器已关闭 (EN)")
     
     def get_series_list(self) -> List[Dict]:
         """获取所有系列列表"""
         logger.info("获取英文系列列表...")
         
+        self._throttle()
         self.page.goto(self.CARD_LIST_URL, wait_until='networkidle')
-        time.sleep(2)
+        wait_for_selector(self.page, self.SERIES_OPTION_SELECTOR, self.wait_stats, label='series_options')
         
-        options = self.page.locator('select.selectModal option').all()
+        options = self.page.locator(self.SERIES_OPTION_SELECTOR).all()
         
         series_list = []
         for option in options:
@@ -138,8 +160,8 @@ class EnglishOfficialScraper:
         url = f"{self.CARD_LIST_URL}?series={series_id}"
         logger.info(f"爬取英文系列: {url}")
         
-        self.page.goto(url, wait_until='networkidle')
-        time.sleep(2)
+        self._throttle()
+        self.page.goto(url, wait_until='domcontentloaded')
         
         self._close_cookie_banner()
         
@@ -148,7 +170,9 @@ class EnglishOfficialScraper:
         
         while True:
             logger.info(f"处理第 {page_num} 页...")
-            time.sleep(1)
+            # 首页加载 / 翻页后等列表请求结束，再等 DOM 稳定后计数
+            wait_for_network_idle(self.page, self.wait_stats, label='card_list_network')
+            wait_for_stable_count(self.page, self.CARD_SELECTOR, self.wait_stats, label='card_list')
             
             cards_on_page = self._extract_cards_from_html()
             logger.info(f"当前页找到 {len(cards_on_page)} 张卡片")
@@ -162,8 +186,13 @@ class EnglishOfficialScraper:
                 break
             
             try:
+                previous = first_text(self.page, self.FIRST_CARD_NUMBER_SELECTOR)
+                self._throttle()
                 next_link.click()
-                time.sleep(1.5)
+                # 等待列表被下一页替换；超时说明没有翻页，避免重复提取同一页
+                if not wait_for_text_change(self.page, self.FIRST_CARD_NUMBER_SELECTOR, previous,
+                                            self.wait_stats, label='next_page'):
+                    break
                 page_num += 1
             except:
                 break
@@ -184,10 +213,11 @@ class EnglishOfficialScraper:
     def _close_cookie_banner(self):
         """关闭 Cookie 弹窗"""
         try:
-            btn = self.page.locator('button:has-text("Accept All")').first
-            if btn.is_visible(timeout=2000):
+            btn = self.page.locator(self.COOKIE_BUTTON_SELECTOR).first
+            if btn.is_visible():
                 btn.click()
-                time.sleep(0.5)
+                wait_for_selector(self.page, self.COOKIE_BUTTON_SELECTOR, self.wait_stats,
+                                  state='hidden', timeout=2000, label='cookie_banner')
         except:
             pass
     
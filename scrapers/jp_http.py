@@ -0,0 +1,222 @@
+"""
+日文官网爬虫 - HTTP 后端（不启动浏览器）
+
+官网卡片列表由服务端一次性渲染到 HTML 中（分页只是前端展示），
+因此直接用 requests 获取 /cardlist/ 页面，再用 lxml 解析 .modalCol 即可，
+省去 Chromium 进程的内存和启动开销。
+与 JapanOfficialScraper 接口一致；HTTP 请求失败或解析不到卡片时才退回 Playwright。
+"""
+from typing import Dict, List, Optional
+
+import requests
+from loguru import logger
+from lxml import html as lxml_html
+
+from scrapers.jp_official import CardData, JapanOfficialScraper
+
+REQUEST_TIMEOUT = 30
+USER_AGENT = (
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+
+def _cls(name: str) -> str:
+    """XPath: class 属性包含 name（等价于 CSS 的 .name）"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# 与 JapanOfficialScraper.CARD_SELECTOR / SERIES_OPTION_SELECTOR 对应的 XPath
+CARD_XPATH = f"//*[{_cls('resultCol')}]//*[{_cls('modalCol')}]"
+SERIES_OPTION_XPATH = f"//select[{_cls('selectModal')}]//option"
+
+
+class JapanHttpScraper(JapanOfficialScraper):
+    """日文官网爬虫（HTTP 后端，必要时退回浏览器）"""
+
+    def __init__(self):
+        super().__init__()
+        self.session = None
+
+    def start_browser(self):
+        """建立 HTTP 会话（浏览器在需要退回时才启动）"""
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        logger.info("HTTP 会话已建立")
+
+    def close_browser(self):
+        """关闭 HTTP 会话及退回时启动的浏览器"""
+        if self.session:
+            self.session.close()
+            self.session = None
+        if self.browser:
+            super().close_browser()
+
+    def _ensure_browser(self):
+        """退回 Playwright 时按需启动浏览器"""
+        if not self.page:
+            super().start_browser()
+
+    def _fetch_document(self, method: str = 'GET', **kwargs):
+        """请求卡片列表页并解析为 lxml 文档"""
+        self._throttle()
+        response = self.session.request(method, self.CARD_LIST_URL, timeout=REQUEST_TIMEOUT, **kwargs)
+        response.raise_for_status()
+        # 传入 bytes，由 lxml 按页面 meta 声明的编码解码
+        return lxml_html.fromstring(response.content)
+
+    def get_series_list(self) -> List[Dict]:
+        """获取所有系列列表"""
+        logger.info("获取系列列表 (HTTP)...")
+
+        try:
+            doc = self._fetch_document()
+        except requests.RequestException as e:
+            logger.warning(f"HTTP 获取系列列表失败，改用浏览器: {e}")
+            self._ensure_browser()
+            return super().get_series_list()
+
+        series_list = []
+        for option in doc.xpath(SERIES_OPTION_XPATH):
+            series = self._parse_series_option(option.get('value'), option.text_content())
+            if series:
+                series_list.append(series)
+
+        if not series_list:
+            logger.warning("HTTP 页面中没有系列选项，改用浏览器")
+            self._ensure_browser()
+            return super().get_series_list()
+
+        logger.info(f"共找到 {len(series_list)} 个系列")
+        return series_list
+
+    def scrape_series(self, series_id: str, download_images: bool = False, fetch_extras: bool = True) -> List[CardData]:
+        """
+        爬取指定系列的所有卡片 - 直接请求HTML解析
+
+        Args:
+            series_id: 官网系列ID
+            download_images: 是否下载图片
+            fetch_extras: 是否获取插画类型和星标（会额外请求，较慢）
+        """
+        logger.info(f"爬取系列 (HTTP): {self.CARD_LIST_URL}?series={series_id}")
+
+        try:
+            doc = self._fetch_document(params={'series': series_id})
+            all_cards = self._build_cards(self._parse_modals(doc))
+        except requests.RequestException as e:
+            logger.warning(f"HTTP 爬取系列 {series_id} 失败，改用浏览器: {e}")
+            all_cards = []
+
+        if not all_cards:
+            logger.warning(f"系列 {series_id} 的 HTTP 页面中没有卡片，改用浏览器")
+            self._ensure_browser()
+            return super().scrape_series(series_id, download_images, fetch_extras)
+
+        logger.info(f"获取 {len(all_cards)} 条卡片记录")
+        return self._finish_series(all_cards, series_id, download_images, fetch_extras)
+
+    def _parse_modals(self, doc) -> List[Dict]:
+        """解析所有 modalCol，字段与浏览器端 _extract_cards_from_html 的结果一致"""
+        results = []
+        for modal in doc.xpath(CARD_XPATH):
+            try:
+                data = self._parse_modal(modal)
+            except Exception as e:
+                logger.error(f"解析卡片失败: {e}")
+                continue
+            if data:
+                results.append(data)
+        return results
+
+    def _parse_modal(self, modal) -> Optional[Dict]:
+        """解析一个 modalCol，没有 infoCol 时返回 None"""
+        info_col = self._first(modal, 'infoCol')
+        if info_col is None:
+            return None
+
+        spans = [span.text_content().strip() for span in info_col.iter('span')]
+        spans += [''] * (3 - len(spans))
+
+        name_el = self._first(modal, 'cardName')
+
+        # 图片URL
+        image_url = ''
+        front_col = self._first(modal, 'frontCol')
+        img = next(front_col.iter('img'), None) if front_col is not None else None
+        if img is not None:
+            image_url = img.get('data-src') or img.get('src') or ''
+        if image_url and not image_url.startswith('http'):
+            image_url = self.BASE_URL + image_url.replace('..', '', 1)
+
+        # 属性图标
+        attribute = None
+        attr_col = self._first(modal, 'attribute')
+        if attr_col is not None:
+            attr_img = next(attr_col.iter('img'), None)
+            if attr_img is not None:
+                attribute = attr_img.get('alt') or None
+
+        cost = self._field_text(modal, 'cost')
+        return {
+            'cardNumber': spans[0],
+            'name': name_el.text_content().strip() if name_el is not None else '',
+            'cardType': spans[2],
+            'rarity': spans[1],
+            'imageUrl': image_url,
+            'cost': cost,
+            'life': cost,  # cost div 在 LEADER 卡上是 life
+            'power': self._field_text(modal, 'power'),
+            'counter': self._field_text(modal, 'counter'),
+            'color': self._field_text(modal, 'color'),
+            'block': self._field_text(modal, 'block'),
+            'attribute': attribute,
+            'feature': self._field_text(modal, 'feature'),
+            'effect': self._field_text(modal, 'text'),
+            'trigger': self._field_text(modal, 'trigger'),
+            'getInfo': self._field_text(modal, 'getInfo'),
+            'modalId': modal.get('id') or None,
+        }
+
+    @staticmethod
+    def _first(element, class_name: str):
+        """element 下第一个带 class_name 的后代元素"""
+        found = element.xpath(f".//*[{_cls(class_name)}]")
+        return found[0] if found else None
+
+    def _field_text(self, modal, class_name: str) -> Optional[str]:
+        """属性值文本，排除 h3 标题；'-' 视为空"""
+        el = self._first(modal, class_name)
+        if el is None:
+            return None
+        text = el.text_content()
+        h3 = next(el.iter('h3'), None)
+        if h3 is not None:
+            text = text.replace(h3.text_content(), '', 1)
+        text = text.strip()
+        return None if text == '-' else text
+
+    def _fetch_illustration_types(self, series_id: str) -> Dict[str, str]:
+        """
+        获取系列中每张卡片的插画类型（内部方法）
+
+        Returns:
+            Dict[str, str]: {modal_id: illustration_type}
+        """
+        illustration_types = ['原作', 'アニメ', 'オリジナル', 'その他']
+        card_to_type = {}
+
+        for ill_type in illustration_types:
+            try:
+                doc = self._fetch_document('POST', data={'illustrations[]': ill_type, 'series': series_id})
+                card_ids = [modal.get('id') for modal in doc.xpath(CARD_XPATH)]
+
+                for card_id in card_ids:
+                    if card_id and card_id not in card_to_type:
+                        card_to_type[card_id] = ill_type
+
+                logger.debug(f"插画类型 [{ill_type}]: {len(card_ids)} 张")
+            except Exception as e:
+                logger.warning(f"获取插画类型 {ill_type} 失败: {e}")
+
+        return card_to_type
@@ -2,14 +2,15 @@
 日文官网爬虫 - 直接解析HTML中的卡片数据
 """
 import re
-import time
-import requests
 from typing import List, Dict, Optional
 from dataclasses import dataclass, asdict
 from playwright.sync_api import sync_playwright
 from loguru import logger
 from pathlib import Path
 
+from scrapers.utils.images import ImageDownloader
+from scrapers.utils.waits import WaitStats, wait_for_network_idle, wait_for_selector, wait_for_stable_count
+
 
 @dataclass
 class CardData:
@@ -34,6 +35,7 @@ class CardData:
     illustration_type: Optional[str] = None  # 原作/アニメ/オリジナル/その他
     has_star_mark: bool = False  # 是否有星标
     modal_id: Optional[str] = None  # HTML中的modal ID，用于匹配插画类型
+    image_local_path: Optional[str] = None  # 下载后的 blob 地址 (/static/images/blobs/...)
 
 
 class JapanOfficialScraper:
@@ -42,6 +44,11 @@ class JapanOfficialScraper:
     BASE_URL = "https://www.onepiece-cardgame.com"
     CARD_LIST_URL = f"{BASE_URL}/cardlist/"
     
+    # 卡片列表（每个 modalCol 包含一张卡的完整数据）
+    CARD_SELECTOR = '.resultCol .modalCol'
+    SERIES_OPTION_SELECTOR = 'select.selectModal option'
+    COOKIE_BUTTON_SELECTOR = 'button:has-text("OK")'
+    
     # 动态计算项目根目录
     _PROJECT_ROOT = Path(__file__).parent.parent
     IMAGE_DIR = _PROJECT_ROOT / "data" / "images"
@@ -62,6 +69,10 @@ class JapanOfficialScraper:
         self.playwright = None
         self.browser = None
         self.page = None
+        # 全局限速器（并行爬取时由 ScraperPool 设置，多个 worker 共享）
+        self.rate_limiter = None
+        # 各类等待的实际耗时（并行爬取时由 ScraperPool 共享）
+        self.wait_stats = WaitStats()
         self.IMAGE_DIR.mkdir(parents=True, exist_ok=True)
     
     def start_browser(self):
@@ -75,57 +86,67 @@ class JapanOfficialScraper:
         self.page.set_viewport_size({"width": 1920, "height": 1080})
         logger.info("浏览器已启动")
     
+    def _throttle(self):
+        """请求官网前等待限速"""
+        if self.rate_limiter:
+            self.rate_limiter.wait()
+    
     def close_browser(self):
         """关闭浏览器"""
         if self.browser:
             self.browser.close()
+            self.browser = None
         if self.playwright:
             self.playwright.stop()
+            self.playwright = None
         logger.info("浏览器已关闭")
     
     def get_series_list(self) -> List[Dict]:
         """获取所有系列列表"""
         logger.info("获取系列列表...")
         
+        self._throttle()
         self.page.goto(self.CARD_LIST_URL, wait_until='networkidle')
-        time.sleep(2)
+        wait_for_selector(self.page, self.SERIES_OPTION_SELECTOR, self.wait_stats, label='series_options')
         
         # 从 select 元素获取所有系列
-        options = self.page.locator('select.selectModal option').all()
+        options = self.page.locator(self.SERIES_OPTION_SELECTOR).all()
         
         series_list = []
         for option in options:
-            value = option.get_attribute('value')
-            text = option.inner_text().strip()
-            
-            if not value or text in ['収録', 'ALL', '']:
-                continue
-            
-            clean_text = re.sub(r'<[^>]+>', ' ', text).strip()
-            clean_text = re.sub(r'\s+', ' ', clean_text)
-            
-            code_match = re.search(r'【([A-Z]+-?\d+)】', clean_text)
-            if not code_match:
-                continue
-            
-            code = code_match.group(1)
-            
-            series_type = 'other'
-            for keyword, stype in self.SERIES_TYPE_KEYWORDS.items():
-                if keyword in clean_text:
-                    series_type = stype
-                    break
-            
-            series_list.append({
-                'code': code,
-                'name': clean_text,
-                'official_series_id': value,
-                'series_type': series_type
-            })
+            series = self._parse_series_option(option.get_attribute('value'), option.inner_text())
+            if series:
+                series_list.append(series)
         
         logger.info(f"共找到 {len(series_list)} 个系列")
         return series_list
     
+    def _parse_series_option(self, value: Optional[str], text: str) -> Optional[Dict]:
+        """解析系列下拉框的一个选项，非系列选项返回 None"""
+        text = (text or '').strip()
+        if not value or text in ['収録', 'ALL', '']:
+            return None
+        
+        clean_text = re.sub(r'<[^>]+>', ' ', text).strip()
+        clean_text = re.sub(r'\s+', ' ', clean_text)
+        
+        code_match = re.search(r'【([A-Z]+-?\d+)】', clean_text)
+        if not code_match:
+            return None
+        
+        series_type = 'other'
+        for keyword, stype in self.SERIES_TYPE_KEYWORDS.items():
+            if keyword in clean_text:
+                series_type = stype
+                break
+        
+        return {
+            'code': code_match.group(1),
+            'name': clean_text,
+            'official_series_id': value,
+            'series_type': series_type
+        }
+    
     def scrape_series(self, series_id: str, download_images: bool = False, fetch_extras: bool = True) -> List[CardData]:
         """
         爬取指定系列的所有卡片 - 直接从HTML解析
@@ -138,26 +159,26 @@ class JapanOfficialScraper:
         url = f"{self.CARD_LIST_URL}?series={series_id}"
         logger.info(f"爬取系列: {url}")
         
-        self.page.goto(url, wait_until='networkidle')
-        time.sleep(2)
+        self._throttle()
+        self.page.goto(url, wait_until='domcontentloaded')
         
         # 关闭 Cookie 弹窗
         self._close_cookie_banner()
         
-        # 等待页面加载完成
-        time.sleep(3)
-        
-        # 等待卡片数据加载
-        try:
-            self.page.wait_for_selector('.resultCol .modalCol', timeout=10000)
-        except:
-            logger.warning("等待卡片加载超时")
+        # 等待卡片列表的请求结束，再等渲染完成（数量稳定、DOM 不再变化）
+        wait_for_network_idle(self.page, self.wait_stats, label='card_list_network')
+        wait_for_stable_count(self.page, self.CARD_SELECTOR, self.wait_stats, label='card_list')
         
         # 官网会一次性将所有卡片数据加载到 DOM 中（分页只是前端展示）
         # 直接提取所有卡片数据
         all_cards = self._extract_cards_from_html()
         logger.info(f"获取 {len(all_cards)} 条卡片记录")
         
+        return self._finish_series(all_cards, series_id, download_images, fetch_extras)
+    
+    def _finish_series(self, all_cards: List[CardData], series_id: str,
+                       download_images: bool, fetch_extras: bool) -> List[CardData]:
+        """版本编号 / 插画类型 / 图片下载（与取数方式无关的后处理）"""
         # 处理版本号
         seen_cards = {}
         for card in all_cards:
@@ -179,11 +200,9 @@ class JapanOfficialScraper:
                     card.illustration_type = illustration_map.get(card.modal_id)
                 # 星标无法自动检测，保持默认 False
         
-        # 下载图片
+        # 下载图片（并发，按内容保存到 blob 存储，地址随记录入库）
         if download_images:
-            for card in all_cards:
-                if card.image_url:
-                    self._download_image(card)
+            self._download_images(all_cards)
         
         logger.info(f"系列爬取完成，共 {len(all_cards)} 张卡片")
         return all_cards
@@ -191,17 +210,16 @@ class JapanOfficialScraper:
     def _close_cookie_banner(self):
         """关闭 Cookie 弹窗"""
         try:
-            ok_button = self.page.locator('button:has-text("OK")').first
-            if ok_button.is_visible(timeout=2000):
+            ok_button = self.page.locator(self.COOKIE_BUTTON_SELECTOR).first
+            if ok_button.is_visible():
                 ok_button.click()
-                time.sleep(0.5)
+                wait_for_selector(self.page, self.COOKIE_BUTTON_SELECTOR, self.wait_stats,
+                                  state='hidden', timeout=2000, label='cookie_banner')
         except:
             pass
     
     def _extract_cards_from_html(self) -> List[CardData]:
         """直接从HTML提取当前页所有卡片数据"""
-        cards = []
-        
         # 获取所有 modalCol（每个包含一张卡的完整数据）
         card_data_list = self.page.evaluate('''
             () => {
@@ -281,6 +299,11 @@ class JapanOfficialScraper:
             }
         ''')
         
+        return self._build_cards(card_data_list)
+    
+    def _build_cards(self, card_data_list: List[Dict]) -> List[CardData]:
+        """modalCol 提取结果 -> CardData（浏览器 / HTTP 两种取数方式共用）"""
+        cards = []
         for data in card_data_list:
             try:
                 card = CardData(
@@ -319,28 +342,14 @@ class JapanOfficialScraper:
         except:
             return None
     
-    def _download_image(self, card: CardData):
-        """下载卡片图片"""
-        if not card.image_url:
-            return
-        
-        try:
-            suffix = f"_v{card.version_index}" if card.version_index > 0 else ""
-            filename = f"{card.card_number}{suffix}.png"
-            filepath = self.IMAGE_DIR / filename
-            
-            if filepath.exists():
-                logger.debug(f"图片已存在: {filename}")
-                return
-            
-            response = requests.get(card.image_url, timeout=10)
-            response.raise_for_status()
-            
-            filepath.write_bytes(response.content)
-            logger.debug(f"下载图片: {filename}")
-            
-        except Exception as e:
-            logger.error(f"下载图片失败 {card.card_number}: {e}")
+    def _download_images(self, cards: List[CardData]):
+        """并发下载卡片图片，成功的卡片填写 image_local_path"""
+        with ImageDownloader(workers=8, rate=4.0) as downloader:
+            stored = downloader.download_many(card.image_url for card in cards)
+            for card in cards:
+                if card.image_url in stored:
+                    card.image_local_path = stored[card.image_url].url
+            logger.info(f"图片下载: {downloader.last_stats.summary()}")
     
     def _fetch_illustration_types(self, series_id: str) -> Dict[str, str]:
         """
@@ -353,6 +362,7 @@ class JapanOfficialScraper:
         card_to_type = {}
         
         for ill_type in illustration_types:
+            self._throttle()
             try:
                 card_ids = self.page.evaluate('''
                     (args) => {
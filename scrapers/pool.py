@@ -0,0 +1,144 @@
+"""
+并行爬取 - 多浏览器 worker + 结果队列
+
+Playwright 同步 API 的对象只能在创建它的线程中使用，
+因此每个 worker 线程各自启动一个爬虫（独立浏览器），从任务队列领取系列并行爬取，
+爬取结果放入有界结果队列，由调用方线程（持有数据库会话）逐个写库。
+所有 worker 共享一个 RateLimiter，总请求频率保持礼貌；等待耗时汇总到同一个 WaitStats。
+"""
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from scrapers.utils.rate_limit import RateLimiter
+from scrapers.utils.waits import WaitStats
+
+# 默认并行数 / 全局请求频率（次/秒）
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 2.0
+
+# 任务 / 结束标记
+_STOP = object()
+
+
+@dataclass
+class SeriesResult:
+    """一个系列的爬取结果"""
+    series_data: Dict
+    cards: List = field(default_factory=list)
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ScraperPool:
+    """
+    多 worker 并行爬取系列
+
+    用法:
+        pool = ScraperPool(lambda: JapanOfficialScraper(), workers=4, rate=2.0)
+        for result in pool.scrape(series_list):
+            ...  # 在当前线程写库
+    """
+
+    def __init__(self, scraper_factory: Callable, workers: int = DEFAULT_WORKERS,
+                 rate: float = DEFAULT_RATE):
+        self.scraper_factory = scraper_factory
+        self.workers = max(1, workers)
+        self.rate_limiter = RateLimiter(rate)
+        self.wait_stats = WaitStats()
+
+    def scrape(self, series_list: List[Dict], **scrape_kwargs) -> Iterator[SeriesResult]:
+        """
+        并行爬取，按完成顺序逐个产出结果
+
+        Args:
+            series_list: 系列数据 (get_series_list 的返回项)
+            scrape_kwargs: 传给 scraper.scrape_series 的参数
+
+        Yields:
+            SeriesResult；worker 全部启动失败时，未处理的系列以 error 结果产出
+        """
+        tasks = queue.Queue()
+        for series_data in series_list:
+            tasks.put(series_data)
+
+        workers = min(self.workers, len(series_list))
+        if not workers:
+            return
+        for _ in range(workers):
+            tasks.put(_STOP)
+
+        # 有界队列: 写库跟不上时 worker 暂停，避免结果堆积在内存中
+        results = queue.Queue(maxsize=workers * 2)
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=self._run_worker, args=(n, tasks, results, stop, scrape_kwargs),
+                             name=f'scraper-{n}', daemon=True)
+            for n in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            finished = 0
+            while finished < workers:
+                item = results.get()
+                if item is _STOP:
+                    finished += 1
+                    continue
+                yield item
+
+            # worker 异常退出时剩余的任务
+            while True:
+                try:
+                    series_data = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if series_data is not _STOP:
+                    yield SeriesResult(series_data, error=RuntimeError('没有可用的爬虫 worker'))
+        finally:
+            stop.set()
+            # 清空结果队列，让阻塞在 put 上的 worker 退出
+            while any(t.is_alive() for t in threads):
+                try:
+                    results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            for thread in threads:
+                thread.join()
+
+    def _run_worker(self, n: int, tasks: queue.Queue, results: queue.Queue,
+                    stop: threading.Event, scrape_kwargs: dict):
+        scraper = None
+        try:
+            scraper = self.scraper_factory()
+            scraper.rate_limiter = self.rate_limiter
+            scraper.wait_stats = self.wait_stats
+            scraper.start_browser()
+
+            while not stop.is_set():
+                series_data = tasks.get()
+                if series_data is _STOP:
+                    break
+                try:
+                    cards = scraper.scrape_series(series_data['official_series_id'], **scrape_kwargs)
+                    result = SeriesResult(series_data, cards)
+                except Exception as e:
+                    logger.error(f"[worker {n}] 爬取系列 {series_data['code']} 失败: {e}")
+                    result = SeriesResult(series_data, error=e)
+                results.put(result)
+        except Exception as e:
+            logger.error(f"[worker {n}] 启动失败: {e}")
+        finally:
+            if scraper is not None:
+                try:
+                    scraper.close_browser()
+                except Exception as e:
+                    logger.warning(f"[worker {n}] 关闭浏览器失败: {e}")
+            results.put(_STOP)
@@ -2,22 +2,88 @@
 价格数据爬虫 - 从 OPTCG API 获取价格数据
 数据源: https://optcgapi.com/
 """
+import re
 import requests
+import threading
 import time
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import List, Optional
 from loguru import logger
 
+from scrapers.utils.fetcher import HttpFetcher
+from scrapers.utils.http_cache import HttpCache
+
+
+@dataclass
+class PriceFetchStats:
+    """一次批量取价的统计（并发时多个线程共享）"""
+    total: int = 0
+    succeeded: int = 0
+    empty: int = 0
+    failed: List[str] = field(default_factory=list)
+    # 整套接口: 成功请求数 / 由整套结果命中的卡片数 / 请求失败的系列
+    sets: int = 0
+    set_hits: int = 0
+    set_failed: List[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+    elapsed: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    
+    def record(self, card_number: str, prices: Optional[list]) -> int:
+        """记录一张卡的结果（prices 为 None 表示失败），返回已完成数"""
+        with self._lock:
+            if prices is None:
+                self.failed.append(card_number)
+            elif prices:
+                self.succeeded += 1
+            else:
+                self.empty += 1
+            return self.succeeded + self.empty + len(self.failed)
+    
+    def record_set(self, set_code: str, hits: Optional[int]) -> None:
+        """记录一次整套请求（hits 为 None 表示请求失败，否则为命中的卡片数）"""
+        with self._lock:
+            if hits is None:
+                self.set_failed.append(set_code)
+            else:
+                self.sets += 1
+                self.set_hits += hits
+                self.succeeded += hits
+    
+    def summary(self) -> str:
+        text = (f"Price fetch: {self.succeeded} ok, {self.empty} no data, "
+                f"{len(self.failed)} failed / {self.total} cards in {self.elapsed:.1f}s")
+        if self.sets or self.set_failed:
+            text += (f" ({self.set_hits} cards from {self.sets} set requests, "
+                     f"{len(self.set_failed)} set requests failed)")
+        return text
+
 
 class PriceScraper:
     """价格数据爬虫"""
     
     BASE_URL = "https://optcgapi.com/api"
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'OPCG-TCG-Manager/1.0'
-        })
+    # 系列代码前缀 -> 整套价格接口（其余系列如 PROMO 只能逐张请求）
+    SET_ENDPOINTS = {
+        'OP': 'sets',
+        'EB': 'sets',
+        'PRB': 'sets',
+        'ST': 'decks',
+    }
+    
+    def __init__(self, rate: float = 5.0, concurrency: int = 8, cache: bool = True):
+        """
+        Args:
+            rate: 对 API 的请求频率上限（次/秒）
+            concurrency: 并发请求数（连接池大小）
+            cache: 是否使用磁盘 HTTP 缓存（条件请求，API 数据未变化时不传输响应体）
+        """
+        self.fetcher = HttpFetcher(concurrency=concurrency, per_host=concurrency, rate=rate,
+                                   cache=HttpCache('prices') if cache else None)
+        self.session = self.fetcher.session
+        self.last_stats = None
     
     def get_card_price(self, card_number: str) -> list:
         """
@@ -29,58 +95,174 @@ class PriceScraper:
         Returns:
             价格数据列表 (可能有多个版本)
         """
-        url = f"{self.BASE_URL}/sets/card/{card_number}/"
-        
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = []
-            for item in data:
-                results.append({
-                    'card_number': item.get('card_set_id'),
-                    'name': item.get('card_name'),
-                    'market_price': item.get('market_price'),
-                    'inventory_price': item.get('inventory_price'),
-                    'is_alt_art': 'Alternate Art' in item.get('card_name', ''),
-                    'image_id': item.get('card_image_id'),
-                    'date_scraped': item.get('date_scraped')
-                })
-            
-            return results
-            
+            return self._fetch_card_price(card_number)
         except requests.RequestException as e:
             logger.error(f"Error fetching price for {card_number}: {e}")
             return []
     
-    def get_prices_for_cards(self, card_numbers: list, delay: float = 0.5) -> list:
+    def _fetch_card_price(self, card_number: str) -> list:
+        """获取单张卡片的价格，请求失败时抛出 requests.RequestException"""
+        url = f"{self.BASE_URL}/sets/card/{card_number}/"
+        
+        response = self.fetcher.get(url, timeout=10)
+        response.raise_for_status()
+        return [self._parse_price_item(item) for item in response.json()]
+    
+    @staticmethod
+    def _parse_price_item(item: dict) -> dict:
+        """API 返回的一条价格 -> 价格数据"""
+        return {
+            'card_number': item.get('card_set_id'),
+            'name': item.get('card_name'),
+            'market_price': item.get('market_price'),
+            'inventory_price': item.get('inventory_price'),
+            'is_alt_art': 'Alternate Art' in (item.get('card_name') or ''),
+            'image_id': item.get('card_image_id'),
+            'date_scraped': item.get('date_scraped')
+        }
+    
+    def _set_url(self, set_code: str) -> Optional[str]:
         """
-        批量获取多张卡片的价格
+        系列代码 -> 整套价格的 API 地址；API 没有整套接口的系列返回 None
+        
+        接受 'OP-14' 或 'OP14' 两种写法
+        """
+        match = re.match(r'^([A-Z]+)-?(\d+)$', (set_code or '').upper())
+        if not match:
+            return None
+        prefix, number = match.groups()
+        endpoint = self.SET_ENDPOINTS.get(prefix)
+        if not endpoint:
+            return None
+        return f"{self.BASE_URL}/{endpoint}/{prefix}-{number}/"
+    
+    def get_set_prices(self, set_code: str) -> list:
+        """
+        一次请求获取整个系列的价格
         
         Args:
-            card_numbers: 卡片编号列表
-            delay: 每次请求间隔（秒）
+            set_code: 系列代码，如 'OP-14'
             
         Returns:
-            所有卡片的价格数据
+            价格数据列表；系列不支持或请求失败时返回空列表
+            （需要区分失败时使用 _fetch_set_prices）
         """
-        results = []
+        try:
+            return self._fetch_set_prices(set_code)
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Error fetching set prices for {set_code}: {e}")
+            return []
+    
+    def _fetch_set_prices(self, set_code: str) -> list:
+        """获取整个系列的价格，系列不支持时返回空列表，请求失败时抛出异常"""
+        url = self._set_url(set_code)
+        if not url:
+            return []
         
-        for i, card_number in enumerate(card_numbers):
-            prices = self.get_card_price(card_number)
-            results.extend(prices)
+        response = self.fetcher.get(url, timeout=30)
+        response.raise_for_status()
+        return [self._parse_price_item(item) for item in response.json()]
+    
+    def get_prices_for_sets(self, card_numbers_by_set: dict, delay: float = 0.5, workers: int = 1) -> list:
+        """
+        按系列批量获取价格：每个系列一次请求，整套结果里缺失的卡片再逐张请求
+        
+        Args:
+            card_numbers_by_set: {系列代码: [卡片编号]}
+            delay / workers: 逐张补充请求时使用，同 get_prices_for_cards
             
-            if i % 50 == 0 and i > 0:
-                logger.info(f"Progress: {i}/{len(card_numbers)} cards")
+        Returns:
+            所需卡片的价格数据；整套命中 / 失败的系列与逐张补充的统计见 self.last_stats
+        """
+        set_codes = list(card_numbers_by_set)
+        stats = PriceFetchStats(total=sum(len(set(n)) for n in card_numbers_by_set.values()))
+        self.last_stats = stats
+        
+        def fetch_set(set_code):
+            try:
+                return self._fetch_set_prices(set_code)
+            except (requests.RequestException, ValueError) as e:
+                logger.error(f"Error fetching set prices for {set_code}: {e}")
+                return None
+        
+        set_results = self.fetcher.map(fetch_set, set_codes, workers=max(1, workers))
+        
+        results = []
+        missing = []
+        for set_code, set_prices in zip(set_codes, set_results):
+            wanted = card_numbers_by_set[set_code]
+            wanted_set = set(wanted)
+            hits = [p for p in set_prices or [] if p['card_number'] in wanted_set]
+            found = {p['card_number'] for p in hits}
+            results.extend(hits)
+            missing.extend(n for n in dict.fromkeys(wanted) if n not in found)
+            if self._set_url(set_code):
+                stats.record_set(set_code, None if set_prices is None else len(found))
+            logger.debug(f"Set {set_code}: {len(found)}/{len(wanted_set)} cards from set endpoint")
+        
+        logger.info(f"Got {len(results)} price records from {stats.sets} set requests, "
+                    f"{len(missing)} cards need per-card requests")
+        if stats.set_failed:
+            logger.warning(f"{len(stats.set_failed)} set requests failed: {', '.join(stats.set_failed)}")
+        if missing:
+            results.extend(self.get_prices_for_cards(missing, delay=delay, workers=workers, stats=stats))
+        else:
+            stats.elapsed = time.monotonic() - stats.started_at
+            logger.info(stats.summary())
+        return results
+    
+    def get_prices_for_cards(self, card_numbers: list, delay: float = 0.5, workers: int = 1,
+                             stats: PriceFetchStats = None) -> list:
+        """
+        批量获取多张卡片的价格
+        
+        Args:
+            card_numbers: 卡片编号列表
+            delay: 每次请求间隔（秒），仅顺序模式使用
+            workers: 并发数；> 1 时并发请求，频率由构造时的 rate 控制
+            stats: 累加到已有的统计（get_prices_for_sets 逐张补充时传入）
             
-            time.sleep(delay)
+        Returns:
+            所有卡片的价格数据（按 card_numbers 顺序）；
+            成功 / 失败统计见 self.last_stats
+        """
+        if stats is None:
+            stats = PriceFetchStats(total=len(card_numbers))
+        self.last_stats = stats
+        
+        def fetch(card_number):
+            try:
+                prices = self._fetch_card_price(card_number)
+            except (requests.RequestException, ValueError) as e:
+                logger.error(f"Error fetching price for {card_number}: {e}")
+                stats.record(card_number, None)
+                return []
+            done = stats.record(card_number, prices)
+            if done % 50 == 0:
+                logger.info(f"Progress: {done}/{stats.total} cards")
+            return prices
+        
+        if workers > 1:
+            per_card = self.fetcher.map(fetch, card_numbers, workers=workers)
+        else:
+            per_card = []
+            for card_number in card_numbers:
+                per_card.append(fetch(card_number))
+                time.sleep(delay)
+        
+        results = [price for prices in per_card for price in prices]
+        stats.elapsed = time.monotonic() - stats.started_at
         
         logger.info(f"Got {len(results)} price records for {len(card_numbers)} cards")
+        if stats.failed:
+            logger.warning(f"{len(stats.failed)} cards failed: {', '.join(stats.failed[:20])}")
+        logger.info(stats.summary())
         return results
 
 
-def update_prices_in_db(app, limit: int = None, series_code: str = None):
+def update_prices_in_db(app, limit: int = None, series_code: str = None,
+                        workers: int = 8, rate: float = 5.0):
     """
     更新数据库中的价格数据
     
@@ -88,13 +270,18 @@ def update_prices_in_db(app, limit: int = None, series_code: str = None):
         app: Flask 应用实例
         limit: 限制更新的卡片数量（用于测试）
         series_code: 指定系列代码，如 'OP-14'
+        workers: 并发请求数（1 为顺序请求）
+        rate: 对 API 的请求频率上限（次/秒）
     """
     from app import db
-    from app.models.card import Card, CardVersion
-    from app.models.price import PriceHistory
+    from app.models.card import Card
     from app.models.series import Series
+    from app.services.card_listing import refresh_listings
+    from app.services.price_ingest import write_prices
+    from app.services.price_movers import refresh_movers
+    from app.services.price_rollup import refresh_rollups
     
-    scraper = PriceScraper()
+    scraper = PriceScraper(rate=rate, concurrency=max(1, workers))
     
     with app.app_context():
         # 获取需要更新的卡片
@@ -110,54 +297,28 @@ def update_prices_in_db(app, limit: int = None, series_code: str = None):
         if limit:
             cards = cards[:limit]
         
-        card_numbers = [c.card_number for c in cards]
-        logger.info(f"Fetching prices for {len(card_numbers)} cards...")
+        # 按系列分组：每个系列一次整套请求，缺失的再逐张请求
+        series_codes = dict(db.session.query(Series.id, Series.code).all())
+        card_numbers_by_set = {}
+        for c in cards:
+            card_numbers_by_set.setdefault(series_codes.get(c.series_id), []).append(c.card_number)
+        logger.info(f"Fetching prices for {len(cards)} cards in {len(card_numbers_by_set)} sets...")
         
         # 批量获取价格
-        prices = scraper.get_prices_for_cards(card_numbers, delay=0.3)
+        prices = scraper.get_prices_for_sets(card_numbers_by_set, delay=0.3, workers=workers)
         
-        total_updated = 0
-        today = datetime.utcnow().date()
+        # 批量写入（每个版本每天一条）
+        result = write_prices(prices, source='optcg_api', currency='USD', lang='jp')
+        total_updated = result.inserted
         
-        for price_data in prices:
-            card_number = price_data['card_number']
-            market_price = price_data['market_price']
-            
-            if market_price is None or market_price == 0:
-                continue
-            
-            # 查找对应的卡片
-            card = Card.query.filter_by(card_number=card_number, language='jp').first()
-            if not card:
-                continue
-            
-            # 确定版本类型
-            version_type = 'alt_art' if price_data['is_alt_art'] else 'normal'
-            version = card.versions.filter_by(version_type=version_type).first()
-            
-            if not version:
-                version = card.versions.first()
-            
-            if version:
-                # 检查今天是否已有记录
-                existing = PriceHistory.query.filter(
-                    PriceHistory.version_id == version.id,
-                    PriceHistory.source == 'optcg_api',
-                    db.func.date(PriceHistory.recorded_at) == today
-                ).first()
-                
-                if not existing:
-                    price_record = PriceHistory(
-                        version_id=version.id,
-                        source='optcg_api',
-                        currency='USD',
-                        price=market_price,
-                        condition='unsealed',
-                        price_type='average'
-                    )
-                    db.session.add(price_record)
-                    total_updated += 1
+        # 重算受影响版本的当前日/周/月聚合
+        refresh_rollups(version_ids=result.version_ids, since=datetime.utcnow())
+        
+        # 重算涨跌榜
+        refresh_movers()
         
+        # 同步列表读模型中的最新价格
+        refresh_listings(version_ids=result.version_ids)
         db.session.commit()
         logger.info(f"Updated {total_updated} price records")
         return total_updated
@@ -174,7 +335,7 @@ if __name__ == '__main__':
         print(f"{p['name']}: ${p['market_price']}")
     
     # 测试获取系列价格
-    print("\n=== Set Prices (OP14, first 5) ===")
-    set_prices = scraper.get_set_prices('OP14')
+    print("\n=== Set Prices (OP-14, first 5) ===")
+    set_prices = scraper.get_set_prices('OP-14')
     for p in set_prices[:5]:
         print(f"{p['card_number']} {p['name']}: ${p['market_price']}")
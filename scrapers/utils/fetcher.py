@@ -0,0 +1,184 @@
+"""
+并发 HTTP 请求 - 连接池 + 按主机限流 + 重试
+
+价格 API、图片下载等基于 requests 的请求统一经过 HttpFetcher：
+- 共享一个 Session，连接池大小与并发数一致，连接可复用
+- 每个主机一个信号量（同时在途请求数）和一个令牌桶（请求频率）
+- 连接错误 / 超时 / 429 / 5xx 按指数退避 + 随机抖动重试，优先遵守 Retry-After
+- map() 用线程池并发执行任意请求函数，调用方仍是同步代码
+- 传入 HttpCache 时 get() 发送条件请求，304 时使用缓存 (scrapers.utils.http_cache)
+
+与 ScraperPool 一样使用线程而不是 asyncio，现有脚本无需改动调用方式。
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from scrapers.utils.http_cache import HttpCache
+from scrapers.utils.rate_limit import TokenBucket
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PER_HOST = 4
+DEFAULT_RATE = 5.0
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 10
+
+# 需要重试的状态码
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# 退避基数 / 上限（秒）
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+USER_AGENT = 'OPCG-TCG-Manager/1.0'
+
+
+class HttpFetcher:
+    """
+    线程安全的 HTTP 请求器
+
+    用法:
+        with HttpFetcher(rate=5.0, per_host=4) as fetcher:
+            response = fetcher.get(url)
+            results = fetcher.map(fetch_one, items)
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, per_host: int = DEFAULT_PER_HOST,
+                 rate: float = DEFAULT_RATE, burst: Optional[int] = None,
+                 retries: int = DEFAULT_RETRIES, timeout: float = DEFAULT_TIMEOUT,
+                 headers: Optional[Dict] = None, cache: Optional[HttpCache] = None):
+        """
+        Args:
+            concurrency: map() 的线程数，也是连接池大小
+            per_host: 单个主机同时在途的请求数
+            rate: 单个主机的请求频率（次/秒，<= 0 不限速）
+            burst: 令牌桶容量，默认与 per_host 相同
+            retries: 失败后的最大重试次数
+            timeout: 单次请求超时（秒）
+            cache: 磁盘 HTTP 缓存，get() 使用条件请求
+        """
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.rate = rate
+        self.burst = burst or self.per_host
+        self.retries = max(0, retries)
+        self.timeout = timeout
+        self.cache = cache
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _host_limits(self, url: str):
+        """主机对应的 (信号量, 令牌桶)，首次访问时创建"""
+        host = urlsplit(url).netloc
+        with self._hosts_lock:
+            limits = self._hosts.get(host)
+            if limits is None:
+                limits = (threading.BoundedSemaphore(self.per_host), TokenBucket(self.rate, self.burst))
+                self._hosts[host] = limits
+            return limits
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """第 attempt 次重试前的等待时间：Retry-After 优先，否则指数退避 + 全抖动"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), BACKOFF_MAX)
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送请求（限流 + 重试）
+
+        Returns:
+            最后一次响应；重试耗尽仍为 429/5xx 时照常返回，由调用方 raise_for_status
+
+        Raises:
+            requests.RequestException: 重试耗尽仍连接失败 / 超时
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        semaphore, bucket = self._host_limits(url)
+
+        attempt = 0
+        while True:
+            bucket.wait()
+            response = None
+            try:
+                with semaphore:
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries:
+                    raise
+                logger.debug(f"请求失败 {url}: {e}，重试 {attempt + 1}/{self.retries}")
+            else:
+                if response.status_code not in RETRY_STATUS or attempt >= self.retries:
+                    return response
+                logger.debug(f"请求 {url} 返回 {response.status_code}，重试 {attempt + 1}/{self.retries}")
+
+            time.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    def get(self, url: str, revalidate: bool = True, **kwargs) -> requests.Response:
+        """
+        GET；配置了缓存时发送条件请求
+
+        Args:
+            revalidate: False 时不带条件请求头（例如本地文件已丢失，需要完整响应）
+
+        Returns:
+            响应；使用缓存时 response.not_modified 为 True，
+            保存了响应体的缓存会把 304 还原为带缓存内容的 200
+        """
+        if self.cache is None or kwargs.get('stream'):
+            return self.request('GET', url, **kwargs)
+
+        entry = self.cache.lookup(url) if revalidate else None
+        if entry:
+            kwargs['headers'] = {**self.cache.validators(entry), **(kwargs.get('headers') or {})}
+        response = self.request('GET', url, **kwargs)
+
+        response.not_modified = response.status_code == 304 and entry is not None
+        if response.not_modified:
+            self.cache.touch(url, entry)
+            return self.cache.replay(url, entry, response)
+        self.cache.store(url, response)
+        return response
+
+    def map(self, func: Callable, items: Iterable, workers: Optional[int] = None) -> List:
+        """
+        并发执行 func(item)，按 items 的顺序返回结果
+
+        func 内部应通过本 fetcher 发请求，以共享连接池和限流；
+        func 抛出的异常会在取结果时重新抛出，需要部分失败统计的调用方应在 func 内捕获。
+        """
+        items = list(items)
+        if not items:
+            return []
+        workers = min(workers or self.concurrency, len(items))
+        if workers == 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetcher') as executor:
+            return list(executor.map(func, items))
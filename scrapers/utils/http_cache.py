@@ -0,0 +1,146 @@
+"""
+磁盘 HTTP 缓存 - 条件请求 (ETag / Last-Modified)
+
+每个 URL 一个 {sha1(url)}.json 元数据文件（ETag / Last-Modified / 响应体 SHA-1 / 获取时间），
+store_bodies=True 时另存 {sha1(url)}.body 响应体。HttpFetcher.get() 带上
+If-None-Match / If-Modified-Since，服务器返回 304 时直接使用缓存，不再传输响应体。
+
+图片缓存不保存响应体（本地图片文件就是响应体），只用 304 判断是否需要重新下载。
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+# 默认缓存目录（不纳入版本库）
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent.parent / 'data' / 'http_cache'
+
+
+def _atomic_write(path: Path, data: bytes):
+    """写入临时文件后 rename，并发读取时不会读到半个文件"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class HttpCache:
+    """
+    线程安全的磁盘 HTTP 缓存
+
+    用法:
+        cache = HttpCache('prices')
+        fetcher = HttpFetcher(cache=cache)
+        response = fetcher.get(url)   # response.not_modified 为 True 时内容来自缓存
+    """
+
+    def __init__(self, name: str, directory: Optional[Path] = None, store_bodies: bool = True):
+        """
+        Args:
+            name: 子目录名（不同用途的缓存分开存放）
+            directory: 缓存根目录，默认 data/http_cache
+            store_bodies: 是否保存响应体；False 时只保存校验信息
+        """
+        self.path = Path(directory or DEFAULT_CACHE_DIR) / name
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.store_bodies = store_bodies
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """URL 的缓存元数据；没有缓存或需要的响应体缺失时返回 None"""
+        key = self._key(url)
+        try:
+            entry = json.loads((self.path / f'{key}.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if entry.get('url') != url:
+            return None
+        if self.store_bodies and not (self.path / f'{key}.body').exists():
+            return None
+        return entry
+
+    @staticmethod
+    def validators(entry: Optional[Dict]) -> Dict[str, str]:
+        """条件请求头"""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def body(self, url: str) -> Optional[bytes]:
+        try:
+            return (self.path / f'{self._key(url)}.body').read_bytes()
+        except OSError:
+            return None
+
+    def store(self, url: str, response: requests.Response) -> Optional[Dict]:
+        """
+        保存 200 响应的校验信息（及响应体）
+
+        Returns:
+            元数据；响应没有 ETag / Last-Modified 时不缓存，返回 None
+        """
+        body = response.content if self.store_bodies else None
+        return self.remember(url, response, hashlib.sha1(response.content).hexdigest(), body)
+
+    def remember(self, url: str, response: requests.Response, body_sha1: str,
+                 body: Optional[bytes] = None) -> Optional[Dict]:
+        """
+        保存校验信息；流式下载时由调用方计算响应体哈希，body 不为空时一并保存
+
+        Returns:
+            元数据；响应没有 ETag / Last-Modified 时不缓存，返回 None
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return None
+
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_sha1': body_sha1,
+            'content_type': response.headers.get('Content-Type'),
+            'fetched_at': datetime.utcnow().isoformat(),
+        }
+        key = self._key(url)
+        with self._lock:
+            if body is not None:
+                _atomic_write(self.path / f'{key}.body', body)
+            _atomic_write(self.path / f'{key}.json', json.dumps(entry).encode('utf-8'))
+        return entry
+
+    def touch(self, url: str, entry: Dict):
+        """304 时更新获取时间"""
+        entry = dict(entry, fetched_at=datetime.utcnow().isoformat())
+        with self._lock:
+            _atomic_write(self.path / f'{self._key(url)}.json', json.dumps(entry).encode('utf-8'))
+
+    def replay(self, url: str, entry: Dict, response: requests.Response) -> requests.Response:
+        """用缓存的响应体把 304 响应还原为 200，调用方可照常 .json() / .content"""
+        body = self.body(url) if self.store_bodies else None
+        if body is None:
+            return response
+        response.status_code = 200
+        response._content = body
+        if entry.get('content_type'):
+            response.headers['Content-Type'] = entry['content_type']
+        return response
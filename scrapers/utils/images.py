@@ -0,0 +1,241 @@
+"""
+图片下载 - 并发 + 流式写盘 + 按内容寻址存储
+
+原先 BaseScraper.download_image 与 JapanOfficialScraper._download_image 逐张串行下载，
+整个响应体读入内存，再按 {card_number}{suffix} 写到两个不同目录，
+同一张图在多个系列再录时会重复保存。
+
+现在:
+- BlobStore 按内容 SHA-1 保存: app/static/images/blobs/ab/abcdef....png，相同内容只存一份
+- ImageDownloader 用 HttpFetcher 的线程池并发下载，iter_content 分块写入临时文件并同时计算哈希
+- 已下载过的 URL 发送条件请求（HttpCache 记录的 body_sha1 即 blob 哈希），304 时直接复用 blob
+
+CardImage 与 blob 的对应关系由 app.services.image_manifest 写入 card_image_blobs 清单表。
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from loguru import logger
+
+from scrapers.utils.fetcher import HttpFetcher
+from scrapers.utils.http_cache import HttpCache
+
+_PROJECT_ROOT = Path(__file__).parent.parent.parent
+BLOB_ROOT = _PROJECT_ROOT / 'app' / 'static' / 'images' / 'blobs'
+BLOB_URL_PREFIX = '/static/images/blobs'
+
+# 流式写盘的分块大小
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_WORKERS = 16
+DEFAULT_RATE = 10.0
+
+CONTENT_TYPE_EXT = {
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/webp': 'webp',
+    'image/gif': 'gif',
+}
+IMAGE_EXTS = ('png', 'jpg', 'jpeg', 'webp', 'gif')
+
+
+@dataclass
+class StoredImage:
+    """一个已保存的 blob"""
+    sha1: str
+    ext: str
+    size: int
+    url: str
+    # 本次是否新写入（False 表示内容已存在，去重）
+    created: bool = False
+    # 本次是否因 304 复用
+    not_modified: bool = False
+
+
+def guess_ext(url: str, content_type: Optional[str] = None) -> str:
+    """按 Content-Type，其次按 URL 后缀确定扩展名"""
+    if content_type:
+        ext = CONTENT_TYPE_EXT.get(content_type.split(';')[0].strip().lower())
+        if ext:
+            return ext
+    ext = url.split('?')[0].rsplit('.', 1)[-1].lower()
+    if ext == 'jpeg':
+        return 'jpg'
+    return ext if ext in IMAGE_EXTS else 'jpg'
+
+
+class BlobStore:
+    """按内容 SHA-1 寻址的图片存储（线程安全）"""
+
+    def __init__(self, root: Optional[Path] = None, url_prefix: str = BLOB_URL_PREFIX):
+        self.root = Path(root or BLOB_ROOT)
+        self.url_prefix = url_prefix.rstrip('/')
+        self._tmp = self.root / '.tmp'
+        self._tmp.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, sha1: str, ext: str) -> Path:
+        return self.root / sha1[:2] / f'{sha1}.{ext}'
+
+    def url_for(self, sha1: str, ext: str) -> str:
+        return f'{self.url_prefix}/{sha1[:2]}/{sha1}.{ext}'
+
+    def parse_url(self, url: Optional[str]) -> Optional[tuple]:
+        """blob URL -> (sha1, ext)；不是本存储的 URL 时返回 None"""
+        if not url or not url.startswith(self.url_prefix + '/'):
+            return None
+        name = url.rsplit('/', 1)[-1]
+        sha1, _, ext = name.partition('.')
+        if len(sha1) != 40 or not ext:
+            return None
+        return sha1, ext
+
+    def find(self, sha1: str) -> Optional[StoredImage]:
+        """已保存的 blob（任意扩展名）"""
+        for path in (self.root / sha1[:2]).glob(f'{sha1}.*'):
+            ext = path.suffix.lstrip('.')
+            return StoredImage(sha1, ext, path.stat().st_size, self.url_for(sha1, ext))
+        return None
+
+    def write_stream(self, chunks: Iterable[bytes], ext: str) -> StoredImage:
+        """分块写入临时文件并计算哈希，内容已存在时丢弃临时文件"""
+        digest = hashlib.sha1()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    if chunk:
+                        digest.update(chunk)
+                        size += len(chunk)
+                        f.write(chunk)
+            sha1 = digest.hexdigest()
+            path = self.path_for(sha1, ext)
+            if path.exists():
+                os.unlink(tmp)
+                return StoredImage(sha1, ext, size, self.url_for(sha1, ext))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, path)
+            return StoredImage(sha1, ext, size, self.url_for(sha1, ext), created=True)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+
+@dataclass
+class DownloadStats:
+    """一次批量下载的统计（线程安全）"""
+    downloaded: int = 0
+    deduplicated: int = 0
+    not_modified: int = 0
+    bytes: int = 0
+    failed: List[str] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, url: str, stored: Optional[StoredImage]):
+        with self._lock:
+            if stored is None:
+                self.failed.append(url)
+            elif stored.not_modified:
+                self.not_modified += 1
+            elif stored.created:
+                self.downloaded += 1
+                self.bytes += stored.size
+            else:
+                self.deduplicated += 1
+
+    def summary(self) -> str:
+        return (f"新图片 {self.downloaded} ({self.bytes / 1024 / 1024:.1f} MB), "
+                f"内容重复 {self.deduplicated}, 未更新 {self.not_modified}, 失败 {len(self.failed)}")
+
+
+class ImageDownloader:
+    """
+    并发图片下载器
+
+    用法:
+        with ImageDownloader(workers=16) as downloader:
+            stored = downloader.download_many(urls)   # {url: StoredImage}
+            print(downloader.last_stats.summary())
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, rate: float = DEFAULT_RATE,
+                 store: Optional[BlobStore] = None, cache: Optional[HttpCache] = None,
+                 fetcher: Optional[HttpFetcher] = None):
+        """
+        Args:
+            workers: 并发下载数
+            rate: 单个主机的请求频率（次/秒）
+            store: blob 存储，默认 app/static/images/blobs
+            cache: 条件请求缓存，默认 HttpCache('images', store_bodies=False)
+            fetcher: 共享的 HttpFetcher，默认新建
+        """
+        self.workers = max(1, workers)
+        self.store = store or BlobStore()
+        self.cache = cache or HttpCache('images', store_bodies=False)
+        self.fetcher = fetcher or HttpFetcher(concurrency=self.workers, per_host=self.workers,
+                                              rate=rate, timeout=30)
+        self.last_stats = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.fetcher.close()
+
+    def download(self, url: str) -> StoredImage:
+        """
+        下载一张图片到 blob 存储
+
+        Raises:
+            requests.RequestException: 请求失败
+        """
+        entry = self.cache.lookup(url)
+        known = self.store.find(entry['body_sha1']) if entry else None
+        headers = self.cache.validators(entry) if known else {}
+
+        response = self.fetcher.request('GET', url, stream=True, headers=headers)
+        try:
+            if response.status_code == 304 and known:
+                known.not_modified = True
+                return known
+            response.raise_for_status()
+            ext = guess_ext(url, response.headers.get('Content-Type'))
+            stored = self.store.write_stream(response.iter_content(CHUNK_SIZE), ext)
+        finally:
+            response.close()
+
+        self.cache.remember(url, response, stored.sha1)
+        return stored
+
+    def download_many(self, urls: Iterable[str]) -> Dict[str, StoredImage]:
+        """
+        并发下载，相同 URL 只请求一次
+
+        Returns:
+            {url: StoredImage}；失败的 URL 不在结果中，见 self.last_stats.failed
+        """
+        unique = list(dict.fromkeys(u for u in urls if u))
+        stats = DownloadStats()
+
+        def fetch(url):
+            try:
+                stored = self.download(url)
+            except (requests.RequestException, OSError) as e:
+                logger.warning(f"下载图片失败 {url}: {e}")
+                stored = None
+            stats.record(url, stored)
+            return stored
+
+        results = self.fetcher.map(fetch, unique, workers=self.workers)
+        self.last_stats = stats
+        return {url: stored for url, stored in zip(unique, results) if stored is not None}
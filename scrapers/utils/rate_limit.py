@@ -0,0 +1,63 @@
+"""
+全局限速 - 多个爬虫线程共享
+
+并行爬取时每个 worker 各自驱动一个浏览器，
+对官网的页面请求统一经过同一个 RateLimiter，保证总请求频率不超过 rate 次/秒。
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """线程安全的固定间隔限速器"""
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: 每秒允许的请求数（<= 0 表示不限速）
+        """
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """阻塞到下一个可用的请求时刻"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + self.interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TokenBucket:
+    """线程安全的令牌桶限速器：平均 rate 次/秒，允许 burst 次突发"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: 每秒补充的令牌数（<= 0 表示不限速）
+            burst: 桶容量，即空闲后可连续发出的请求数
+        """
+        self.rate = rate if rate and rate > 0 else 0.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """取一个令牌，桶空时阻塞到令牌补充"""
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            # 先扣除再计算等待，令牌不足时为负，后来者依次排队
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
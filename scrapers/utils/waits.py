@@ -0,0 +1,149 @@
+"""
+事件驱动等待 - 替代固定 sleep
+
+等待具体条件（网络空闲、元素数量稳定、列表内容变化），超时后继续而不是报错，
+并记录每类等待的实际耗时，便于确认时间花在哪里。
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from loguru import logger
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+# 元素数量在此时间内无 DOM 变化即视为加载完成
+DEFAULT_QUIET_MS = 500
+DEFAULT_TIMEOUT_MS = 10000
+
+# MutationObserver: 匹配元素存在且 quietMs 内没有 DOM 变化时返回
+_STABLE_COUNT_JS = '''
+    ([selector, quietMs, timeoutMs]) => new Promise((resolve) => {
+        const count = () => document.querySelectorAll(selector).length;
+        let quietTimer = null;
+        let observer = null;
+        const finish = (timedOut) => {
+            if (observer) observer.disconnect();
+            clearTimeout(quietTimer);
+            clearTimeout(limitTimer);
+            resolve({count: count(), timedOut});
+        };
+        const arm = () => {
+            clearTimeout(quietTimer);
+            quietTimer = setTimeout(() => count() > 0 ? finish(false) : arm(), quietMs);
+        };
+        const limitTimer = setTimeout(() => finish(true), timeoutMs);
+        observer = new MutationObserver(arm);
+        observer.observe(document.body, {childList: true, subtree: true});
+        arm();
+    })
+'''
+
+# 第一个匹配元素的文本与旧值不同（翻页后列表已替换）
+_TEXT_CHANGED_JS = '''
+    ([selector, previous]) => {
+        const el = document.querySelector(selector);
+        return !!el && el.textContent.trim() !== previous;
+    }
+'''
+
+
+class WaitStats:
+    """按类别累计等待次数 / 耗时 / 超时次数（线程安全，多个 worker 可共享）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = defaultdict(lambda: {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+
+    def record(self, label: str, elapsed: float, timed_out: bool = False):
+        with self._lock:
+            item = self._data[label]
+            item['count'] += 1
+            item['total'] += elapsed
+            item['max'] = max(item['max'], elapsed)
+            item['timeouts'] += int(timed_out)
+
+    def summary(self) -> Dict[str, dict]:
+        """{类别: {count, total, avg, max, timeouts}}（秒）"""
+        with self._lock:
+            return {
+                label: {**item, 'avg': item['total'] / item['count'] if item['count'] else 0.0}
+                for label, item in self._data.items()
+            }
+
+    def log_summary(self):
+        for label, item in sorted(self.summary().items()):
+            logger.info(
+                f"等待 [{label}]: {item['count']} 次, 共 {item['total']:.1f}s, "
+                f"平均 {item['avg']:.2f}s, 最长 {item['max']:.2f}s, 超时 {item['timeouts']} 次"
+            )
+
+
+@contextmanager
+def timed(stats: Optional[WaitStats], label: str):
+    """
+    记录一次等待耗时；块内抛出 Playwright 超时视为超时并吞掉
+
+    Yields:
+        dict，块内可设置 state['timed_out'] = True 标记超时
+    """
+    state = {'timed_out': False}
+    started = time.monotonic()
+    try:
+        yield state
+    except PlaywrightTimeoutError:
+        state['timed_out'] = True
+    elapsed = time.monotonic() - started
+    if stats is not None:
+        stats.record(label, elapsed, state['timed_out'])
+    if state['timed_out']:
+        logger.warning(f"等待超时 [{label}] {elapsed:.2f}s")
+    else:
+        logger.debug(f"等待 [{label}] {elapsed:.2f}s")
+
+
+def wait_for_network_idle(page, stats: WaitStats = None, timeout: int = DEFAULT_TIMEOUT_MS,
+                          label: str = 'network_idle'):
+    """等待网络空闲（无进行中请求 500ms）"""
+    with timed(stats, label):
+        page.wait_for_load_state('networkidle', timeout=timeout)
+
+
+def wait_for_selector(page, selector: str, stats: WaitStats = None, state: str = 'attached',
+                      timeout: int = DEFAULT_TIMEOUT_MS, label: str = None) -> bool:
+    """等待元素出现 / 消失，返回是否在超时前满足"""
+    with timed(stats, label or f'selector:{selector}') as result:
+        page.wait_for_selector(selector, state=state, timeout=timeout)
+    return not result['timed_out']
+
+
+def wait_for_stable_count(page, selector: str, stats: WaitStats = None,
+                          quiet_ms: int = DEFAULT_QUIET_MS, timeout: int = DEFAULT_TIMEOUT_MS,
+                          label: str = None) -> int:
+    """
+    等待匹配元素存在且 DOM 停止变化（MutationObserver）
+
+    Returns:
+        最终的元素数量
+    """
+    with timed(stats, label or f'stable:{selector}') as result:
+        outcome = page.evaluate(_STABLE_COUNT_JS, [selector, quiet_ms, timeout])
+        result['timed_out'] = outcome['timedOut']
+        return outcome['count']
+    return 0
+
+
+def first_text(page, selector: str) -> str:
+    """第一个匹配元素的文本（不存在时为空串）"""
+    return page.evaluate(
+        '(selector) => document.querySelector(selector)?.textContent.trim() || ""', selector
+    )
+
+
+def wait_for_text_change(page, selector: str, previous: str, stats: WaitStats = None,
+                         timeout: int = DEFAULT_TIMEOUT_MS, label: str = None) -> bool:
+    """等待第一个匹配元素的文本变化（翻页 / 局部刷新），返回是否在超时前变化"""
+    with timed(stats, label or f'changed:{selector}') as result:
+        page.wait_for_function(_TEXT_CHANGED_JS, arg=[selector, previous], timeout=timeout)
+    return not result['timed_out']
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+搜索基准：对比 LIKE 与全文检索索引的 p50/p95 延迟
+
+将 data/cards.csv 导入内存 SQLite，构建 card_search 索引，
+从卡名/特征中抽样查询词，分别执行旧的 LIKE 查询与 search_card_ids()。
+
+用法:
+    python scripts/bench_search.py [--queries 200] [--seed 42] [--scale 1]
+"""
+import sys
+import csv
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+# 添加项目根目录到 path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import or_, text
+
+from app import create_app, db
+from app.models.card import Card
+from app.services.search import card_number_ids, rebuild_search_index, search_card_ids, take_ranked
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+INT_COLUMNS = {'id', 'series_id', 'cost', 'life', 'power', 'counter', 'block_icon'}
+
+
+def load_cards(csv_path: Path, scale: int = 1) -> int:
+    """导入 cards.csv（不校验外键，只用于检索）；scale > 1 时复制多份模拟更大的卡池"""
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    clean = []
+    for row in rows:
+        item = {}
+        for key, value in row.items():
+            if value in ('', 'None'):
+                item[key] = '' if key == 'colors' else None
+            elif key in INT_COLUMNS:
+                item[key] = int(float(value))
+            else:
+                item[key] = value
+        clean.append(item)
+
+    base_id = max(item['id'] for item in clean)
+    clean += [dict(item, id=item['id'] + base_id * k, card_number=f"{item['card_number']}-{k}")
+              for k in range(1, scale) for item in clean[:len(rows)]]
+
+    columns = list(clean[0].keys())
+    db.session.execute(
+        text(f"INSERT INTO cards ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"),
+        clean
+    )
+    db.session.commit()
+    return len(clean)
+
+
+def sample_queries(count: int, seed: int) -> list:
+    """从卡名/特征中抽取查询词（模拟 deck_edit 中逐字输入的前缀）"""
+    rng = random.Random(seed)
+    names = [n for (n,) in db.session.query(Card.name) if n]
+    traits = [t for (t,) in db.session.query(Card.traits) if t]
+
+    queries = []
+    for _ in range(count):
+        if rng.random() < 0.7:
+            word = rng.choice(names).split()[0]
+        else:
+            word = rng.choice(rng.choice(traits).split('/'))
+        queries.append(word[:rng.randint(2, max(2, min(len(word), 6)))])
+    return queries
+
+
+def like_search(query: str) -> list:
+    """旧实现: 前后通配 LIKE"""
+    return Card.query.filter(or_(
+        Card.name.contains(query),
+        Card.card_number.contains(query),
+        Card.traits.contains(query)
+    )).limit(100).all()
+
+
+def fts_search(query: str) -> list:
+    """新实现: 检索索引 + 卡号前缀（与无筛选条件的 main.search 相同）"""
+    ranked_ids = search_card_ids(query, limit=100) or []
+    ranked_ids = list(dict.fromkeys(card_number_ids(query, limit=100) + ranked_ids))[:100]
+    return take_ranked(Card.query, Card.id, ranked_ids, limit=100)
+
+
+def measure(func, queries: list) -> dict:
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        func(q)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p95': timings[int(len(timings) * 0.95) - 1],
+        'max': timings[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='搜索延迟基准')
+    parser.add_argument('--queries', type=int, default=200, help='查询次数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--scale', type=int, default=1, help='卡池复制份数（LIKE 全表扫描随卡池线性增长）')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        total = load_cards(DATA_DIR / 'cards.csv', args.scale)
+
+        start = time.perf_counter()
+        indexed = rebuild_search_index()
+        db.session.commit()
+        print(f"导入 {total} 张卡片，索引 {indexed} 张，耗时 {time.perf_counter() - start:.2f}s")
+
+        queries = sample_queries(args.queries, args.seed)
+        # 预热
+        for q in queries[:10]:
+            like_search(q)
+            fts_search(q)
+
+        results = {'LIKE': measure(like_search, queries), 'FTS': measure(fts_search, queries)}
+
+    print(f"\n{'实现':<6} {'p50(ms)':>10} {'p95(ms)':>10} {'max(ms)':>10}")
+    for name, stats in results.items():
+        print(f"{name:<6} {stats['p50']:>10.2f} {stats['p95']:>10.2f} {stats['max']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,9 +6,19 @@ OPCG TCG 统一 CLI 工具
     python cli.py scrape --all --lang jp      # 爬取所有日文系列
     python cli.py scrape --series OP-15       # 爬取指定系列
     python cli.py scrape --check-new          # 检查新系列
+    python cli.py scrape --all --workers 4    # 4 个浏览器并行爬取
+    python cli.py scrape --all --refresh      # 增量同步已有系列 (只写入变化的卡片)
     python cli.py prices --update             # 更新价格
+    python cli.py prices --rebuild-latest     # 重建最新价格快照
+    python cli.py prices --rollup             # 重建价格日/周/月聚合
+    python cli.py prices --movers             # 重算价格涨跌榜
     python cli.py sync --to-pg                # 同步到 PostgreSQL
     python cli.py verify                      # 验证数据
+    python cli.py listings --rebuild          # 重建卡牌列表读模型与系列统计
+    python cli.py search --rebuild            # 重建全文检索索引
+    python cli.py images --backfill           # 并发下载图片到 blob 存储并写入清单
+    python cli.py images --variants           # 生成 200px/400px/原尺寸 WebP + JPEG 缩略图
+    python cli.py static --compress           # CSS/JS 预压缩 (.gz / .br)
 """
 import sys
 import os
@@ -27,17 +37,47 @@ def cmd_scrape(args):
     if args.series:
         scrape_single_series(args.series, lang=args.lang, download_images=args.images)
     elif args.check_new:
-        check_new_series(lang=args.lang)
+        check_new_series(lang=args.lang, workers=args.workers, rate=args.rate)
     elif args.all:
-        scrape_all_series(lang=args.lang, download_images=args.images)
+        scrape_all_series(lang=args.lang, download_images=args.images,
+                          workers=args.workers, rate=args.rate, refresh=args.refresh)
     else:
         print("请指定 --all, --series <code>, 或 --check-new")
 
 
 def cmd_prices(args):
     """更新价格数据"""
-    from update_prices import update_all_prices
-    update_all_prices()
+    from app import create_app, db
+    
+    app = create_app()
+    if args.update:
+        from scrapers.price_scraper import update_prices_in_db
+        update_prices_in_db(app)
+    elif args.rebuild_latest:
+        from app.services.price_latest import rebuild_latest
+        from app.services.card_listing import rebuild_listings
+        
+        with app.app_context():
+            count = rebuild_latest()
+            rebuild_listings()
+            db.session.commit()
+            print(f"✅ 最新价格快照重建完成: {count} 行")
+    elif args.rollup:
+        from app.services.price_rollup import refresh_rollups
+        
+        with app.app_context():
+            count = refresh_rollups()
+            db.session.commit()
+            print(f"✅ 价格聚合重建完成: {count} 行")
+    elif args.movers:
+        from app.services.price_movers import refresh_movers
+        
+        with app.app_context():
+            count = refresh_movers()
+            db.session.commit()
+            print(f"✅ 涨跌榜重算完成: {count} 行")
+    else:
+        print("请指定 --update, --rebuild-latest, --rollup 或 --movers")
 
 
 def cmd_sync(args):
@@ -55,6 +95,93 @@ def cmd_verify(args):
     verify_all()
 
 
+def cmd_listings(args):
+    """维护卡牌列表读模型"""
+    if args.rebuild:
+        from app import create_app, db
+        from app.services.card_listing import ensure_listing_schema, rebuild_listings
+        from app.services.price_latest import rebuild_latest
+        from app.services.series_stats import rebuild_series_stats
+        
+        app = create_app()
+        with app.app_context():
+            # 升级后 card_listings 缺少新增列时先删表重建
+            if ensure_listing_schema():
+                print("card_listings 表结构已更新")
+            # 读模型的最新价格来自 price_latest，先重建快照
+            rebuild_latest()
+            count = rebuild_listings()
+            series_count = rebuild_series_stats()
+            db.session.commit()
+            print(f"✅ 读模型重建完成: {count} 行, 系列统计 {series_count} 个")
+    else:
+        print("请指定 --rebuild")
+
+
+def cmd_search(args):
+    """维护全文检索索引"""
+    if args.rebuild:
+        from app import create_app, db
+        from app.services.search import rebuild_search_index
+        
+        app = create_app()
+        with app.app_context():
+            count = rebuild_search_index()
+            db.session.commit()
+            print(f"✅ 检索索引重建完成: {count} 张卡片")
+    else:
+        print("请指定 --rebuild")
+
+
+def cmd_images(args):
+    """维护图片 blob 存储与缩略图"""
+    if not (args.backfill or args.variants):
+        print("请指定 --backfill 或 --variants")
+        return
+    
+    from app import create_app
+    from app.models.series import Series
+    from app.services.image_variants import generate_variants
+    
+    app = create_app()
+    with app.app_context():
+        series_id = None
+        if args.series:
+            series = Series.query.filter_by(code=args.series, language=args.lang).first()
+            if not series:
+                print(f"❌ 未找到系列: {args.series} ({args.lang})")
+                return
+            series_id = series.id
+        
+        if args.backfill:
+            from app.services.image_manifest import backfill_images
+            from scrapers.utils.images import ImageDownloader
+            
+            with ImageDownloader(workers=args.workers, rate=args.rate) as downloader:
+                result = backfill_images(downloader.store, downloader, series_id=series_id, limit=args.limit)
+            print(f"✅ 图片回填完成: {result.images} 张, 下载 {result.downloaded}, "
+                  f"导入本地文件 {result.imported}, 已有 blob {result.registered}, 失败 {result.failed}; "
+                  f"新 blob {result.blobs_created} ({result.bytes / 1024 / 1024:.1f} MB)")
+        
+        # 回填后总是补生成缩略图
+        result = generate_variants(series_id=series_id, limit=args.limit, force=args.force,
+                                   workers=args.variant_workers)
+        print(f"✅ 缩略图: {result.images} 张图片 / {result.blobs} 个 blob, "
+              f"新文件 {result.files_created}, 失败 {result.failed}")
+
+
+def cmd_static(args):
+    """静态文件预压缩"""
+    if args.compress:
+        from app.services.static_assets import brotli, precompress
+        
+        stats = precompress(force=args.force)
+        print(f"✅ 预压缩完成: {stats['files']} 个文件, 写入 {stats['written']} 个压缩文件"
+              + ("" if brotli else " (未安装 brotli，只生成 .gz)"))
+    else:
+        print("请指定 --compress")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='OPCG TCG 管理工具',
@@ -68,13 +195,19 @@ def main():
     scrape_parser.add_argument('--all', action='store_true', help='爬取所有系列')
     scrape_parser.add_argument('--series', type=str, help='指定系列代码')
     scrape_parser.add_argument('--check-new', action='store_true', help='检查新系列')
+    scrape_parser.add_argument('--refresh', action='store_true', help='与 --all 一起使用: 按内容指纹增量同步已有系列')
     scrape_parser.add_argument('--lang', type=str, default='jp', choices=['jp', 'en'])
     scrape_parser.add_argument('--images', action='store_true', help='下载图片')
+    scrape_parser.add_argument('--workers', type=int, default=1, help='并行浏览器数')
+    scrape_parser.add_argument('--rate', type=float, default=2.0, help='并行时全局请求频率 (次/秒)')
     scrape_parser.set_defaults(func=cmd_scrape)
     
     # prices 子命令
     prices_parser = subparsers.add_parser('prices', help='价格管理')
     prices_parser.add_argument('--update', action='store_true', help='更新价格')
+    prices_parser.add_argument('--rebuild-latest', action='store_true', help='从价格历史重建最新价格快照')
+    prices_parser.add_argument('--rollup', action='store_true', help='从价格历史全量重建日/周/月聚合')
+    prices_parser.add_argument('--movers', action='store_true', help='重算 1d/7d/30d 涨跌榜')
     prices_parser.set_defaults(func=cmd_prices)
     
     # sync 子命令
@@ -86,6 +219,35 @@ def main():
     verify_parser = subparsers.add_parser('verify', help='验证数据')
     verify_parser.set_defaults(func=cmd_verify)
     
+    # listings 子命令
+    listings_parser = subparsers.add_parser('listings', help='卡牌列表读模型')
+    listings_parser.add_argument('--rebuild', action='store_true', help='全量重建读模型')
+    listings_parser.set_defaults(func=cmd_listings)
+    
+    # search 子命令
+    search_parser = subparsers.add_parser('search', help='全文检索索引')
+    search_parser.add_argument('--rebuild', action='store_true', help='全量重建检索索引')
+    search_parser.set_defaults(func=cmd_search)
+    
+    # images 子命令
+    images_parser = subparsers.add_parser('images', help='图片 blob 存储')
+    images_parser.add_argument('--backfill', action='store_true', help='下载缺失的图片并写入清单（之后生成缩略图）')
+    images_parser.add_argument('--variants', action='store_true', help='只为已保存的图片生成缩略图')
+    images_parser.add_argument('--force', action='store_true', help='与 --variants 一起使用: 重新生成已有缩略图')
+    images_parser.add_argument('--series', type=str, help='只处理指定系列代码')
+    images_parser.add_argument('--lang', type=str, default='jp', choices=['jp', 'en'])
+    images_parser.add_argument('--limit', type=int, help='最多处理的图片数')
+    images_parser.add_argument('--workers', type=int, default=16, help='并发下载数')
+    images_parser.add_argument('--rate', type=float, default=10.0, help='单个主机请求频率 (次/秒)')
+    images_parser.add_argument('--variant-workers', type=int, default=4, help='并行生成缩略图数')
+    images_parser.set_defaults(func=cmd_images)
+    
+    # static 子命令
+    static_parser = subparsers.add_parser('static', help='静态文件')
+    static_parser.add_argument('--compress', action='store_true', help='为 CSS/JS 生成 .gz / .br 预压缩文件')
+    static_parser.add_argument('--force', action='store_true', help='重新生成已有的压缩文件')
+    static_parser.set_defaults(func=cmd_static)
+    
     args = parser.parse_args()
     
     if args.command:
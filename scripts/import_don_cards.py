@@ -13,7 +13,8 @@ from bs4 import BeautifulSoup
 from loguru import logger
 from app import create_app, db
 from app.models.series import Series
-from app.models.card import Card, CardVersion, CardImage
+from app.models.card import Card
+from app.services.ingest import IngestRecord, ingest_cards, publish_series
 
 # DON 卡角色名映射 (PRB01)
 PRB01_DON_NAMES = {
@@ -85,6 +86,13 @@ PRB02_DON_NAMES = {
 
 BASE_IMAGE_URL = "https://tierone-media-op.com/wp-content/uploads/"
 
+# 图片版本 -> 版本后缀
+DON_VERSION_SUFFIXES = {
+    'normal': '',
+    'parallel': '_p',
+    'super_parallel': '_sp',
+}
+
 
 def get_or_create_don_series():
     """获取或创建 DON 卡系列"""
@@ -102,64 +110,27 @@ def get_or_create_don_series():
     return series
 
 
-def import_don_card(card_number, name, source_info, image_urls, series):
-    """导入单张 DON 卡"""
-    # 查找或创建卡片
-    card = Card.query.filter_by(card_number=card_number, language='jp').first()
-    
-    if not card:
-        card = Card(
+def don_card_records(card_number, name, source_info, image_urls):
+    """单张 DON 卡的入库记录（每个图片版本一条）"""
+    return [
+        IngestRecord(
             card_number=card_number,
-            series_id=series.id,
-            language='jp',
             name=name,
             card_type='DON',
             rarity='DON',
-            colors='',
-            source_info=source_info
+            source_info=source_info,
+            version_suffix=DON_VERSION_SUFFIXES.get(version_type, ''),
+            version_type='normal' if version_type == 'normal' else 'alt_art',
+            source_description=source_info,
+            image_url=image_url
         )
-        db.session.add(card)
-        db.session.flush()
-        logger.info(f"新增 DON 卡: {card_number} - {name}")
-    
-    # 创建版本
-    for version_type, image_url in image_urls.items():
-        version_suffix = ''
-        if version_type == 'parallel':
-            version_suffix = '_p'
-        elif version_type == 'super_parallel':
-            version_suffix = '_sp'
-        
-        existing_version = CardVersion.query.filter_by(
-            card_id=card.id,
-            series_id=series.id,
-            version_suffix=version_suffix
-        ).first()
-        
-        if not existing_version:
-            version = CardVersion(
-                card_id=card.id,
-                series_id=series.id,
-                version_type='normal' if version_type == 'normal' else 'alt_art',
-                version_suffix=version_suffix,
-                source_description=source_info
-            )
-            db.session.add(version)
-            db.session.flush()
-            
-            # 添加图片
-            img = CardImage(
-                version_id=version.id,
-                original_url=image_url
-            )
-            db.session.add(img)
-            logger.info(f"  添加版本: {version_type}")
-    
-    db.session.commit()
+        for version_type, image_url in image_urls.items()
+    ]
 
 
-def import_prb_don_cards(series):
+def import_prb_don_cards():
     """导入 PRB 系列 DON 卡"""
+    records = []
     # PRB01
     for num, name in PRB01_DON_NAMES.items():
         card_number = f'PRB01-DON-{num}'
@@ -168,12 +139,11 @@ def import_prb_don_cards(series):
             'parallel': f'{BASE_IMAGE_URL}don_card_prb01-{num}p.webp',
             'super_parallel': f'{BASE_IMAGE_URL}don_card_prb01-{num}sp.webp',
         }
-        import_don_card(
+        records += don_card_records(
             card_number=card_number,
             name=f'ドン!!カード ({name})',
             source_info='ONE PIECE CARD THE BEST【PRB-01】',
-            image_urls=image_urls,
-            series=series
+            image_urls=image_urls
         )
     
     # PRB02
@@ -184,17 +154,19 @@ def import_prb_don_cards(series):
             'parallel': f'{BASE_IMAGE_URL}don_card_prb02-{num}p.webp',
             'super_parallel': f'{BASE_IMAGE_URL}don_card_prb02-{num}sp.webp',
         }
-        import_don_card(
+        records += don_card_records(
             card_number=card_number,
             name=f'ドン!!カード ({name})',
             source_info='ONE PIECE CARD THE BEST Vol.2【PRB-02】',
-            image_urls=image_urls,
-            series=series
+            image_urls=image_urls
         )
+    
+    return records
 
 
-def import_booster_don_cards(series):
+def import_booster_don_cards():
     """导入补充包 DON 卡"""
+    records = []
     # OP01-OP14
     for i in range(1, 15):
         num = str(i).zfill(2)
@@ -202,17 +174,19 @@ def import_booster_don_cards(series):
         image_urls = {
             'normal': f'{BASE_IMAGE_URL}op{num}-doncard.webp',
         }
-        import_don_card(
+        records += don_card_records(
             card_number=card_number,
             name='ドン!!カード',
             source_info=f'ブースターパック【OP-{num}】',
-            image_urls=image_urls,
-            series=series
+            image_urls=image_urls
         )
+    
+    return records
 
 
-def import_extra_don_cards(series):
+def import_extra_don_cards():
     """导入 EB 系列 DON 卡"""
+    records = []
     # EB02, EB03 有 DON 卡
     for i in [2, 3]:
         num = str(i).zfill(2)
@@ -220,34 +194,36 @@ def import_extra_don_cards(series):
         image_urls = {
             'normal': f'{BASE_IMAGE_URL}eb{num}-doncard.webp',
         }
-        import_don_card(
+        records += don_card_records(
             card_number=card_number,
             name='ドン!!カード',
             source_info=f'エクストラブースター【EB-{num}】',
-            image_urls=image_urls,
-            series=series
+            image_urls=image_urls
         )
+    
+    return records
 
 
-def import_basic_don_cards(series):
+def import_basic_don_cards():
     """导入基础 DON 卡"""
+    records = []
     # 通常版
-    import_don_card(
+    records += don_card_records(
         card_number='DON-NORMAL',
         name='ドン!!カード (通常)',
         source_info='スタートデッキ/ブースターパック',
-        image_urls={'normal': f'{BASE_IMAGE_URL}don-normal.webp'},
-        series=series
+        image_urls={'normal': f'{BASE_IMAGE_URL}don-normal.webp'}
     )
     
     # Foil版
-    import_don_card(
+    records += don_card_records(
         card_number='DON-FOIL',
         name='ドン!!カード (フォイル)',
         source_info='アルティメットデッキ',
-        image_urls={'normal': f'{BASE_IMAGE_URL}don-foil.webp'},
-        series=series
+        image_urls={'normal': f'{BASE_IMAGE_URL}don-foil.webp'}
     )
+    
+    return records
 
 
 def main():
@@ -258,11 +234,18 @@ def main():
         # 创建 DON 系列
         series = get_or_create_don_series()
         
-        # 导入各类 DON 卡
-        import_basic_don_cards(series)
-        import_booster_don_cards(series)
-        import_extra_don_cards(series)
-        import_prb_don_cards(series)
+        # 导入各类 DON 卡（DON 卡不关联 card_series）
+        records = (
+            import_basic_don_cards()
+            + import_booster_don_cards()
+            + import_extra_don_cards()
+            + import_prb_don_cards()
+        )
+        result = ingest_cards(series, records, 'jp', link_series=False)
+        logger.info(f"新增 {result.cards_created} 张卡, {result.versions_created} 个版本")
+        
+        # 刷新读模型 / 缓存
+        publish_series([series.id])
         
         # 统计
         don_count = Card.query.filter_by(card_type='DON').count()
@@ -10,7 +10,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from loguru import logger
 from app import create_app, db
 from app.models.series import Series
-from app.models.card import Card, CardVersion, CardImage
+from app.models.card import Card, CardVersion
+from app.services.ingest import IngestRecord, ingest_cards, publish_series
 
 # PRB01 DON 卡英文名
 PRB01_DON_NAMES_EN = {
@@ -82,6 +83,13 @@ PRB02_DON_NAMES_EN = {
 
 BASE_IMAGE_URL = "https://tierone-media-op.com/wp-content/uploads/"
 
+# 图片版本 -> 版本后缀
+DON_VERSION_SUFFIXES = {
+    'normal': '',
+    'parallel': '_p',
+    'super_parallel': '_sp',
+}
+
 
 def get_or_create_don_series_en():
     """获取或创建英文 DON 卡系列"""
@@ -99,64 +107,27 @@ def get_or_create_don_series_en():
     return series
 
 
-def import_don_card_en(card_number, name, source_info, image_urls, series):
-    """导入单张英文 DON 卡"""
-    # 查找或创建卡片
-    card = Card.query.filter_by(card_number=card_number, language='en').first()
-    
-    if not card:
-        card = Card(
+def don_card_records_en(card_number, name, source_info, image_urls):
+    """单张英文 DON 卡的入库记录（每个图片版本一条）"""
+    return [
+        IngestRecord(
             card_number=card_number,
-            series_id=series.id,
-            language='en',
             name=name,
             card_type='DON',
             rarity='DON',
-            colors='',
-            source_info=source_info
+            source_info=source_info,
+            version_suffix=DON_VERSION_SUFFIXES.get(version_type, ''),
+            version_type='normal' if version_type == 'normal' else 'alt_art',
+            source_description=source_info,
+            image_url=image_url
         )
-        db.session.add(card)
-        db.session.flush()
-        logger.info(f"新增英文 DON 卡: {card_number} - {name}")
-    
-    # 创建版本
-    for version_type, image_url in image_urls.items():
-        version_suffix = ''
-        if version_type == 'parallel':
-            version_suffix = '_p'
-        elif version_type == 'super_parallel':
-            version_suffix = '_sp'
-        
-        existing_version = CardVersion.query.filter_by(
-            card_id=card.id,
-            series_id=series.id,
-            version_suffix=version_suffix
-        ).first()
-        
-        if not existing_version:
-            version = CardVersion(
-                card_id=card.id,
-                series_id=series.id,
-                version_type='normal' if version_type == 'normal' else 'alt_art',
-                version_suffix=version_suffix,
-                source_description=source_info
-            )
-            db.session.add(version)
-            db.session.flush()
-            
-            # 添加图片 (使用与日文版相同的图片URL)
-            img = CardImage(
-                version_id=version.id,
-                original_url=image_url
-            )
-            db.session.add(img)
-            logger.info(f"  添加版本: {version_type}")
-    
-    db.session.commit()
+        for version_type, image_url in image_urls.items()
+    ]
 
 
-def import_prb_don_cards_en(series):
+def import_prb_don_cards_en():
     """导入 PRB 系列英文 DON 卡"""
+    records = []
     # PRB01
     for num, name in PRB01_DON_NAMES_EN.items():
         card_number = f'PRB01-DON-{num}'
@@ -165,12 +136,11 @@ def import_prb_don_cards_en(series):
             'parallel': f'{BASE_IMAGE_URL}don_card_prb01-{num}p.webp',
             'super_parallel': f'{BASE_IMAGE_URL}don_card_prb01-{num}sp.webp',
         }
-        import_don_card_en(
+        records += don_card_records_en(
             card_number=card_number,
             name=f'DON!! Card ({name})',
             source_info='ONE PIECE CARD THE BEST [PRB-01]',
-            image_urls=image_urls,
-            series=series
+            image_urls=image_urls
         )
     
     # PRB02
@@ -181,17 +151,19 @@ def import_prb_don_cards_en(series):
             'parallel': f'{BASE_IMAGE_URL}don_card_prb02-{num}p.webp',
             'super_parallel': f'{BASE_IMAGE_URL}don_card_prb02-{num}sp.webp',
         }
-        import_don_card_en(
+        records += don_card_records_en(
             card_number=card_number,
             name=f'DON!! Card ({name})',
             source_info='ONE PIECE CARD THE BEST Vol.2 [PRB-02]',
-            image_urls=image_urls,
-            series=series
+            image_urls=image_urls
         )
+    
+    return records
 
 
-def import_booster_don_cards_en(series):
+def import_booster_don_cards_en():
     """导入补充包英文 DON 卡"""
+    records = []
     # OP01-OP14
     for i in range(1, 15):
         num = str(i).zfill(2)
@@ -199,17 +171,19 @@ def import_booster_don_cards_en(series):
         image_urls = {
             'normal': f'{BASE_IMAGE_URL}op{num}-doncard.webp',
         }
-        import_don_card_en(
+        records += don_card_records_en(
             card_number=card_number,
             name='DON!! Card',
             source_info=f'BOOSTER PACK [OP-{num}]',
-            image_urls=image_urls,
-            series=series
+            image_urls=image_urls
         )
+    
+    return records
 
 
-def import_extra_don_cards_en(series):
+def import_extra_don_cards_en():
     """导入 EB 系列英文 DON 卡"""
+    records = []
     # EB02, EB03 有 DON 卡
     for i in [2, 3]:
         num = str(i).zfill(2)
@@ -217,34 +191,36 @@ def import_extra_don_cards_en(series):
         image_urls = {
             'normal': f'{BASE_IMAGE_URL}eb{num}-doncard.webp',
         }
-        import_don_card_en(
+        records += don_card_records_en(
             card_number=card_number,
             name='DON!! Card',
             source_info=f'EXTRA BOOSTER [EB-{num}]',
-            image_urls=image_urls,
-            series=series
+            image_urls=image_urls
         )
+    
+    return records
 
 
-def import_basic_don_cards_en(series):
+def import_basic_don_cards_en():
     """导入基础英文 DON 卡"""
+    records = []
     # 通常版
-    import_don_card_en(
+    records += don_card_records_en(
         card_number='DON-NORMAL',
         name='DON!! Card (Normal)',
         source_info='Starter Deck / Booster Pack',
-        image_urls={'normal': f'{BASE_IMAGE_URL}don-normal.webp'},
-        series=series
+        image_urls={'normal': f'{BASE_IMAGE_URL}don-normal.webp'}
     )
     
     # Foil版
-    import_don_card_en(
+    records += don_card_records_en(
         card_number='DON-FOIL',
         name='DON!! Card (Foil)',
         source_info='Ultra Deck',
-        image_urls={'normal': f'{BASE_IMAGE_URL}don-foil.webp'},
-        series=series
+        image_urls={'normal': f'{BASE_IMAGE_URL}don-foil.webp'}
     )
+    
+    return records
 
 
 def main():
@@ -255,11 +231,18 @@ def main():
         # 创建英文 DON 系列
         series = get_or_create_don_series_en()
         
-        # 导入各类 DON 卡
-        import_basic_don_cards_en(series)
-        import_booster_don_cards_en(series)
-        import_extra_don_cards_en(series)
-        import_prb_don_cards_en(series)
+        # 导入各类 DON 卡（DON 卡不关联 card_series）
+        records = (
+            import_basic_don_cards_en()
+            + import_booster_don_cards_en()
+            + import_extra_don_cards_en()
+            + import_prb_don_cards_en()
+        )
+        result = ingest_cards(series, records, 'en', link_series=False)
+        logger.info(f"新增 {result.cards_created} 张卡, {result.versions_created} 个版本")
+        
+        # 刷新读模型 / 缓存
+        publish_series([series.id])
         
         # 统计
         don_count = Card.query.filter_by(card_type='DON', language='en').count()
@@ -16,7 +16,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from loguru import logger
 from app import create_app, db
 from app.models.series import Series
-from app.models.card import Card, CardVersion, CardImage
+from app.models.card import Card
+from app.services.ingest import IngestRecord, ingest_cards, publish_series
 
 # PDF 来源信息映射
 # 基于 PDF 页面顺序，手动整理的来源信息
@@ -91,7 +92,7 @@ def import_don_images(language='jp'):
     target_dir = f"app/static/images/don/{language}"
     os.makedirs(target_dir, exist_ok=True)
     
-    imported = 0
+    records = []
     skipped = 0
     actual_index = 0  # 实际卡片索引（跳过背景图后）
     
@@ -122,49 +123,20 @@ def import_don_images(language='jp'):
         dst_path = os.path.join(target_dir, new_filename)
         shutil.copy2(src_path, dst_path)
         
-        # 创建或更新数据库记录
-        card = Card.query.filter_by(card_number=card_number, language=language).first()
-        if not card:
-            card = Card(
-                card_number=card_number,
-                series_id=series.id,
-                language=language,
-                name='ドン!!カード' if language == 'jp' else 'DON!! Card',
-                card_type='DON',
-                rarity='DON',
-                colors='',
-                source_info=source_info
-            )
-            db.session.add(card)
-            db.session.flush()
-        
-        # 创建版本
-        version = CardVersion.query.filter_by(card_id=card.id, series_id=series.id).first()
-        if not version:
-            version = CardVersion(
-                card_id=card.id,
-                series_id=series.id,
-                version_type='normal',
-                source_description=source_info
-            )
-            db.session.add(version)
-            db.session.flush()
-        
-        # 创建图片记录
-        img_record = CardImage.query.filter_by(version_id=version.id).first()
-        if not img_record:
-            img_record = CardImage(
-                version_id=version.id,
-                local_path=f"/static/images/don/{language}/{new_filename}"
-            )
-            db.session.add(img_record)
-        else:
-            img_record.local_path = f"/static/images/don/{language}/{new_filename}"
-        
-        imported += 1
+        records.append(IngestRecord(
+            card_number=card_number,
+            name='ドン!!カード' if language == 'jp' else 'DON!! Card',
+            card_type='DON',
+            rarity='DON',
+            source_info=source_info,
+            source_description=source_info,
+            image_local_path=f"/static/images/don/{language}/{new_filename}"
+        ))
     
-    db.session.commit()
-    logger.info(f"{language.upper()} DON 卡导入完成: 导入 {imported} 张, 跳过 {skipped} 张背景图")
+    # 批量写入（DON 卡不关联 card_series），并刷新读模型 / 缓存
+    ingest_cards(series, records, language, link_series=False)
+    publish_series([series.id])
+    logger.info(f"{language.upper()} DON 卡导入完成: 导入 {len(records)} 张, 跳过 {skipped} 张背景图")
 
 
 def main():
@@ -16,10 +16,11 @@ sys.path.insert(0, '/workspace/opcg-tcg')
 
 import time
 from loguru import logger
-from scrapers.jp_official import JapanOfficialScraper, CardData
+from scrapers.jp_official import JapanOfficialScraper
 from app import create_app, db
 from app.models.series import Series
-from app.models.card import Card, CardVersion, CardImage, card_series
+from app.models.card import Card, CardVersion
+from app.services.ingest import ingest_cards, publish_series
 from sqlalchemy import text
 
 logger.add("/workspace/opcg-tcg/logs/full_rescrape_{time:YYYY-MM-DD}.log", rotation="1 day")
@@ -60,101 +61,6 @@ def clear_all_data():
     logger.info("清除了所有日文卡片数据")
 
 
-def save_card_version(card_data: CardData, series: Series):
-    """
-    保存卡片版本
-    
-    - Card: 按 card_number + language 唯一
-    - CardVersion: 按 card_id + series_id + version_suffix 唯一
-    """
-    # 查找或创建基础卡片
-    card = Card.query.filter_by(
-        card_number=card_data.card_number,
-        language='jp'
-    ).first()
-    
-    if not card:
-        # 确定主系列（卡号前缀匹配的系列）
-        card_prefix = card_data.card_number.split('-')[0] if '-' in card_data.card_number else ''
-        series_prefix = series.code.replace('-', '')
-        primary_series_id = series.id if card_prefix == series_prefix else series.id
-        
-        card = Card(
-            card_number=card_data.card_number,
-            series_id=primary_series_id,
-            language='jp',
-            name=card_data.name,
-            card_type=card_data.card_type,
-            rarity=card_data.rarity,
-            colors=card_data.colors or '',
-            cost=card_data.cost,
-            life=card_data.life,
-            power=card_data.power,
-            counter=card_data.counter,
-            attribute=card_data.attribute,
-            traits=card_data.traits,
-            effect_text=card_data.effect_text,
-            trigger_text=card_data.trigger_text,
-            source_info=card_data.source_info,
-            block_icon=card_data.block_icon
-        )
-        db.session.add(card)
-        db.session.flush()
-    
-    # 添加 card_series 关联（如果不存在）
-    existing_link = db.session.execute(
-        card_series.select().where(
-            (card_series.c.card_id == card.id) & 
-            (card_series.c.series_id == series.id)
-        )
-    ).first()
-    
-    if not existing_link:
-        card_prefix = card_data.card_number.split('-')[0] if '-' in card_data.card_number else ''
-        series_prefix = series.code.replace('-', '')
-        is_reprint = card_prefix != series_prefix
-        
-        db.session.execute(
-            card_series.insert().values(
-                card_id=card.id,
-                series_id=series.id,
-                is_reprint=is_reprint,
-                source_info=card_data.source_info
-            )
-        )
-    
-    # 创建卡片版本（按 card_id + series_id + version_suffix 唯一）
-    version_suffix = f"_v{card_data.version_index}" if card_data.version_index > 0 else ""
-    
-    version = CardVersion.query.filter_by(
-        card_id=card.id,
-        series_id=series.id,
-        version_suffix=version_suffix
-    ).first()
-    
-    if not version:
-        version = CardVersion(
-            card_id=card.id,
-            series_id=series.id,
-            version_suffix=version_suffix,
-            version_type='normal' if card_data.version_index == 0 else 'alt_art'
-        )
-        db.session.add(version)
-        db.session.flush()
-    
-    # 创建图片记录
-    if card_data.image_url:
-        image = CardImage.query.filter_by(version_id=version.id).first()
-        if not image:
-            image = CardImage(
-                version_id=version.id,
-                original_url=card_data.image_url
-            )
-            db.session.add(image)
-    
-    return card, version
-
-
 def main():
     app = create_app()
     
@@ -203,10 +109,8 @@ def main():
                         download_images=False
                     )
                     
-                    for card_data in cards:
-                        save_card_version(card_data, series)
-                    
-                    db.session.commit()
+                    ingest_cards(series, cards, 'jp')
+                    publish_series([series.id])
                     
                     # 统计该系列的版本数
                     series_versions = CardVersion.query.filter_by(series_id=series.id).count()
@@ -14,10 +14,11 @@ sys.path.insert(0, '/workspace/opcg-tcg')
 
 import time
 from loguru import logger
-from scrapers.jp_official import JapanOfficialScraper, CardData
+from scrapers.jp_official import JapanOfficialScraper
 from app import create_app, db
 from app.models.series import Series
-from app.models.card import Card, CardVersion, CardImage, card_series
+from app.models.card import Card, CardVersion
+from app.services.ingest import ingest_cards, publish_series
 from sqlalchemy import text
 
 # 配置日志
@@ -31,89 +32,6 @@ def clear_card_series_links():
     logger.info(f"清除了 {count} 条 card_series 关联")
 
 
-def save_card_with_series(card_data: CardData, series: Series):
-    """保存卡片并建立与系列的关联"""
-    # 查找或创建基础卡片
-    card = Card.query.filter_by(
-        card_number=card_data.card_number,
-        language='jp'
-    ).first()
-    
-    if not card:
-        card = Card(
-            card_number=card_data.card_number,
-            series_id=series.id,
-            language='jp',
-            name=card_data.name,
-            card_type=card_data.card_type,
-            rarity=card_data.rarity,
-            colors=card_data.colors or '',
-            cost=card_data.cost,
-            life=card_data.life,
-            power=card_data.power,
-            counter=card_data.counter,
-            attribute=card_data.attribute,
-            traits=card_data.traits,
-            effect_text=card_data.effect_text,
-            trigger_text=card_data.trigger_text,
-            source_info=card_data.source_info,
-            block_icon=card_data.block_icon
-        )
-        db.session.add(card)
-        db.session.flush()
-    
-    # 检查是否已关联到此系列
-    existing_link = db.session.execute(
-        card_series.select().where(
-            (card_series.c.card_id == card.id) & 
-            (card_series.c.series_id == series.id)
-        )
-    ).first()
-    
-    if not existing_link:
-        # 判断是否为再录卡
-        card_prefix = card_data.card_number.split('-')[0] if '-' in card_data.card_number else ''
-        series_prefix = series.code.replace('-', '')
-        is_reprint = card_prefix != series_prefix
-        
-        db.session.execute(
-            card_series.insert().values(
-                card_id=card.id,
-                series_id=series.id,
-                is_reprint=is_reprint,
-                source_info=card_data.source_info
-            )
-        )
-    
-    # 创建卡片版本（如果不存在）
-    version_suffix = f"_v{card_data.version_index}" if card_data.version_index > 0 else ""
-    version = CardVersion.query.filter_by(
-        card_id=card.id,
-        version_suffix=version_suffix
-    ).first()
-    
-    if not version:
-        version = CardVersion(
-            card_id=card.id,
-            version_suffix=version_suffix,
-            version_type='normal' if card_data.version_index == 0 else 'alt_art'
-        )
-        db.session.add(version)
-        db.session.flush()
-    
-    # 创建图片记录
-    if card_data.image_url:
-        image = CardImage.query.filter_by(version_id=version.id).first()
-        if not image:
-            image = CardImage(
-                version_id=version.id,
-                original_url=card_data.image_url
-            )
-            db.session.add(image)
-    
-    return card
-
-
 def rescrape_all_jp():
     """重新爬取所有日文系列"""
     app = create_app()
@@ -163,10 +81,8 @@ def rescrape_all_jp():
                     )
                     
                     # 保存卡片并建立关联
-                    for card_data in cards:
-                        save_card_with_series(card_data, series)
-                    
-                    db.session.commit()
+                    ingest_cards(series, cards, 'jp')
+                    publish_series([series.id])
                     
                     # 统计该系列的关联数
                     series_links = db.session.execute(
@@ -5,93 +5,15 @@ sys.path.insert(0, '/workspace/opcg-tcg')
 
 import time
 from loguru import logger
-from scrapers.jp_official import JapanOfficialScraper, CardData
+from scrapers.jp_official import JapanOfficialScraper
 from app import create_app, db
 from app.models.series import Series
-from app.models.card import Card, CardVersion, CardImage, card_series
+from app.services.ingest import ingest_cards, publish_series
 from sqlalchemy import text
 
 logger.add("/workspace/opcg-tcg/logs/rescrape_{time:YYYY-MM-DD}.log", rotation="1 day")
 
 
-def save_card_with_series(card_data: CardData, series: Series):
-    """保存卡片并建立与系列的关联"""
-    card = Card.query.filter_by(
-        card_number=card_data.card_number,
-        language='jp'
-    ).first()
-    
-    if not card:
-        card = Card(
-            card_number=card_data.card_number,
-            series_id=series.id,
-            language='jp',
-            name=card_data.name,
-            card_type=card_data.card_type,
-            rarity=card_data.rarity,
-            colors=card_data.colors or '',
-            cost=card_data.cost,
-            life=card_data.life,
-            power=card_data.power,
-            counter=card_data.counter,
-            attribute=card_data.attribute,
-            traits=card_data.traits,
-            effect_text=card_data.effect_text,
-            trigger_text=card_data.trigger_text,
-            source_info=card_data.source_info,
-            block_icon=card_data.block_icon
-        )
-        db.session.add(card)
-        db.session.flush()
-    
-    existing_link = db.session.execute(
-        card_series.select().where(
-            (card_series.c.card_id == card.id) & 
-            (card_series.c.series_id == series.id)
-        )
-    ).first()
-    
-    if not existing_link:
-        card_prefix = card_data.card_number.split('-')[0] if '-' in card_data.card_number else ''
-        series_prefix = series.code.replace('-', '')
-        is_reprint = card_prefix != series_prefix
-        
-        db.session.execute(
-            card_series.insert().values(
-                card_id=card.id,
-                series_id=series.id,
-                is_reprint=is_reprint,
-                source_info=card_data.source_info
-            )
-        )
-    
-    version_suffix = f"_v{card_data.version_index}" if card_data.version_index > 0 else ""
-    version = CardVersion.query.filter_by(
-        card_id=card.id,
-        version_suffix=version_suffix
-    ).first()
-    
-    if not version:
-        version = CardVersion(
-            card_id=card.id,
-            version_suffix=version_suffix,
-            version_type='normal' if card_data.version_index == 0 else 'alt_art'
-        )
-        db.session.add(version)
-        db.session.flush()
-    
-    if card_data.image_url:
-        image = CardImage.query.filter_by(version_id=version.id).first()
-        if not image:
-            image = CardImage(
-                version_id=version.id,
-                original_url=card_data.image_url
-            )
-            db.session.add(image)
-    
-    return card
-
-
 def get_missing_series():
     """获取没有关联记录的系列"""
     result = db.session.execute(text('''
@@ -130,10 +52,8 @@ def main():
                 try:
                     cards = scraper.scrape_series(official_id, download_images=False)
                     
-                    for card_data in cards:
-                        save_card_with_series(card_data, series)
-                    
-                    db.session.commit()
+                    ingest_cards(series, cards, 'jp')
+                    publish_series([series.id])
                     
                     link_count = db.session.execute(
                         text('SELECT COUNT(*) FROM card_series WHERE series_id = :sid'),
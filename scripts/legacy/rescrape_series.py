@@ -7,9 +7,9 @@ import os
 import time
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import create_app, db
+from app import create_app
 from app.models.series import Series
-from app.models.card import Card, CardVersion, CardImage
+from app.services.ingest import get_or_create_series, ingest_cards, publish_series
 from scrapers.jp_official import JapanOfficialScraper
 from loguru import logger
 
@@ -20,95 +20,16 @@ def save_cards_to_db(cards, series_code, official_series_id):
     
     with app.app_context():
         # 获取或创建系列
-        series = Series.query.filter_by(code=series_code, language='jp').first()
-        
-        if not series:
-            series = Series(
-                code=series_code,
-                language='jp',
-                name=f"Series {series_code}",
-                official_series_id=official_series_id
-            )
-            db.session.add(series)
-            db.session.flush()
+        series, created = get_or_create_series(
+            series_code, 'jp', f"Series {series_code}", 'other',
+            official_series_id=official_series_id
+        )
+        if created:
             logger.info(f"创建系列: {series_code}")
         
-        saved = 0
-        updated = 0
-        
-        for card_data in cards:
-            # 查找现有卡片
-            card = Card.query.filter_by(
-                card_number=card_data.card_number,
-                language='jp'
-            ).first()
-            
-            if not card:
-                # 创建新卡片
-                card = Card(
-                    card_number=card_data.card_number,
-                    language='jp',
-                    series_id=series.id,
-                    name=card_data.name,
-                    card_type=card_data.card_type,
-                    rarity=card_data.rarity,
-                    colors=card_data.colors,
-                    cost=card_data.cost,
-                    life=card_data.life,
-                    power=card_data.power,
-                    counter=card_data.counter,
-                    attribute=card_data.attribute,
-                    traits=card_data.traits,
-                    effect_text=card_data.effect_text,
-                    trigger_text=card_data.trigger_text,
-                    source_info=card_data.source_info,
-                    block_icon=card_data.block_icon
-                )
-                db.session.add(card)
-                db.session.flush()
-                saved += 1
-                
-                # 创建默认版本
-                version_type = 'alt_art' if card_data.version_index > 0 else 'normal'
-                version = CardVersion(
-                    card_id=card.id,
-                    version_type=version_type,
-                    version_suffix=f'_v{card_data.version_index}' if card_data.version_index > 0 else ''
-                )
-                db.session.add(version)
-                db.session.flush()
-                
-                # 创建图片记录
-                if card_data.image_url:
-                    image = CardImage(
-                        version_id=version.id,
-                        image_type='front',
-                        original_url=card_data.image_url
-                    )
-                    db.session.add(image)
-            else:
-                # 卡片已存在，检查是否需要添加新版本
-                if card_data.version_index > 0:
-                    existing_versions = card.versions.count()
-                    if card_data.version_index >= existing_versions:
-                        version = CardVersion(
-                            card_id=card.id,
-                            version_type='alt_art',
-                            version_suffix=f'_v{card_data.version_index}'
-                        )
-                        db.session.add(version)
-                        db.session.flush()
-                        
-                        if card_data.image_url:
-                            image = CardImage(
-                                version_id=version.id,
-                                image_type='front',
-                                original_url=card_data.image_url
-                            )
-                            db.session.add(image)
-                        updated += 1
-        
-        db.session.commit()
+        result = ingest_cards(series, cards, 'jp')
+        publish_series([series.id])
+        saved, updated = result.cards_created, result.versions_created
         logger.info(f"{series_code}: 新增 {saved} 张, 更新 {updated} 个版本")
         return saved, updated
 
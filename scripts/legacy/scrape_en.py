@@ -7,81 +7,29 @@ sys.path.insert(0, '/workspace/opcg-tcg')
 
 import time
 from loguru import logger
-from scrapers.en_official import EnglishOfficialScraper, CardDataEN
+from scrapers.en_official import EnglishOfficialScraper
 from app import create_app, db
-from app.models.series import Series
-from app.models.card import Card, CardVersion, CardImage
+from app.models.card import Card
+from app.services.ingest import get_or_create_series, ingest_cards, publish_series
 
 logger.add("/workspace/opcg-tcg/logs/scrape_en_{time:YYYY-MM-DD}.log", rotation="1 day")
 
 
-def update_card_with_en_data(card_data: CardDataEN):
-    """用英文数据更新现有卡片"""
-    # 查找日文卡片
-    card = Card.query.filter_by(
-        card_number=card_data.card_number,
-        language='jp'
-    ).first()
-    
-    if not card:
-        logger.debug(f"未找到日文卡片: {card_data.card_number}")
-        return False
-    
-    # 创建或更新英文版本卡片
-    en_card = Card.query.filter_by(
-        card_number=card_data.card_number,
-        language='en'
-    ).first()
-    
-    if not en_card:
-        en_card = Card(
-            card_number=card_data.card_number,
-            series_id=card.series_id,
-            language='en',
-            name=card_data.name,
-            card_type=card_data.card_type,
-            rarity=card_data.rarity,
-            colors=card_data.colors or card.colors,
-            cost=card_data.cost,
-            life=card_data.life,
-            power=card_data.power,
-            counter=card_data.counter,
-            attribute=card_data.attribute,
-            traits=card_data.traits,
-            effect_text=card_data.effect_text,
-            trigger_text=card_data.trigger_text,
-            source_info=card_data.source_info,
-            block_icon=card_data.block_icon
-        )
-        db.session.add(en_card)
-        db.session.flush()
-        
-        # 创建版本
-        version_suffix = f"_v{card_data.version_index}" if card_data.version_index > 0 else ""
-        version = CardVersion(
-            card_id=en_card.id,
-            version_suffix=version_suffix,
-            version_type='normal' if card_data.version_index == 0 else 'alt_art'
-        )
-        db.session.add(version)
-        db.session.flush()
-        
-        # 创建图片
-        if card_data.image_url:
-            image = CardImage(
-                version_id=version.id,
-                original_url=card_data.image_url
-            )
-            db.session.add(image)
-        
-        return True
-    else:
-        # 更新现有英文卡片
-        en_card.name = card_data.name
-        en_card.effect_text = card_data.effect_text
-        en_card.trigger_text = card_data.trigger_text
-        en_card.traits = card_data.traits
-        return False
+# 已有英文卡片用新数据覆盖的字段
+EN_UPDATE_FIELDS = ('name', 'effect_text', 'trigger_text', 'traits')
+
+
+def filter_known_cards(cards):
+    """只保留已有日文卡片的英文数据（一条查询）"""
+    numbers = {c.card_number for c in cards}
+    known = {
+        number for (number,) in db.session.query(Card.card_number)
+        .filter(Card.language == 'jp', Card.card_number.in_(numbers))
+    }
+    for card_data in cards:
+        if card_data.card_number not in known:
+            logger.debug(f"未找到日文卡片: {card_data.card_number}")
+    return [c for c in cards if c.card_number in known]
 
 
 def scrape_all_en_series():
@@ -104,14 +52,17 @@ def scrape_all_en_series():
                 logger.info(f"\n[{i+1}/{len(series_list)}] 处理英文系列: {series_data['code']}")
                 
                 try:
-                    cards = scraper.scrape_series(series_data['official_series_id'])
-                    
-                    new_count = 0
-                    for card_data in cards:
-                        if update_card_with_en_data(card_data):
-                            new_count += 1
+                    cards = filter_known_cards(
+                        scraper.scrape_series(series_data['official_series_id'])
+                    )
+                    series, _ = get_or_create_series(
+                        series_data['code'], 'en', series_data['name'], series_data['series_type'],
+                        official_series_id=series_data['official_series_id']
+                    )
                     
-                    db.session.commit()
+                    result = ingest_cards(series, cards, 'en', update_fields=EN_UPDATE_FIELDS)
+                    publish_series([series.id])
+                    new_count = result.cards_created
                     total_new += new_count
                     total_updated += len(cards) - new_count
                     
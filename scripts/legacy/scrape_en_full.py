@@ -7,10 +7,11 @@ sys.path.insert(0, '/workspace/opcg-tcg')
 
 import time
 from loguru import logger
-from scrapers.en_official import EnglishOfficialScraper, CardDataEN
+from scrapers.en_official import EnglishOfficialScraper
 from app import create_app, db
 from app.models.series import Series
-from app.models.card import Card, CardVersion, CardImage
+from app.models.card import CardVersion
+from app.services.ingest import ingest_cards, publish_series
 
 logger.add("/workspace/opcg-tcg/logs/scrape_en_full_{time:YYYY-MM-DD}.log", rotation="1 day")
 
@@ -39,67 +40,6 @@ def save_en_series(series_data: dict) -> Series:
     return series
 
 
-def save_en_card(card_data: CardDataEN, series: Series):
-    """保存英文卡片"""
-    # 查找或创建卡片
-    card = Card.query.filter_by(
-        card_number=card_data.card_number,
-        language='en'
-    ).first()
-    
-    if not card:
-        card = Card(
-            card_number=card_data.card_number,
-            series_id=series.id,
-            language='en',
-            name=card_data.name,
-            card_type=card_data.card_type,
-            rarity=card_data.rarity,
-            colors=card_data.colors or '',
-            cost=card_data.cost,
-            life=card_data.life,
-            power=card_data.power,
-            counter=card_data.counter,
-            attribute=card_data.attribute,
-            traits=card_data.traits,
-            effect_text=card_data.effect_text,
-            trigger_text=card_data.trigger_text,
-            source_info=card_data.source_info,
-            block_icon=card_data.block_icon
-        )
-        db.session.add(card)
-        db.session.flush()
-    
-    # 创建版本
-    version_suffix = f"_v{card_data.version_index}" if card_data.version_index > 0 else ""
-    version = CardVersion.query.filter_by(
-        card_id=card.id,
-        series_id=series.id,
-        version_suffix=version_suffix
-    ).first()
-    
-    if not version:
-        version = CardVersion(
-            card_id=card.id,
-            series_id=series.id,
-            version_suffix=version_suffix,
-            version_type='normal' if card_data.version_index == 0 else 'alt_art',
-            source_description=card_data.source_info
-        )
-        db.session.add(version)
-        db.session.flush()
-    
-    # 创建图片
-    if card_data.image_url:
-        image = CardImage.query.filter_by(version_id=version.id).first()
-        if not image:
-            image = CardImage(
-                version_id=version.id,
-                original_url=card_data.image_url
-            )
-            db.session.add(image)
-
-
 def scrape_all_en_series():
     """爬取所有英文系列"""
     app = create_app()
@@ -137,10 +77,8 @@ def scrape_all_en_series():
                     )
                     
                     # 保存卡片
-                    for card_data in cards:
-                        save_en_card(card_data, series)
-                    
-                    db.session.commit()
+                    ingest_cards(series, cards, 'en')
+                    publish_series([series.id])
                     total_cards += len(cards)
                     logger.info(f"系列 {series.code} 保存 {len(cards)} 张卡片")
                     
@@ -20,9 +20,12 @@ os.makedirs(log_dir, exist_ok=True)
 logger.add(os.path.join(log_dir, "scrape_{time:YYYY-MM-DD}.log"), rotation="1 day")
 
 
-def get_scraper(lang: str):
-    """获取对应语言的爬虫"""
+def get_scraper(lang: str, backend: str = 'http'):
+    """获取对应语言的爬虫（日文默认走 HTTP 后端，必要时退回浏览器）"""
     if lang == 'jp':
+        if backend == 'http':
+            from scrapers.jp_http import JapanHttpScraper
+            return JapanHttpScraper()
         from scrapers.jp_official import JapanOfficialScraper
         return JapanOfficialScraper()
     else:
@@ -32,132 +35,129 @@ def get_scraper(lang: str):
 
 def save_series_to_db(series_data: dict, lang: str):
     """保存系列到数据库"""
-    from app.models.series import Series
+    from app.services.ingest import get_or_create_series
+    from app.services.catalog import invalidate_catalog
     from app import db
     
-    series = Series.query.filter_by(code=series_data['code'], language=lang).first()
+    series, created = get_or_create_series(
+        code=series_data['code'],
+        language=lang,
+        name=series_data['name'],
+        series_type=series_data['series_type'],
+        official_series_id=series_data['official_series_id']
+    )
     
-    if not series:
-        series = Series(
-            code=series_data['code'],
-            name=series_data['name'],
-            official_series_id=series_data['official_series_id'],
-            series_type=series_data['series_type'],
-            language=lang
-        )
-        db.session.add(series)
+    if created:
         db.session.commit()
+        invalidate_catalog()
         logger.info(f"新增系列: {series.code} ({lang})")
     
     return series
 
 
-def save_card_to_db(card_data, series, lang: str):
-    """保存卡片到数据库"""
-    from app.models.card import Card, CardVersion, CardImage, card_series
+def save_cards_to_db(cards, series, lang: str):
+    """
+    增量保存一个系列的卡片并发布（提交事务）
+
+    与上次的内容指纹比较，只写入新增/变化的版本；系列未变化时只更新检查时间。
+    爬取时下载了图片的卡片，其 blob 地址随记录入库，清单由 register_images() 补写。
+
+    Returns:
+        SeriesDiff
+    """
     from app import db
+    from app.services.fingerprint import ingest_changed
+    from app.services.ingest import publish_series
     
-    # 查找或创建基础卡片
-    card = Card.query.filter_by(
-        card_number=card_data.card_number,
-        language=lang
-    ).first()
-    
-    if not card:
-        card = Card(
-            card_number=card_data.card_number,
-            series_id=series.id,
-            language=lang,
-            name=card_data.name,
-            card_type=card_data.card_type,
-            rarity=card_data.rarity,
-            colors=card_data.colors or '',
-            cost=card_data.cost,
-            life=card_data.life,
-            power=card_data.power,
-            counter=card_data.counter,
-            attribute=card_data.attribute,
-            traits=card_data.traits,
-            effect_text=card_data.effect_text,
-            trigger_text=card_data.trigger_text,
-            source_info=card_data.source_info,
-            block_icon=card_data.block_icon
-        )
-        db.session.add(card)
-        db.session.flush()
+    result, diff = ingest_changed(series, cards, lang)
+    if diff.unchanged:
+        db.session.commit()
+        logger.debug(f"系列 {series.code}: 内容未变化")
+        return diff
     
-    # 检查卡片是否已经关联到此系列
-    existing_link = db.session.execute(
-        card_series.select().where(
-            (card_series.c.card_id == card.id) & 
-            (card_series.c.series_id == series.id)
-        )
-    ).first()
+    publish_series([series.id])
+    logger.debug(
+        f"系列 {series.code}: 变化版本 {len(diff.changed)} (新增 {diff.new_count}), "
+        f"新增卡片 {result.cards_created}, 更新卡片 {result.cards_updated}, "
+        f"新增版本 {result.versions_created}, 新增图片 {result.images_created}"
+    )
+    if diff.removed:
+        logger.warning(f"系列 {series.code}: 官网已不存在 {len(diff.removed)} 个版本: {diff.removed[:10]}")
+    return diff
+
+
+def register_images(series):
+    """把系列中已保存到 blob 存储的图片写入清单并生成缩略图（不下载）"""
+    from app.services.image_manifest import backfill_images
+    from app.services.image_variants import generate_variants
+    from scrapers.utils.images import BlobStore
     
-    if not existing_link:
-        card_prefix = card_data.card_number.split('-')[0] if '-' in card_data.card_number else ''
-        series_prefix = series.code.replace('-', '')
-        is_reprint = card_prefix != series_prefix
-        
-        db.session.execute(
-            card_series.insert().values(
-                card_id=card.id,
-                series_id=series.id,
-                is_reprint=is_reprint,
-                source_info=card_data.source_info
-            )
-        )
+    # 只登记已有 blob / 本地文件；仍缺失的图片交给 cli.py images --backfill
+    result = backfill_images(BlobStore(), series_id=series.id)
+    variants = generate_variants(series_id=series.id)
+    logger.debug(f"系列 {series.code}: 图片清单登记 {result.registered + result.imported} 张, "
+                 f"缩略图 {variants.files_created} 个")
+
+
+def scrape_series_parallel(lang: str, targets: list, download_images: bool = False,
+                           workers: int = 4, rate: float = 2.0, backend: str = 'http') -> int:
+    """
+    多浏览器并行爬取，结果经队列回到当前线程写库
+
+    Args:
+        targets: [(series, series_data)]，series 已入库
+        workers: 并行浏览器数
+        rate: 全局请求频率（次/秒）
+        backend: 日文爬虫后端 (http / browser)
+
+    Returns:
+        保存的卡片数
+    """
+    from app import db
+    from scrapers.pool import ScraperPool
     
-    # 创建卡片版本
-    version_suffix = f"_v{card_data.version_index}" if card_data.version_index > 0 else ""
-    version = CardVersion.query.filter_by(
-        card_id=card.id,
-        series_id=series.id,
-        version_suffix=version_suffix
-    ).first()
+    series_by_code = {series_data['code']: series for series, series_data in targets}
+    pool = ScraperPool(lambda: get_scraper(lang, backend), workers=workers, rate=rate)
+    logger.info(f"并行爬取 {len(targets)} 个系列 ({lang}), workers={pool.workers}, rate={rate}/s")
     
-    if not version:
-        version = CardVersion(
-            card_id=card.id,
-            series_id=series.id,
-            version_suffix=version_suffix,
-            version_type='normal' if card_data.version_index == 0 else 'alt_art',
-            source_description=card_data.source_info,
-            illustration_type=getattr(card_data, 'illustration_type', None),
-            has_star_mark=getattr(card_data, 'has_star_mark', False)
-        )
-        db.session.add(version)
-        db.session.flush()
-    else:
-        # 更新已有版本的插画类型和星标（如果之前没有）
-        updated = False
-        if not version.illustration_type and getattr(card_data, 'illustration_type', None):
-            version.illustration_type = card_data.illustration_type
-            updated = True
-        if not version.has_star_mark and getattr(card_data, 'has_star_mark', False):
-            version.has_star_mark = True
-            updated = True
+    total_cards = 0
+    for i, result in enumerate(pool.scrape([d for _, d in targets], download_images=download_images)):
+        code = result.series_data['code']
+        if not result.ok:
+            logger.error(f"[{i+1}/{len(targets)}] 爬取系列 {code} 失败: {result.error}")
+            continue
+        
+        series = series_by_code[code]
+        try:
+            diff = save_cards_to_db(result.cards, series, lang)
+            if download_images:
+                register_images(series)
+            total_cards += len(result.cards)
+            logger.info(f"[{i+1}/{len(targets)}] 系列 {series.code} {len(result.cards)} 张卡片, "
+                        f"写入 {len(diff.changed)} 个变化版本")
+        except Exception as e:
+            logger.error(f"保存系列 {code} 失败: {e}")
+            db.session.rollback()
     
-    # 创建图片记录
-    if card_data.image_url:
-        image = CardImage.query.filter_by(version_id=version.id).first()
-        if not image:
-            image = CardImage(
-                version_id=version.id,
-                original_url=card_data.image_url
-            )
-            db.session.add(image)
+    pool.wait_stats.log_summary()
+    return total_cards
 
 
-def scrape_all_series(lang: str = 'jp', download_images: bool = False):
-    """爬取所有系列"""
+def scrape_all_series(lang: str = 'jp', download_images: bool = False,
+                      workers: int = 1, rate: float = 2.0, backend: str = 'http', refresh: bool = False):
+    """
+    爬取所有系列（workers > 1 时并行）
+
+    refresh=False 时跳过已有卡片的系列；refresh=True 时重新抓取所有系列，
+    按内容指纹只写入变化的卡片（勘误、新增异画等）
+    """
     from app import create_app, db
     from app.models.card import Card
     
     app = create_app()
     
     with app.app_context():
-        scraper = get_scraper(lang)
+        scraper = get_scraper(lang, backend)
         
         try:
             scraper.start_browser()
@@ -166,13 +166,32 @@ def scrape_all_series(lang: str = 'jp', download_images: bool = False):
             
             total_cards = 0
             
+            if workers > 1:
+                # 列表页用完即关，系列交给并行 worker（置空后 finally 不再重复关闭）
+                scraper.close_browser()
+                scraper = None
+                targets = []
+                for series_data in series_list:
+                    series = save_series_to_db(series_data, lang)
+                    existing_count = 0 if refresh else Card.query.filter_by(series_id=series.id).count()
+                    if existing_count > 0:
+                        logger.info(f"系列 {series.code} 已有 {existing_count} 张卡片，跳过")
+                        total_cards += existing_count
+                    else:
+                        targets.append((series, series_data))
+                
+                total_cards += scrape_series_parallel(lang, targets, download_images, workers, rate, backend)
+                logger.info(f"\n=== 爬取完成 ({lang}) ===")
+                logger.info(f"总计 {total_cards} 张卡片")
+                return
+            
             for i, series_data in enumerate(series_list):
                 logger.info(f"\n[{i+1}/{len(series_list)}] 处理系列: {series_data['code']}")
                 
                 series = save_series_to_db(series_data, lang)
                 
                 # 检查是否已爬取
-                existing_count = Card.query.filter_by(series_id=series.id).count()
+                existing_count = 0 if refresh else Card.query.filter_by(series_id=series.id).count()
                 if existing_count > 0:
                     logger.info(f"系列 {series.code} 已有 {existing_count} 张卡片，跳过")
                     total_cards += existing_count
@@ -184,12 +203,12 @@ def scrape_all_series(lang: str = 'jp', download_images: bool = False):
                         download_images=download_images
                     )
                     
-                    for card_data in cards:
-                        save_card_to_db(card_data, series, lang)
+                    diff = save_cards_to_db(cards, series, lang)
+                    if download_images:
+                        register_images(series)
                     
-                    db.session.commit()
                     total_cards += len(cards)
-                    logger.info(f"系列 {series.code} 保存 {len(cards)} 张卡片")
+                    logger.info(f"系列 {series.code} {len(cards)} 张卡片, 写入 {len(diff.changed)} 个变化版本")
                     
                 except Exception as e:
                     logger.error(f"爬取系列 {series_data['code']} 失败: {e}")
@@ -200,19 +219,22 @@ def scrape_all_series(lang: str = 'jp', download_images: bool = False):
             
             logger.info(f"\n=== 爬取完成 ({lang}) ===")
             logger.info(f"总计 {total_cards} 张卡片")
+            scraper.wait_stats.log_summary()
             
         finally:
-            scraper.close_browser()
+            if scraper is not None:
+                scraper.close_browser()
 
 
-def scrape_single_series(series_code: str, lang: str = 'jp', download_images: bool = False):
+def scrape_single_series(series_code: str, lang: str = 'jp', download_images: bool = False,
+                         backend: str = 'http'):
     """爬取单个系列"""
-    from app import create_app, db
+    from app import create_app
     
     app = create_app()
     
     with app.app_context():
-        scraper = get_scraper(lang)
+        scraper = get_scraper(lang, backend)
         
         try:
             scraper.start_browser()
@@ -235,25 +257,25 @@ def scrape_single_series(series_code: str, lang: str = 'jp', download_images: bo
                 download_images=download_images
             )
             
-            for card_data in cards:
-                save_card_to_db(card_data, series, lang)
+            diff = save_cards_to_db(cards, series, lang)
+            if download_images:
+                register_images(series)
             
-            db.session.commit()
-            logger.info(f"系列 {series.code} ({lang}) 保存 {len(cards)} 张卡片")
+            logger.info(f"系列 {series.code} ({lang}) {len(cards)} 张卡片, 写入 {len(diff.changed)} 个变化版本")
             
         finally:
             scraper.close_browser()
 
 
-def check_new_series(lang: str = 'jp'):
-    """检查并爬取新系列"""
+def check_new_series(lang: str = 'jp', workers: int = 1, rate: float = 2.0, backend: str = 'http'):
+    """检查并爬取新系列（workers > 1 时并行）"""
     from app import create_app, db
     from app.models.series import Series
     
     app = create_app()
     
     with app.app_context():
-        scraper = get_scraper(lang)
+        scraper = get_scraper(lang, backend)
         
         try:
             scraper.start_browser()
@@ -273,6 +295,13 @@ def check_new_series(lang: str = 'jp'):
             
             logger.info(f"发现 {len(new_series)} 个新系列 ({lang})")
             
+            if workers > 1 and len(new_series) > 1:
+                scraper.close_browser()
+                scraper = None
+                targets = [(save_series_to_db(d, lang), d) for d in new_series]
+                scrape_series_parallel(lang, targets, workers=workers, rate=rate, backend=backend)
+                return
+            
             for series_data in new_series:
                 logger.info(f"爬取新系列: {series_data['code']}")
                 
@@ -281,10 +310,8 @@ def check_new_series(lang: str = 'jp'):
                 try:
                     cards = scraper.scrape_series(series_data['official_series_id'])
                     
-                    for card_data in cards:
-                        save_card_to_db(card_data, series, lang)
+                    save_cards_to_db(cards, series, lang)
                     
-                    db.session.commit()
                     logger.info(f"系列 {series.code} 保存 {len(cards)} 张卡片")
                     
                 except Exception as e:
@@ -294,7 +321,8 @@ def check_new_series(lang: str = 'jp'):
                 time.sleep(2)
             
         finally:
-            scraper.close_browser()
+            if scraper is not None:
+                scraper.close_browser()
 
 
 if __name__ == '__main__':
@@ -306,18 +334,29 @@ if __name__ == '__main__':
     parser.add_argument('--images', action='store_true', help='下载图片')
     parser.add_argument('--all', action='store_true', help='爬取所有系列')
     parser.add_argument('--check-new', action='store_true', help='检查并爬取新系列')
+    parser.add_argument('--refresh', action='store_true',
+                        help='与 --all 一起使用: 重新抓取已有系列，按内容指纹只写入变化的卡片')
+    parser.add_argument('--workers', type=int, default=1, help='并行浏览器数 (默认 1，顺序爬取)')
+    parser.add_argument('--rate', type=float, default=2.0, help='并行时全局请求频率 (次/秒)')
+    parser.add_argument('--backend', type=str, default='http', choices=['http', 'browser'],
+                        help='日文爬虫后端 (http: 直接请求HTML, 失败时退回浏览器; browser: Playwright)')
     
     args = parser.parse_args()
     
     if args.series:
-        scrape_single_series(args.series, lang=args.lang, download_images=args.images)
+        scrape_single_series(args.series, lang=args.lang, download_images=args.images,
+                             backend=args.backend)
     elif args.check_new:
-        check_new_series(lang=args.lang)
+        check_new_series(lang=args.lang, workers=args.workers, rate=args.rate, backend=args.backend)
     elif args.all:
-        scrape_all_series(lang=args.lang, download_images=args.images)
+        scrape_all_series(lang=args.lang, download_images=args.images,
+                          workers=args.workers, rate=args.rate, backend=args.backend, refresh=args.refresh)
     else:
         print("用法:")
         print("  python scrape_all.py --series OP-15 --lang jp   # 爬取指定系列")
         print("  python scrape_all.py --all --lang jp            # 爬取所有系列")
+        print("  python scrape_all.py --all --workers 4          # 4 个浏览器并行爬取")
+        print("  python scrape_all.py --all --refresh            # 增量同步已有系列 (勘误/新异画)")
+        print("  python scrape_all.py --all --backend browser    # 强制使用浏览器爬取")
         print("  python scrape_all.py --check-new --lang jp      # 检查新系列")
         print("  python scrape_all.py --check-new --lang en      # 检查英文新系列")
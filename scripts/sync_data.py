@@ -56,9 +56,8 @@ def sync_prices(app, limit=None):
 def sync_new_cards(app):
     """检查并同步新卡片"""
     from scrapers.jp_official import JapanOfficialScraper
-    from app import db
     from app.models.series import Series
-    from app.models.card import Card, CardVersion, CardImage, card_series
+    from app.services.ingest import get_or_create_series, ingest_cards, publish_series
     
     logger.info("=" * 50)
     logger.info(f"卡片同步开始: {datetime.now()}")
@@ -86,94 +85,18 @@ def sync_new_cards(app):
                         logger.info(f"爬取新系列: {series_data['code']}")
                         
                         # 创建系列
-                        series = Series(
+                        series, _ = get_or_create_series(
                             code=series_data['code'],
+                            language='jp',
                             name=series_data['name'],
-                            official_series_id=series_data['official_series_id'],
                             series_type=series_data['series_type'],
-                            language='jp'
+                            official_series_id=series_data['official_series_id']
                         )
-                        db.session.add(series)
-                        db.session.flush()
                         
-                        # 爬取卡片
+                        # 爬取卡片并批量入库
                         cards = scraper.scrape_series(series_data['official_series_id'])
-                        
-                        for card_data in cards:
-                            # 创建卡片和版本
-                            card = Card.query.filter_by(
-                                card_number=card_data.card_number,
-                                language='jp'
-                            ).first()
-                            
-                            if not card:
-                                card = Card(
-                                    card_number=card_data.card_number,
-                                    series_id=series.id,
-                                    language='jp',
-                                    name=card_data.name,
-                                    card_type=card_data.card_type,
-                                    rarity=card_data.rarity,
-                                    colors=card_data.colors or '',
-                                    cost=card_data.cost,
-                                    life=card_data.life,
-                                    power=card_data.power,
-                                    counter=card_data.counter,
-                                    attribute=card_data.attribute,
-                                    traits=card_data.traits,
-                                    effect_text=card_data.effect_text,
-                                    trigger_text=card_data.trigger_text,
-                                    source_info=card_data.source_info,
-                                    block_icon=card_data.block_icon
-                                )
-                                db.session.add(card)
-                                db.session.flush()
-                            
-                            # 添加 card_series 关联
-                            existing_link = db.session.execute(
-                                card_series.select().where(
-                                    (card_series.c.card_id == card.id) & 
-                                    (card_series.c.series_id == series.id)
-                                )
-                            ).first()
-                            
-                            if not existing_link:
-                                db.session.execute(
-                                    card_series.insert().values(
-                                        card_id=card.id,
-                                        series_id=series.id,
-                                        is_reprint=False
-                                    )
-                                )
-                            
-                            # 创建版本
-                            version_suffix = f"_v{card_data.version_index}" if card_data.version_index > 0 else ""
-                            version = CardVersion.query.filter_by(
-                                card_id=card.id,
-                                series_id=series.id,
-                                version_suffix=version_suffix
-                            ).first()
-                            
-                            if not version:
-                                version = CardVersion(
-                                    card_id=card.id,
-                                    series_id=series.id,
-                                    version_suffix=version_suffix,
-                                    version_type='normal' if card_data.version_index == 0 else 'alt_art'
-                                )
-                                db.session.add(version)
-                                db.session.flush()
-                            
-                            # 图片
-                            if card_data.image_url:
-                                image = CardImage.query.filter_by(version_id=version.id).first()
-                                if not image:
-                                    db.session.add(CardImage(
-                                        version_id=version.id,
-                                        original_url=card_data.image_url
-                                    ))
-                        
-                        db.session.commit()
+                        ingest_cards(series, cards, 'jp')
+                        publish_series([series.id])
                         logger.info(f"系列 {series_data['code']} 同步完成: {len(cards)} 张卡片")
             else:
                 logger.info("没有发现新系列")
@@ -3,9 +3,12 @@
 价格数据更新脚本
 
 用法:
-    # 更新所有卡片价格 (很慢，约1小时)
+    # 更新所有卡片价格 (默认 8 并发、5 次/秒)
     python scripts/update_prices.py --all
     
+    # 调整并发数和请求频率 (--workers 1 为顺序请求)
+    python scripts/update_prices.py --all --workers 4 --rate 3
+    
     # 只更新指定系列
     python scripts/update_prices.py --series OP-14
     
@@ -30,20 +33,23 @@ def main():
     parser.add_argument('--series', type=str, help='Update specific series (e.g., OP-14)')
     parser.add_argument('--test', action='store_true', help='Test mode (only 10 cards)')
     parser.add_argument('--limit', type=int, help='Limit number of cards to update')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent requests (1 = sequential)')
+    parser.add_argument('--rate', type=float, default=5.0, help='Max requests per second to the API')
     
     args = parser.parse_args()
     
     app = create_app()
+    options = dict(workers=args.workers, rate=args.rate)
     
     if args.test:
         logger.info("Running in test mode (10 cards)")
-        update_prices_in_db(app, limit=10)
+        update_prices_in_db(app, limit=10, **options)
     elif args.series:
         logger.info(f"Updating prices for series: {args.series}")
-        update_prices_in_db(app, series_code=args.series)
+        update_prices_in_db(app, series_code=args.series, **options)
     elif args.all:
         logger.info("Updating all card prices (this may take a while)")
-        update_prices_in_db(app, limit=args.limit)
+        update_prices_in_db(app, limit=args.limit, **options)
     else:
         parser.print_help()
 
@@ -3,8 +3,13 @@
 """
 import pytest
 from app import create_app, db
-from app.models.series import Series
-from app.models.card import Card, CardVersion, CardImage
+from app.models.series import Series, SeriesStats
+from app.models.card import Card, CardVersion, CardImage, card_series
+from app.models.listing import CardListing, COLOR_BITS, color_mask
+from app.services.card_listing import refresh_listings
+from app.services.series_stats import refresh_series_stats, stats_by_series
+from app.services.ingest import IngestRecord, ingest_cards
+from scrapers.jp_official import CardData
 
 
 @pytest.fixture
@@ -185,3 +190,630 @@ class TestCardVersion:
             db.session.commit()
             
             assert version.display_name == '异画版'
+
+
+class TestCardListing:
+    """列表读模型测试"""
+    
+    def test_color_mask(self):
+        """测试颜色位掩码"""
+        assert color_mask('赤') == COLOR_BITS['赤']
+        assert color_mask('赤/青') == COLOR_BITS['赤'] | COLOR_BITS['青']
+        assert color_mask('緑,黄') == COLOR_BITS['緑'] | COLOR_BITS['黄']
+        assert color_mask('') == 0
+        assert color_mask(None) == 0
+    
+    def test_refresh_listings(self, app):
+        """测试读模型刷新"""
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            
+            card = Card(card_number='OP14-001', language='jp', series_id=series.id,
+                        name='Test', card_type='LEADER', rarity='L', colors='赤/青')
+            db.session.add(card)
+            db.session.commit()
+            
+            normal = CardVersion(card_id=card.id, series_id=series.id, version_type='normal')
+            alt = CardVersion(card_id=card.id, series_id=series.id, version_type='alt_art',
+                              version_suffix='_v1', has_star_mark=True)
+            db.session.add_all([normal, alt])
+            db.session.commit()
+            db.session.add(CardImage(version_id=alt.id, original_url='https://example.com/alt.png'))
+            db.session.commit()
+            
+            assert refresh_listings(series_ids=[series.id]) == 2
+            db.session.commit()
+            
+            rows = {r.version_id: r for r in CardListing.query.all()}
+            assert rows[normal.id].is_primary
+            assert not rows[alt.id].is_primary
+            assert rows[alt.id].series_code == 'OP-14'
+            assert rows[alt.id].has_star_mark
+            assert rows[alt.id].image_url == 'https://example.com/alt.png'
+            assert rows[normal.id].color_mask == COLOR_BITS['赤'] | COLOR_BITS['青']
+            
+            # 卡片信息变化后刷新
+            card.name = 'Renamed'
+            refresh_listings(card_ids=[card.id])
+            db.session.commit()
+            assert {r.name for r in CardListing.query.all()} == {'Renamed'}
+    
+    def test_cards_without_versions(self, app):
+        """测试没有版本的卡片仍出现在卡片列表中"""
+        from app.services.card_listing import paginate_card_list, rebuild_listings
+        
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            
+            with_version = Card(card_number='OP14-001', language='jp', series_id=series.id,
+                                name='A', card_type='LEADER', rarity='L', colors='赤')
+            versionless = Card(card_number='OP14-002', language='jp', series_id=series.id,
+                               name='B', card_type='CHARACTER', rarity='C', colors='青')
+            db.session.add_all([with_version, versionless])
+            db.session.commit()
+            version = CardVersion(card_id=with_version.id, series_id=series.id, version_type='normal')
+            db.session.add(version)
+            db.session.commit()
+            
+            assert rebuild_listings() == 1
+            db.session.commit()
+            
+            pagination, items = paginate_card_list('jp', 1, 24)
+            assert pagination.total == 2
+            assert [i.card_number for i in items] == ['OP14-001', 'OP14-002']
+            assert items[1].image_url is None
+            
+            # 卡片级筛选同样作用于没有版本的卡片；版本级筛选排除它们
+            _, items = paginate_card_list('jp', 1, 24, color='青')
+            assert [i.card_number for i in items] == ['OP14-002']
+            _, items = paginate_card_list('jp', 1, 24, card_type='LEADER')
+            assert [i.card_number for i in items] == ['OP14-001']
+            _, items = paginate_card_list('jp', 1, 24, star='0')
+            assert [i.card_number for i in items] == ['OP14-001']
+            
+            # 分页跨越两部分
+            pagination, items = paginate_card_list('jp', 2, 1)
+            assert pagination.pages == 2 and [i.card_number for i in items] == ['OP14-002']
+    
+    def test_image_size_and_schema_upgrade(self, app, client):
+        """测试读模型缺列时重建表，以及列表页 <img> 输出首图尺寸"""
+        from sqlalchemy import inspect, text
+        from app.services.card_listing import ensure_listing_schema, rebuild_listings
+        
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            card = Card(card_number='OP14-001', language='jp', series_id=series.id,
+                        name='A', card_type='LEADER', rarity='L', colors='赤')
+            db.session.add(card)
+            db.session.commit()
+            normal = CardVersion(card_id=card.id, series_id=series.id, version_type='normal')
+            alt = CardVersion(card_id=card.id, series_id=series.id, version_type='alt_art',
+                              version_suffix='_p1')
+            db.session.add_all([normal, alt])
+            db.session.commit()
+            db.session.add_all([
+                CardImage(version_id=normal.id, original_url='https://example.com/a.png',
+                          width=400, height=600),
+                CardImage(version_id=alt.id, original_url='https://example.com/b.png'),
+            ])
+            db.session.commit()
+            
+            # 旧版本的 card_listings 表没有尺寸列
+            CardListing.__table__.drop(db.engine)
+            db.session.execute(text('CREATE TABLE card_listings (version_id INTEGER PRIMARY KEY)'))
+            db.session.commit()
+            
+            assert ensure_listing_schema()
+            assert not ensure_listing_schema()
+            assert rebuild_listings() == 2
+            db.session.commit()
+            columns = {c['name'] for c in inspect(db.engine).get_columns('card_listings')}
+            assert {'image_width', 'image_height'} <= columns
+            assert db.session.get(CardListing, normal.id).image_height == 600
+            series_id = series.id
+        
+        # 已知尺寸按原图比例，未知尺寸按卡牌比例
+        html = client.get('/cards/?lang=jp').get_data(as_text=True)
+        assert 'width="200" height="300"' in html
+        html = client.get(f'/cards/series/{series_id}').get_data(as_text=True)
+        assert 'width="200" height="300"' in html
+        assert 'width="200" height="279"' in html
+
+
+class TestSeriesStats:
+    """系列统计测试"""
+    
+    def test_refresh_series_stats(self, app):
+        """测试系列统计聚合"""
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            other = Series(code='OP-13', language='jp', name='Other', series_type='booster')
+            db.session.add_all([series, other])
+            db.session.commit()
+            
+            leader = Card(card_number='OP14-001', language='jp', series_id=series.id,
+                          name='Leader', card_type='LEADER', rarity='L', colors='赤')
+            reprint = Card(card_number='OP13-050', language='jp', series_id=other.id,
+                           name='Reprint', card_type='EVENT', rarity='C', colors='青')
+            db.session.add_all([leader, reprint])
+            db.session.commit()
+            
+            db.session.add_all([
+                CardVersion(card_id=leader.id, series_id=series.id, illustration_type='アニメ'),
+                CardVersion(card_id=leader.id, series_id=series.id, version_suffix='_v1',
+                            version_type='alt_art', illustration_type='アニメ', has_star_mark=True),
+                CardVersion(card_id=reprint.id, series_id=series.id),
+            ])
+            db.session.commit()
+            
+            assert refresh_series_stats([series.id, other.id]) == 2
+            db.session.commit()
+            
+            stats = Series.query.get(series.id).stats
+            assert stats.total_versions == 3
+            assert stats.card_count == 1
+            assert stats.leader_count == 2
+            assert stats.event_count == 1
+            assert stats.star_count == 1
+            assert stats.rarity_counts == {'L': 2, 'C': 1}
+            assert stats.illustration_counts == {'アニメ': 2}
+            
+            empty = stats_by_series([other.id])[other.id]
+            assert empty.total_versions == 0 and empty.card_count == 1
+
+
+class TestIngest:
+    """批量入库测试"""
+    
+    @staticmethod
+    def _scraped(count, star=False):
+        cards = []
+        for i in range(1, count + 1):
+            number = f'OP14-{i:03d}'
+            cards.append(CardData(card_number=number, name=f'Card {i}', card_type='CHARACTER',
+                                  rarity='C', colors='', image_url=f'https://example.com/{number}.png'))
+            cards.append(CardData(card_number=number, name=f'Card {i}', card_type='CHARACTER',
+                                  rarity='C', colors='', version_index=1, has_star_mark=star,
+                                  image_url=f'https://example.com/{number}_p1.png'))
+        return cards
+    
+    def test_ingest_series_cards(self, app):
+        """测试批量 upsert 及重复入库"""
+        from sqlalchemy import event
+        
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            
+            result = ingest_cards(series, self._scraped(3), 'jp')
+            db.session.commit()
+            assert result.versions_created == 6
+            assert result.images_created == 6
+            assert Card.query.count() == 3
+            assert CardVersion.query.filter_by(version_suffix='_v1').count() == 3
+            assert not CardVersion.query.filter_by(version_suffix='_v1').first().has_star_mark
+            
+            # 再次入库: 不重复创建，只补充星标；语句数与卡片数无关
+            statements = []
+            
+            def before_execute(conn, cursor, statement, *args):
+                statements.append(statement)
+            
+            event.listen(db.engine, 'before_cursor_execute', before_execute)
+            try:
+                result = ingest_cards(series, self._scraped(60, star=True), 'jp')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_execute)
+            db.session.commit()
+            
+            assert len(statements) <= 10
+            assert result.versions_created == 114
+            assert result.versions_updated == 3
+            assert Card.query.count() == 60
+            assert CardVersion.query.count() == 120
+            assert CardImage.query.count() == 120
+            assert CardVersion.query.filter_by(has_star_mark=True).count() == 60
+    
+    def test_ingest_records(self, app):
+        """测试 IngestRecord 入库（不关联系列、更新本地图片、覆盖指定字段）"""
+        with app.app_context():
+            series = Series(code='DON', language='jp', name='DON', series_type='don')
+            db.session.add(series)
+            db.session.commit()
+            
+            record = IngestRecord(card_number='DON-001', name='ドン!!カード', card_type='DON',
+                                  rarity='DON', image_url='https://example.com/don.png')
+            ingest_cards(series, [record], 'jp', link_series=False)
+            db.session.commit()
+            assert db.session.execute(card_series.select()).first() is None
+            
+            record = IngestRecord(card_number='DON-001', name='DON!! Card', card_type='DON',
+                                  rarity='DON', image_local_path='/static/images/don/jp/DON-001.png')
+            result = ingest_cards(series, [record], 'jp', link_series=False, update_fields=('name',))
+            db.session.commit()
+            assert result.images_updated == 1
+            assert Card.query.one().name == 'DON!! Card'
+            image = CardImage.query.one()
+            assert image.original_url == 'https://example.com/don.png'
+            assert image.local_path == '/static/images/don/jp/DON-001.png'
+            
+            with pytest.raises(ValueError):
+                ingest_cards(series, [record], 'jp', update_fields=('language',))
+
+
+class TestPriceIngest:
+    """价格批量入库测试"""
+    
+    def test_write_prices(self, app):
+        """测试版本映射、当天去重及语句数"""
+        from datetime import datetime, timedelta
+        from sqlalchemy import event
+        from app.models.price import PriceHistory
+        from app.services.price_ingest import write_prices
+        
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            ingest_cards(series, TestIngest._scraped(30), 'jp')
+            db.session.commit()
+            
+            normal = CardVersion.query.filter_by(version_suffix='').order_by(CardVersion.id).first()
+            now = datetime(2026, 1, 2, 12, 0)
+            # 昨天的记录不影响今天写入
+            db.session.add(PriceHistory(version_id=normal.id, source='optcg_api', currency='USD',
+                                        price=1.0, recorded_at=now - timedelta(days=1)))
+            db.session.commit()
+            
+            prices = []
+            for i in range(1, 31):
+                prices.append({'card_number': f'OP14-{i:03d}', 'market_price': 2.0, 'is_alt_art': False})
+                prices.append({'card_number': f'OP14-{i:03d}', 'market_price': 9.0, 'is_alt_art': True})
+            prices.append({'card_number': 'OP14-999', 'market_price': 1.0, 'is_alt_art': False})
+            prices.append({'card_number': 'OP14-001', 'market_price': None, 'is_alt_art': False})
+            
+            statements = []
+            
+            def before_execute(conn, cursor, statement, *args):
+                statements.append(statement)
+            
+            event.listen(db.engine, 'before_cursor_execute', before_execute)
+            try:
+                result = write_prices(prices, recorded_at=now)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_execute)
+            db.session.commit()
+            
+            # 版本映射 + 当天记录 + INSERT，以及 price_latest 快照的查询 / 删除 / 插入
+            assert len(statements) <= 6
+            assert result.inserted == 60
+            assert result.skipped_no_card == 1
+            assert result.skipped_no_price == 1
+            alt = CardVersion.query.filter_by(version_suffix='_v1').order_by(CardVersion.id).first()
+            assert PriceHistory.query.filter_by(version_id=alt.id).one().price == 9.0
+            
+            # 同一天再次写入全部跳过
+            result = write_prices(prices, recorded_at=now + timedelta(hours=6))
+            assert result.inserted == 0
+            assert result.skipped_existing == 60
+
+
+class TestPriceLatest:
+    """最新价格快照测试"""
+    
+    def test_snapshot_maintained_on_write(self, app):
+        """写入价格时更新快照，补录的旧价格不覆盖；重建结果一致"""
+        from datetime import datetime, timedelta
+        from app.models.price import PriceLatest
+        from app.services.price_ingest import write_prices
+        from app.services.price_latest import latest_by_version, rebuild_latest
+        
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            ingest_cards(series, TestIngest._scraped(1), 'jp')
+            db.session.commit()
+            normal = CardVersion.query.filter_by(version_suffix='').one()
+            
+            day = datetime(2026, 1, 2, 12, 0)
+            price = lambda value: [{'card_number': 'OP14-001', 'market_price': value, 'is_alt_art': False}]
+            write_prices(price(10.0), recorded_at=day)
+            write_prices(price(12.0), recorded_at=day + timedelta(days=1))
+            write_prices(price(1.0), recorded_at=day - timedelta(days=5))
+            db.session.commit()
+            
+            snap = latest_by_version([normal.id])[normal.id]
+            assert snap.price == 12.0
+            assert snap.previous_price == 10.0
+            assert snap.change_pct == 20.0
+            
+            # 从历史重建: 最近两条为 12.0 / 10.0
+            assert rebuild_latest() == 1
+            db.session.commit()
+            snap = PriceLatest.query.one()
+            assert (snap.price, snap.previous_price, snap.change_pct) == (12.0, 10.0, 20.0)
+
+
+class TestPriceRollup:
+    """价格聚合测试"""
+    
+    def test_refresh_rollups(self, app):
+        """测试日/周/月 OHLC 聚合及增量重算"""
+        from datetime import datetime, timedelta
+        from app.models.price import PriceHistory, PriceRollup
+        from app.services.price_rollup import refresh_rollups, pick_resolution
+        
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            ingest_cards(series, TestIngest._scraped(1), 'jp')
+            db.session.commit()
+            version = CardVersion.query.filter_by(version_suffix='').one()
+            
+            # 2026-01-26 (周一) 起 10 天，价格 1..10，跨越月份
+            start = datetime(2026, 1, 26, 6, 0)
+            for i in range(10):
+                db.session.add(PriceHistory(version_id=version.id, source='optcg_api', currency='USD',
+                                            price=float(i + 1), recorded_at=start + timedelta(days=i)))
+            db.session.commit()
+            
+            refresh_rollups()
+            db.session.commit()
+            rollups = lambda resolution: PriceRollup.query.filter_by(resolution=resolution)\
+                .order_by(PriceRollup.period_start).all()
+            
+            assert len(rollups('day')) == 10
+            january, february = rollups('month')
+            assert (january.open, january.high, january.low, january.close) == (1.0, 6.0, 1.0, 6.0)
+            assert (february.open, february.close, february.count) == (7.0, 10.0, 4)
+            weeks = rollups('week')
+            assert [w.count for w in weeks] == [7, 3]
+            assert weeks[0].avg == 4.0
+            
+            # 增量: 新增一条后只重算包含它的周期
+            db.session.add(PriceHistory(version_id=version.id, source='optcg_api', currency='USD',
+                                        price=20.0, recorded_at=start + timedelta(days=10)))
+            db.session.commit()
+            refresh_rollups(version_ids=[version.id], since=start + timedelta(days=10))
+            db.session.commit()
+            
+            assert len(rollups('day')) == 11
+            assert [m.count for m in rollups('month')] == [6, 5]
+            assert rollups('month')[1].high == 20.0
+            assert [w.count for w in rollups('week')] == [7, 4]
+            
+            assert pick_resolution(30) == 'raw'
+            assert pick_resolution(365) == 'day'
+            assert pick_resolution(365 * 3) == 'week'
+            assert pick_resolution(365 * 10) == 'month'
+
+
+class TestPriceAnalytics:
+    """价格分析测试"""
+    
+    def test_rolling_and_returns(self):
+        """测试向量化滑动统计与收益率"""
+        import math
+        import numpy as np
+        from app.services import price_analytics as analytics
+        
+        prices = np.array([[1.0, np.nan, 3.0, 4.0], [np.nan, 2.0, 2.0, 8.0]])
+        filled = analytics.forward_fill(prices)
+        assert filled[0].tolist() == [1.0, 1.0, 3.0, 4.0]
+        assert math.isnan(filled[1, 0]) and filled[1, 1:].tolist() == [2.0, 2.0, 8.0]
+        
+        mean = analytics.rolling_mean(filled, 2)
+        assert analytics.to_json(mean[0]) == [None, 1.0, 2.0, 3.5]
+        assert analytics.to_json(mean[1]) == [None, None, 2.0, 5.0]
+        std = analytics.rolling_std(filled[0], 3)
+        assert round(std[2], 10) == round(np.std([1.0, 1.0, 3.0], ddof=1), 10)
+        
+        returns = analytics.log_returns(prices)
+        assert returns[1, 3] == math.log(4.0)
+        assert analytics.last_valid(returns[1]) == round(math.log(4.0), 4)
+        assert round(analytics.correlation(prices[0], prices[0]), 10) == 1.0
+        assert analytics.correlation(prices[0], prices[0], min_points=4) is None
+    
+    def test_load_and_series_index(self, app):
+        """测试读取价格矩阵与系列指数"""
+        from datetime import datetime, timedelta
+        from app.models.price import PriceHistory
+        from app.services import price_analytics as analytics
+        
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            ingest_cards(series, TestIngest._scraped(2), 'jp')
+            db.session.commit()
+            a, b = [v.id for v in CardVersion.query.order_by(CardVersion.id).limit(2)]
+            
+            # 固定在正午，+1 小时不会跨日
+            start = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=3)
+            for i, (pa, pb) in enumerate([(10.0, 20.0), (11.0, None), (12.0, 30.0)]):
+                db.session.add(PriceHistory(version_id=a, source='optcg_api', currency='USD',
+                                            price=pa, recorded_at=start + timedelta(days=i)))
+                if pb:
+                    db.session.add(PriceHistory(version_id=b, source='optcg_api', currency='USD',
+                                                price=pb, recorded_at=start + timedelta(days=i, hours=1)))
+            # 同日另一来源取平均
+            db.session.add(PriceHistory(version_id=a, source='tcgplayer', currency='USD',
+                                        price=14.0, recorded_at=start + timedelta(days=2)))
+            db.session.commit()
+            
+            matrix = analytics.load_prices(days=10)
+            assert matrix.version_ids.tolist() == [a, b]
+            assert len(matrix.dates) == 3
+            assert matrix.row(a).tolist() == [10.0, 11.0, 13.0]
+            assert matrix.constituents() == 2
+            assert analytics.load_prices([a], days=10, source='optcg_api').row(a).tolist() == [10.0, 11.0, 12.0]
+            
+            index = analytics.series_index(matrix)
+            assert index[0] == 100.0
+            # 第 2 天: a +10%, b 无变化 (向前填充) -> +5%
+            assert round(index[1], 6) == 105.0
+
+
+class TestFingerprint:
+    """内容指纹增量入库测试"""
+    
+    def test_ingest_changed(self, app):
+        """测试只写入变化的卡片、勘误覆盖与系列未变化时跳过"""
+        from app.models import CardFingerprint, SeriesFingerprint
+        from app.services.fingerprint import ingest_changed
+        
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            
+            result, diff = ingest_changed(series, TestIngest._scraped(3), 'jp')
+            db.session.commit()
+            assert len(diff.changed) == 6 and diff.new_count == 6
+            assert result.versions_created == 6
+            assert CardFingerprint.query.count() == 6
+            first_hash = db.session.get(SeriesFingerprint, series.id).content_hash
+            
+            # 未变化: 整个系列跳过
+            result, diff = ingest_changed(series, TestIngest._scraped(3), 'jp')
+            db.session.commit()
+            assert diff.unchanged and not diff.changed
+            assert result.versions_created == 0
+            
+            # 勘误 + 新异画: 只写入变化的版本，空白差异不算变化
+            cards = TestIngest._scraped(3)
+            cards[0].effect_text = '【登場時】カードを1枚引く。'
+            cards[2].name = '  Card   2 '
+            cards.append(CardData(card_number='OP14-003', name='Card 3', card_type='CHARACTER',
+                                  rarity='C', colors='', version_index=2))
+            result, diff = ingest_changed(series, cards, 'jp')
+            db.session.commit()
+            assert len(diff.changed) == 2 and diff.new_count == 1
+            assert result.versions_created == 1
+            assert Card.query.filter_by(card_number='OP14-001').one().effect_text == '【登場時】カードを1枚引く。'
+            assert CardFingerprint.query.count() == 7
+            assert db.session.get(SeriesFingerprint, series.id).content_hash != first_hash
+            
+            # 官网删除的版本只报告
+            _, diff = ingest_changed(series, cards[2:], 'jp')
+            assert diff.removed == [('OP14-001', ''), ('OP14-001', '_v1')]
+
+
+class TestImageManifest:
+    """图片清单回填测试"""
+    
+    class _FakeDownloader:
+        """按 URL 返回固定内容的下载器"""
+        
+        def __init__(self, store, bodies):
+            self.store = store
+            self.bodies = bodies
+            self.requested = []
+        
+        def download_many(self, urls):
+            urls = list(urls)
+            self.requested.extend(urls)
+            return {url: self.store.write_stream([self.bodies[url]], 'png')
+                    for url in urls if url in self.bodies}
+    
+    def test_backfill_images(self, app, tmp_path):
+        """测试下载去重、已有 blob 只登记、缺失时计入失败、再次回填无事可做"""
+        from app.models import CardImageBlob, ImageBlob
+        from app.services.image_manifest import backfill_images
+        from scrapers.utils.images import BlobStore
+        
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            ingest_cards(series, TestIngest._scraped(2), 'jp')
+            db.session.commit()
+            
+            images = CardImage.query.order_by(CardImage.id).all()
+            assert len(images) == 4
+            urls = [img.original_url for img in images]
+            store = BlobStore(tmp_path)
+            # 异画与普通版图片内容相同；最后一张下载失败
+            bodies = {urls[0]: b'same', urls[1]: b'same', urls[2]: b'other'}
+            
+            # 不传下载器: 没有本地文件的图片全部跳过
+            result = backfill_images(store)
+            assert result.images == 4 and result.skipped == 4
+            assert CardImageBlob.query.count() == 0
+            
+            downloader = self._FakeDownloader(store, bodies)
+            result = backfill_images(store, downloader, batch_size=3)
+            assert result.downloaded == 3 and result.failed == 1
+            assert result.blobs_created == 2
+            assert ImageBlob.query.count() == 2
+            assert CardImageBlob.query.count() == 3
+            first = db.session.get(CardImage, images[0].id)
+            assert first.local_path == store.url_for(db.session.get(CardImageBlob, first.id).sha1, 'png')
+            assert CardListing.query.filter_by(version_id=first.version_id).one().image_local_path == first.local_path
+            
+            # 只剩失败的那张
+            downloader.requested.clear()
+            result = backfill_images(store, downloader)
+            assert result.images == 1 and downloader.requested == [urls[3]]
+            
+            # local_path 已是 blob 地址但清单缺失: 只登记
+            db.session.query(CardImageBlob).delete()
+            db.session.commit()
+            result = backfill_images(store)
+            assert result.registered == 3 and result.skipped == 1
+            assert CardImageBlob.query.count() == 3
+    
+    def test_generate_variants(self, app, tmp_path, monkeypatch):
+        """测试缩略图生成、宽高回写与 cdn_image 优先使用本地缩略图"""
+        from PIL import Image
+        from app import cdn_image
+        from app.services import image_manifest, image_variants
+        from scrapers.utils.images import BlobStore
+        
+        monkeypatch.setattr(image_manifest, '_STATIC_ROOT', tmp_path)
+        monkeypatch.setattr(image_variants, 'VARIANT_ROOT', tmp_path / 'images' / 'variants')
+        
+        with app.app_context():
+            series = Series(code='OP-14', language='jp', name='Test', series_type='booster')
+            db.session.add(series)
+            db.session.commit()
+            ingest_cards(series, TestIngest._scraped(1), 'jp')
+            db.session.commit()
+            
+            store = BlobStore(tmp_path / 'images' / 'blobs')
+            source = tmp_path / 'card.png'
+            Image.new('RGBA', (600, 838), (200, 30, 30, 255)).save(source)
+            blob = store.write_stream([source.read_bytes()], 'png')
+            images = CardImage.query.order_by(CardImage.id).all()
+            images[0].local_path = blob.url
+            db.session.commit()
+            
+            assert cdn_image(blob.url, 200) == blob.url
+            assert cdn_image(images[1].original_url, 200).startswith('https://wsrv.nl/')
+            
+            result = image_variants.generate_variants()
+            assert result.images == 1 and result.files_created == 6
+            image = db.session.get(CardImage, images[0].id)
+            assert (image.width, image.height) == (600, 838)
+            listing = db.session.get(CardListing, image.version_id)
+            assert (listing.image_width, listing.image_height) == (600, 838)
+            
+            thumb = cdn_image(blob.url, 200)
+            assert thumb == f'/static/images/variants/{blob.sha1[:2]}/{blob.sha1}_w200.webp'
+            assert cdn_image(blob.url, 300).endswith('_w400.webp')
+            assert cdn_image(blob.url).endswith('_full.webp')
+            with Image.open(tmp_path / thumb[len('/static/'):]) as im:
+                assert im.size == (200, 279)
+            assert image_variants.variant_path(blob.sha1, None, 'jpg').is_file()
+            
+            # 已记录宽高的图片不再处理
+            assert image_variants.generate_variants().images == 0
@@ -5,6 +5,11 @@ import pytest
 from app import create_app, db
 from app.models.series import Series
 from app.models.card import Card, CardVersion, CardImage
+from app.services.card_listing import rebuild_listings, refresh_listings
+from app.services.search import rebuild_search_index, search_card_ids
+from app.services.cache import TTLCache
+from app.services.catalog import get_series_list, invalidate_catalog
+from app.services.series_stats import rebuild_series_stats
 
 
 @pytest.fixture
@@ -64,6 +69,12 @@ def _create_test_data():
     )
     db.session.add(image)
     db.session.commit()
+    
+    # 列表读模型 / 检索索引 / 系列统计
+    rebuild_listings()
+    rebuild_search_index()
+    rebuild_series_stats()
+    db.session.commit()
 
 
 class TestMainRoutes:
@@ -78,6 +89,66 @@ class TestMainRoutes:
         """测试搜索页"""
         response = client.get('/search')
         assert response.status_code == 200
+    
+    def test_search_fulltext(self, app, client):
+        """测试全文检索 (名称前缀 / 效果文本)"""
+        assert search_card_ids('ロー') == [1]
+        assert search_card_ids('测试效果文本', fields=('name',)) == []
+        assert search_card_ids('测试效果文本') == [1]
+        # 日文 n-gram: 词中片段 / 平假名 / 半角片假名 / 省略 `・`
+        assert search_card_ids('ファルガー') == [1]
+        assert search_card_ids('とらふぁるがー') == [1]
+        assert search_card_ids('ﾛｰ') == [1]
+        assert search_card_ids('トラファルガーロー') == [1]
+        assert search_card_ids('ルフィ') == []
+        
+        response = client.get('/search?q=ロー')
+        assert response.status_code == 200
+        assert 'OP14-001' in response.get_data(as_text=True)
+    
+    def test_search_ranking_and_paging(self, app, client, monkeypatch):
+        """测试卡号前缀、名称命中排在效果命中之前，以及卡组编辑搜索按相关度分页"""
+        from app.routes import api
+        from app.services.search import card_number_ids
+        
+        series = Series.query.first()
+        specs = [
+            ('OP14-002', 'ナミ', 'ルフィを手札に加える'),
+            ('OP14-003', 'モンキー・D・ルフィ', None),
+            ('OP14-010', 'ルフィ', None),
+            ('ST01-001', 'ルフィ&ゾロ', None),
+        ]
+        cards = []
+        for number, name, effect in specs:
+            card = Card(card_number=number, language='jp', series_id=series.id, name=name,
+                        card_type='CHARACTER', rarity='C', colors='赤', effect_text=effect)
+            db.session.add(card)
+            db.session.flush()
+            db.session.add(CardVersion(card_id=card.id, series_id=series.id, version_type='normal'))
+            cards.append(card)
+        db.session.commit()
+        rebuild_listings()
+        rebuild_search_index()
+        db.session.commit()
+        effect_only = cards[0].id
+        
+        # 卡号: 前缀范围查询，大小写不敏感，不做子串匹配
+        assert card_number_ids('op14-00') == [1, cards[0].id, cards[1].id]
+        assert card_number_ids('14-001') == []
+        assert card_number_ids('ルフィ') == []
+        
+        ranked = search_card_ids('ルフィ')
+        assert len(ranked) == 4 and ranked[-1] == effect_only
+        
+        body = client.get('/search?q=OP14-01').get_data(as_text=True)
+        assert 'OP14-010' in body and 'OP14-001' not in body
+        
+        # 卡组编辑搜索: 只检索名称，按相关度分页，不再截断为按卡号排序
+        monkeypatch.setattr(api, 'SEARCH_PER_PAGE', 2)
+        name_ranked = search_card_ids('ルフィ', fields=('name',))
+        pages = [client.get(f'/api/cards/search?name=ルフィ&page={p}').get_json() for p in (1, 2, 3)]
+        assert [len(p) for p in pages] == [2, 1, 0]
+        assert [r['id'] for r in pages[0] + pages[1]] == name_ranked
 
 
 class TestCardRoutes:
@@ -93,6 +164,78 @@ class TestCardRoutes:
         response = client.get('/cards/?lang=jp')
         assert response.status_code == 200
     
+    def test_card_list_series_filter(self, client):
+        """测试按系列查看卡片列表"""
+        response = client.get('/cards/?lang=jp&series=1')
+        assert response.status_code == 200
+        assert 'OP14-001'.encode() in response.data
+        assert b'example.com%2Fcard.png' in response.data
+    
+    def test_card_list_query_count_fixed(self, app, client):
+        """测试列表页查询次数不随卡片数量增长"""
+        from sqlalchemy import event
+        
+        def count_queries(url):
+            statements = []
+            
+            def before_execute(conn, cursor, statement, *args):
+                statements.append(statement)
+            
+            event.listen(db.engine, 'before_cursor_execute', before_execute)
+            try:
+                response = client.get(url)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_execute)
+            assert response.status_code == 200
+            return len(statements)
+        
+        urls = ('/cards/?lang=jp', '/cards/?lang=jp&series=1')
+        # 预热系列导航/统计缓存
+        for url in urls:
+            client.get(url)
+        baseline = {url: count_queries(url) for url in urls}
+        
+        with app.app_context():
+            for i in range(2, 22):
+                card = Card(card_number=f'OP14-{i:03d}', language='jp', series_id=1,
+                            name=f'Card {i}', card_type='CHARACTER', rarity='C', colors='青')
+                db.session.add(card)
+                db.session.flush()
+                version = CardVersion(card_id=card.id, series_id=1, version_type='normal')
+                db.session.add(version)
+                db.session.flush()
+                db.session.add(CardImage(version_id=version.id, original_url=f'https://example.com/{i}.png'))
+            refresh_listings(series_ids=[1])
+            db.session.commit()
+        
+        for url, expected in baseline.items():
+            assert count_queries(url) == expected
+    
+    def test_catalog_cache(self, app, client):
+        """测试系列导航缓存与失效"""
+        assert client.get('/cards/').status_code == 200
+        assert len(get_series_list('jp')) == 1
+        
+        db.session.add(Series(code='OP-15', language='jp', name='OP-15', series_type='booster'))
+        db.session.commit()
+        # 缓存未失效前仍返回旧数据
+        assert len(get_series_list('jp')) == 1
+        invalidate_catalog()
+        assert [s['code'] for s in get_series_list('jp')] == ['OP-15', 'OP-14']
+        
+        cache = TTLCache(max_entries=2, ttl=60)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key)
+        assert cache.get('a') is None and cache.get('c') == 'c'
+        cache.set('d', 1, ttl=0)
+        assert cache.get('d') is None
+    
+    def test_series_detail(self, client):
+        """测试系列详情"""
+        response = client.get('/cards/series/1')
+        assert response.status_code == 200
+        assert 'OP14-001'.encode() in response.data
+    
     def test_card_detail(self, client):
         """测试卡片详情"""
         response = client.get('/cards/OP14-001?lang=jp')
@@ -125,6 +268,91 @@ class TestAPIRoutes:
         assert response.status_code == 200
 
 
+class TestPriceRoutes:
+    """价格路由测试"""
+    
+    def test_trending(self, app, client):
+        """测试涨跌榜页面与 API"""
+        from datetime import datetime, timedelta
+        from app.services.price_ingest import write_prices
+        from app.services.price_movers import refresh_movers
+        
+        now = datetime.utcnow()
+        price = lambda value: [{'card_number': 'OP14-001', 'market_price': value, 'is_alt_art': False}]
+        with app.app_context():
+            write_prices(price(10.0), recorded_at=now - timedelta(days=9))
+            write_prices(price(15.0), recorded_at=now - timedelta(hours=1))
+            assert refresh_movers(now=now) == 1
+            db.session.commit()
+        
+        response = client.get('/prices/trending?period=7d')
+        assert response.status_code == 200
+        assert 'トラファルガー・ロー' in response.get_data(as_text=True)
+        
+        data = client.get('/prices/api/trending?period=7d&rarity=L').get_json()
+        assert data['count'] == 1
+        assert data['data'][0]['change_pct'] == 50.0
+        assert client.get('/prices/api/trending?period=7d&direction=losers').get_json()['count'] == 0
+        assert client.get('/prices/api/trending?period=1y').status_code == 400
+    
+    def test_compare_columnar(self, app, client):
+        """测试价格比较 API 返回列式数组"""
+        from datetime import datetime, timedelta
+        from app.models import CardVersion
+        from app.services.price_ingest import write_prices
+        
+        now = datetime.utcnow()
+        with app.app_context():
+            for days, value in ((3, 10.0), (1, 12.0)):
+                write_prices([{'card_number': 'OP14-001', 'market_price': value, 'is_alt_art': False}],
+                             recorded_at=now - timedelta(days=days))
+            db.session.commit()
+            version = CardVersion.query.first()
+            vid, series_id = version.id, version.series_id
+        
+        data = client.get(f'/prices/api/compare?ids={vid}&ids=99999&resolution=raw').get_json()
+        assert data[str(vid)]['card_number'] == 'OP14-001'
+        assert data[str(vid)]['prices'] == [10.0, 12.0]
+        assert len(data[str(vid)]['dates']) == 2
+        assert data[str(vid)]['currency'] == 'USD'
+        assert data['99999'] == {'card_number': None, 'card_name': None, 'currency': None,
+                                 'dates': [], 'prices': []}
+        
+        data = client.get(f'/prices/api/compare?series_id={series_id}').get_json()
+        assert str(vid) in data
+        assert client.get('/prices/api/compare').status_code == 400
+        too_many = '&'.join(f'ids={i}' for i in range(400))
+        assert client.get(f'/prices/api/compare?{too_many}').status_code == 400
+    
+    def test_analytics(self, app, client):
+        """测试价格分析 API"""
+        from datetime import datetime, timedelta
+        from app.models import CardVersion
+        from app.services.price_ingest import write_prices
+        
+        now = datetime.utcnow()
+        with app.app_context():
+            for days, value in ((3, 10.0), (2, 11.0), (1, 12.0)):
+                write_prices([{'card_number': 'OP14-001', 'market_price': value, 'is_alt_art': False}],
+                             recorded_at=now - timedelta(days=days))
+            db.session.commit()
+            version = CardVersion.query.first()
+            vid, series_id = version.id, version.series_id
+        
+        data = client.get(f'/prices/api/analytics/{vid}?window=2').get_json()
+        assert data['prices'] == [10.0, 11.0, 12.0]
+        assert data['moving_avg'] == [None, 10.5, 11.5]
+        assert data['returns'][0] is None and len(data['volatility']) == 3
+        
+        data = client.get(f'/prices/api/analytics/series/{series_id}').get_json()
+        assert data['constituents'] == 1
+        assert data['index'] == [100.0, 110.0, 120.0]
+        
+        data = client.get('/prices/api/analytics/card/OP14-001').get_json()
+        assert data['base_version_id'] == vid
+        assert client.get('/prices/api/analytics/card/XX-999').status_code == 404
+
+
 class TestAuthRoutes:
     """认证路由测试"""
     
@@ -137,3 +365,72 @@ class TestAuthRoutes:
         """测试注册页"""
         response = client.get('/auth/register')
         assert response.status_code == 200
+
+
+class TestStaticAssets:
+    """静态文件指纹与缓存头测试"""
+    
+    def test_fingerprint_and_cache_headers(self, app, client, tmp_path):
+        """测试 url_for 指纹、immutable 缓存、304 与 Range"""
+        from flask import url_for
+        from app import cdn_image
+        
+        app.static_folder = str(tmp_path)
+        app.static_url_path = '/static'
+        don = tmp_path / 'images' / 'don' / 'jp'
+        don.mkdir(parents=True)
+        (don / 'DON-001.jpg').write_bytes(b'0123456789' * 10)
+        blob = tmp_path / 'images' / 'blobs' / 'ab'
+        blob.mkdir(parents=True)
+        (blob / ('ab' * 20 + '.png')).write_bytes(b'png')
+        
+        with app.test_request_context():
+            url = url_for('static', filename='images/don/jp/DON-001.jpg')
+            assert cdn_image('/static/images/don/jp/DON-001.jpg') == url
+        assert '?v=' in url
+        
+        response = client.get(url)
+        assert response.status_code == 200
+        assert 'immutable' in response.headers['Cache-Control']
+        assert 'max-age=31536000' in response.headers['Cache-Control']
+        
+        # 未带指纹: 短缓存
+        response = client.get('/static/images/don/jp/DON-001.jpg')
+        assert 'immutable' not in response.headers['Cache-Control']
+        assert 'max-age=3600' in response.headers['Cache-Control']
+        
+        # ETag / 304
+        etag = response.headers['ETag']
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+        
+        # Range
+        response = client.get(url, headers={'Range': 'bytes=10-19'})
+        assert response.status_code == 206 and response.data == b'0123456789'
+        
+        # 按内容寻址的 blob 不需要 ?v=
+        response = client.get(f"/static/images/blobs/ab/{'ab' * 20}.png")
+        assert 'immutable' in response.headers['Cache-Control']
+    
+    def test_precompressed(self, app, client, tmp_path):
+        """测试按 Accept-Encoding 返回预压缩文件"""
+        import gzip
+        from app.services.static_assets import precompress
+        
+        app.static_folder = str(tmp_path)
+        app.static_url_path = '/static'
+        (tmp_path / 'css').mkdir()
+        css = b'body { color: red; }\n' * 50
+        (tmp_path / 'css' / 'site.css').write_bytes(css)
+        
+        stats = precompress(tmp_path)
+        assert stats['files'] == 1 and stats['written'] >= 1
+        assert precompress(tmp_path)['written'] == 0
+        
+        response = client.get('/static/css/site.css', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.mimetype == 'text/css'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.data) == css
+        
+        response = client.get('/static/css/site.css')
+        assert 'Content-Encoding' not in response.headers and response.data == css
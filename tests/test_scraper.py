@@ -68,3 +68,593 @@ class TestJapanOfficialScraper:
         # 应该是相对路径，不是硬编码
         assert 'data' in str(scraper.IMAGE_DIR)
         assert 'images' in str(scraper.IMAGE_DIR)
+
+
+class TestWaits:
+    """事件驱动等待测试（假页面，不启动浏览器）"""
+    
+    class _FakePage:
+        """记录调用顺序；timeouts 中的方法抛出 Playwright 超时"""
+        
+        def __init__(self, timeouts=(), stable=None):
+            self.calls = []
+            self.timeouts = set(timeouts)
+            self.stable = stable or {'count': 3, 'timedOut': False}
+        
+        def _call(self, name, *args):
+            from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+            self.calls.append((name, *args))
+            if name in self.timeouts:
+                raise PlaywrightTimeoutError(f'{name} timed out')
+        
+        def goto(self, url, wait_until=None):
+            self._call('goto', wait_until)
+        
+        def wait_for_load_state(self, state, timeout=None):
+            self._call('wait_for_load_state', state)
+        
+        def wait_for_selector(self, selector, state=None, timeout=None):
+            self._call('wait_for_selector', selector, state)
+        
+        def wait_for_function(self, script, arg=None, timeout=None):
+            self._call('wait_for_function', *arg)
+        
+        def evaluate(self, script, arg=None):
+            self._call('evaluate', arg)
+            return self.stable
+    
+    def test_wait_stats_summary_across_threads(self):
+        """多个 worker 共享 WaitStats，计数/总耗时/最长/超时按类别累计"""
+        import threading
+        from scrapers.utils.waits import WaitStats
+        
+        stats = WaitStats()
+        
+        def work():
+            for i in range(100):
+                stats.record('card_list', 0.01, timed_out=(i == 0))
+        
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats.record('next_page', 2.0)
+        
+        summary = stats.summary()
+        assert summary['card_list']['count'] == 800
+        assert summary['card_list']['timeouts'] == 8
+        assert round(summary['card_list']['total'], 6) == 8.0
+        assert round(summary['card_list']['avg'], 6) == 0.01
+        assert summary['next_page']['max'] == 2.0
+    
+    def test_network_idle_timeout_is_recorded_not_raised(self):
+        """网络空闲等待超时后继续，并记为超时"""
+        from scrapers.utils.waits import WaitStats, wait_for_network_idle
+        
+        stats = WaitStats()
+        page = self._FakePage(timeouts={'wait_for_load_state'})
+        wait_for_network_idle(page, stats, label='card_list_network')
+        assert page.calls == [('wait_for_load_state', 'networkidle')]
+        assert stats.summary()['card_list_network']['timeouts'] == 1
+        
+        wait_for_network_idle(self._FakePage(), stats, label='card_list_network')
+        assert stats.summary()['card_list_network'] == {**stats.summary()['card_list_network'], 'count': 2, 'timeouts': 1}
+    
+    def test_selector_and_text_change(self):
+        """元素等待 / 文本变化等待返回是否在超时前满足"""
+        from scrapers.utils.waits import WaitStats, wait_for_selector, wait_for_text_change
+        
+        stats = WaitStats()
+        assert wait_for_selector(self._FakePage(), '.card', stats)
+        assert not wait_for_selector(self._FakePage(timeouts={'wait_for_selector'}), '.card', stats)
+        assert stats.summary()['selector:.card']['timeouts'] == 1
+        
+        page = self._FakePage(timeouts={'wait_for_function'})
+        assert not wait_for_text_change(page, '.num', 'OP01-001', stats, label='next_page')
+        assert page.calls == [('wait_for_function', '.num', 'OP01-001')]
+    
+    def test_stable_count(self):
+        """MutationObserver 等待: 传入选择器/静默时间/超时，返回元素数量并记录超时"""
+        from scrapers.utils.waits import WaitStats, wait_for_stable_count
+        
+        stats = WaitStats()
+        page = self._FakePage(stable={'count': 154, 'timedOut': False})
+        assert wait_for_stable_count(page, '.modalCol', stats, quiet_ms=300, timeout=5000, label='card_list') == 154
+        assert page.calls == [('evaluate', ['.modalCol', 300, 5000])]
+        
+        page = self._FakePage(stable={'count': 0, 'timedOut': True})
+        assert wait_for_stable_count(page, '.modalCol', stats, label='card_list') == 0
+        assert stats.summary()['card_list'] == {**stats.summary()['card_list'], 'count': 2, 'timeouts': 1}
+    
+    def test_stable_count_in_browser(self):
+        """真实浏览器: 元素分批插入时等到 DOM 静默后才返回"""
+        from playwright.sync_api import Error as PlaywrightError, sync_playwright
+        from scrapers.utils.waits import wait_for_stable_count
+        
+        with sync_playwright() as p:
+            try:
+                browser = p.chromium.launch()
+            except PlaywrightError:
+                pytest.skip('未安装 Chromium')
+            try:
+                page = browser.new_page()
+                page.set_content("""
+                    <div id="list"></div>
+                    <script>
+                        let n = 0;
+                        const timer = setInterval(() => {
+                            const el = document.createElement('div');
+                            el.className = 'card';
+                            document.getElementById('list').appendChild(el);
+                            if (++n === 5) clearInterval(timer);
+                        }, 100);
+                    </script>
+                """)
+                assert wait_for_stable_count(page, '.card', quiet_ms=300, timeout=5000) == 5
+            finally:
+                browser.close()
+    
+    def test_scrape_series_waits_for_network_before_counting(self, monkeypatch):
+        """JP 系列页: goto 后先等网络空闲，再等卡片数量稳定"""
+        from scrapers.utils.waits import WaitStats
+        
+        scraper = JapanOfficialScraper()
+        scraper.page = self._FakePage()
+        scraper.wait_stats = WaitStats()
+        monkeypatch.setattr(scraper, '_close_cookie_banner', lambda: None)
+        monkeypatch.setattr(scraper, '_extract_cards_from_html', lambda: [])
+        
+        assert scraper.scrape_series('550114', fetch_extras=False) == []
+        assert [c[0] for c in scraper.page.calls] == ['goto', 'wait_for_load_state', 'evaluate']
+        assert scraper.page.calls[1] == ('wait_for_load_state', 'networkidle')
+        assert set(scraper.wait_stats.summary()) == {'card_list_network', 'card_list'}
+
+
+class TestScraperPool:
+    """并行爬取 worker 池与全局限速测试（假爬虫，不启动浏览器）"""
+    
+    class _FakeScraper:
+        """按系列 id 返回卡片；'bad' 抛异常；fail_start 时启动失败"""
+        
+        instances = []
+        
+        def __init__(self, fail_start=False):
+            import threading
+            self.fail_start = fail_start
+            self.lock = threading.Lock()
+            self.threads = set()
+            self.closed = 0
+            self.rate_limiter = None
+            self.wait_stats = None
+            TestScraperPool._FakeScraper.instances.append(self)
+        
+        def start_browser(self):
+            if self.fail_start:
+                raise RuntimeError('browser failed')
+        
+        def close_browser(self):
+            self.closed += 1
+        
+        def scrape_series(self, official_id, **kwargs):
+            import threading
+            self.threads.add(threading.current_thread().name)
+            self.rate_limiter.wait()
+            if official_id == 'bad':
+                raise ValueError('parse error')
+            return [f'{official_id}-{n}' for n in range(kwargs.get('count', 2))]
+    
+    @pytest.fixture(autouse=True)
+    def _reset_instances(self):
+        self._FakeScraper.instances = []
+    
+    @staticmethod
+    def _series(ids):
+        return [{'code': f'S-{i}', 'official_series_id': i} for i in ids]
+    
+    def test_workers_feed_results(self):
+        """N 个 worker 的结果全部回到调用方，每个 worker 的浏览器只关闭一次"""
+        from scrapers.pool import ScraperPool
+        
+        pool = ScraperPool(self._FakeScraper, workers=3, rate=0)
+        results = list(pool.scrape(self._series(range(10)), count=3))
+        
+        assert sorted(r.series_data['official_series_id'] for r in results) == list(range(10))
+        assert all(r.ok and len(r.cards) == 3 for r in results)
+        assert len(self._FakeScraper.instances) == 3
+        assert all(s.closed == 1 for s in self._FakeScraper.instances)
+        assert all(s.rate_limiter is pool.rate_limiter for s in self._FakeScraper.instances)
+        # 每个爬虫只在自己的线程中使用
+        assert all(len(s.threads) <= 1 for s in self._FakeScraper.instances)
+    
+    def test_worker_errors_returned(self):
+        """系列爬取失败作为 error 结果返回，其余系列不受影响"""
+        from scrapers.pool import ScraperPool
+        
+        pool = ScraperPool(self._FakeScraper, workers=2, rate=0)
+        results = {r.series_data['official_series_id']: r for r in pool.scrape(self._series([1, 'bad', 2]))}
+        
+        assert not results['bad'].ok
+        assert isinstance(results['bad'].error, ValueError)
+        assert results['bad'].cards == []
+        assert results[1].ok and results[2].ok
+    
+    def test_start_failure_returns_pending_series(self):
+        """worker 全部启动失败时，未处理的系列以 error 结果返回而不是挂起"""
+        from scrapers.pool import ScraperPool
+        
+        pool = ScraperPool(lambda: self._FakeScraper(fail_start=True), workers=2, rate=0)
+        results = list(pool.scrape(self._series(range(4))))
+        
+        assert len(results) == 4
+        assert all(isinstance(r.error, RuntimeError) for r in results)
+        assert all(s.closed == 1 for s in self._FakeScraper.instances)
+    
+    def test_rate_limit_across_threads(self):
+        """多个线程共享 RateLimiter，相邻请求间隔不小于 1/rate"""
+        import threading
+        import time
+        from scrapers.utils.rate_limit import RateLimiter
+        
+        limiter = RateLimiter(50)
+        stamps = []
+        lock = threading.Lock()
+        
+        def work():
+            for _ in range(5):
+                limiter.wait()
+                with lock:
+                    stamps.append(time.monotonic())
+        
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        stamps.sort()
+        assert len(stamps) == 40
+        # 40 次请求至少跨越 39 个间隔；调度误差留 5ms
+        assert stamps[-1] - stamps[0] >= 39 * limiter.interval - 0.005
+        gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+        assert sum(gaps) / len(gaps) >= limiter.interval * 0.9
+
+
+class TestJapanHttpScraper:
+    """HTTP 后端解析测试（不请求网络）"""
+    
+    CARD_LIST_HTML = '''
+    <html><body>
+      <select class="selectModal">
+        <option value="">ALL</option>
+        <option value="550114">ブースターパック 【OP-14】</option>
+      </select>
+      <div class="resultCol">
+        <dl class="modalCol" id="OP14-001">
+          <dt>
+            <div class="infoCol"><span>OP14-001</span> | <span>L</span> | <span>LEADER</span></div>
+            <div class="cardName">トラファルガー・ロー</div>
+          </dt>
+          <dd>
+            <div class="frontCol"><img data-src="../images/cardlist/card/OP14-001.png"></div>
+            <div class="backCol">
+              <div class="cost"><h3>ライフ</h3>5</div>
+              <div class="attribute"><h3>属性</h3><img alt="斬"></div>
+              <div class="power"><h3>パワー</h3>5000</div>
+              <div class="counter"><h3>カウンター</h3>-</div>
+              <div class="color"><h3>色</h3>赤/緑</div>
+              <div class="feature"><h3>特徴</h3>超新星</div>
+              <div class="text"><h3>テキスト</h3>【起動メイン】</div>
+            </div>
+          </dd>
+        </dl>
+        <dl class="modalCol" id="empty"></dl>
+      </div>
+    </body></html>
+    '''
+    
+    def _doc(self):
+        from lxml import html as lxml_html
+        return lxml_html.fromstring(self.CARD_LIST_HTML)
+    
+    def test_parse_modals(self):
+        """modalCol 解析结果与浏览器端字段一致"""
+        from scrapers.jp_http import JapanHttpScraper
+        
+        scraper = JapanHttpScraper()
+        cards = scraper._build_cards(scraper._parse_modals(self._doc()))
+        
+        assert len(cards) == 1
+        card = cards[0]
+        assert card.card_number == 'OP14-001'
+        assert card.rarity == 'L'
+        assert card.card_type == 'LEADER'
+        assert card.name == 'トラファルガー・ロー'
+        assert card.life == 5
+        assert card.power == 5000
+        assert card.counter is None
+        assert card.colors == '赤/緑'
+        assert card.attribute == '斬'
+        assert card.effect_text == '【起動メイン】'
+        assert card.modal_id == 'OP14-001'
+        assert card.image_url == 'https://www.onepiece-cardgame.com/images/cardlist/card/OP14-001.png'
+    
+    def test_series_options(self):
+        """系列下拉框解析"""
+        from scrapers.jp_http import JapanHttpScraper, SERIES_OPTION_XPATH
+        
+        scraper = JapanHttpScraper()
+        options = self._doc().xpath(SERIES_OPTION_XPATH)
+        series = [scraper._parse_series_option(o.get('value'), o.text_content()) for o in options]
+        
+        assert series[0] is None
+        assert series[1]['code'] == 'OP-14'
+        assert series[1]['series_type'] == 'booster'
+
+
+class TestHttpFetcher:
+    """并发请求器测试（不请求网络）"""
+    
+    def test_token_bucket_burst(self):
+        """桶内令牌足够时不等待"""
+        import time
+        from scrapers.utils.rate_limit import TokenBucket
+        
+        bucket = TokenBucket(rate=1.0, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            bucket.wait()
+        assert time.monotonic() - start < 0.5
+    
+    def test_retry_on_server_error(self, monkeypatch):
+        """5xx 重试后返回成功响应"""
+        import requests
+        from scrapers.utils.fetcher import HttpFetcher
+        
+        fetcher = HttpFetcher(rate=0, retries=2)
+        monkeypatch.setattr(fetcher, '_backoff', lambda attempt, response=None: 0)
+        
+        statuses = iter([503, 200])
+        
+        def fake_request(method, url, **kwargs):
+            response = requests.Response()
+            response.status_code = next(statuses)
+            return response
+        
+        monkeypatch.setattr(fetcher.session, 'request', fake_request)
+        assert fetcher.get('https://example.com/x').status_code == 200
+    
+    def test_conditional_get_uses_cache(self, monkeypatch, tmp_path):
+        """带 ETag 的响应写入缓存，304 时返回缓存内容"""
+        import requests
+        from scrapers.utils.fetcher import HttpFetcher
+        from scrapers.utils.http_cache import HttpCache
+        
+        fetcher = HttpFetcher(rate=0, cache=HttpCache('test', directory=tmp_path))
+        sent = []
+        
+        def fake_request(method, url, headers=None, **kwargs):
+            sent.append(headers or {})
+            response = requests.Response()
+            if (headers or {}).get('If-None-Match') == '"v1"':
+                response.status_code = 304
+            else:
+                response.status_code = 200
+                response._content = b'[1, 2]'
+                response.headers['ETag'] = '"v1"'
+            return response
+        
+        monkeypatch.setattr(fetcher.session, 'request', fake_request)
+        first = fetcher.get('https://example.com/x')
+        assert not first.not_modified and first.json() == [1, 2]
+        
+        second = fetcher.get('https://example.com/x')
+        assert sent[1] == {'If-None-Match': '"v1"'}
+        assert second.not_modified and second.status_code == 200
+        assert second.json() == [1, 2]
+        
+        # 不重新验证时不带条件请求头
+        fetcher.get('https://example.com/x', revalidate=False)
+        assert sent[2] == {}
+    
+    def test_image_cache_without_bodies(self, monkeypatch, tmp_path):
+        """只保存校验信息的缓存: 304 原样返回，调用方据此跳过写文件"""
+        import requests
+        from scrapers.utils.fetcher import HttpFetcher
+        from scrapers.utils.http_cache import HttpCache
+        
+        fetcher = HttpFetcher(rate=0, cache=HttpCache('images', directory=tmp_path, store_bodies=False))
+        
+        def fake_request(method, url, headers=None, **kwargs):
+            response = requests.Response()
+            if (headers or {}).get('If-Modified-Since'):
+                response.status_code = 304
+            else:
+                response.status_code = 200
+                response._content = b'png'
+                response.headers['Last-Modified'] = 'Wed, 01 Oct 2025 00:00:00 GMT'
+            return response
+        
+        monkeypatch.setattr(fetcher.session, 'request', fake_request)
+        assert fetcher.get('https://example.com/a.png').content == b'png'
+        response = fetcher.get('https://example.com/a.png')
+        assert response.not_modified and response.status_code == 304
+        assert not list(tmp_path.glob('images/*.body'))
+    
+    def test_map_keeps_order(self):
+        """map 按输入顺序返回结果"""
+        from scrapers.utils.fetcher import HttpFetcher
+        
+        fetcher = HttpFetcher(concurrency=4)
+        assert fetcher.map(lambda x: x * 2, range(10)) == [x * 2 for x in range(10)]
+
+
+class TestImageDownloader:
+    """并发图片下载 + 按内容寻址存储测试（不请求网络）"""
+    
+    @staticmethod
+    def _downloader(monkeypatch, tmp_path, bodies, sent):
+        import io
+        import requests
+        from scrapers.utils.http_cache import HttpCache
+        from scrapers.utils.images import BlobStore, ImageDownloader
+        
+        downloader = ImageDownloader(workers=4, rate=0, store=BlobStore(tmp_path / 'blobs'),
+                                     cache=HttpCache('images', directory=tmp_path, store_bodies=False))
+        
+        def fake_request(method, url, headers=None, stream=False, **kwargs):
+            sent.append((url, headers or {}))
+            response = requests.Response()
+            response.raw = io.BytesIO(bodies.get(url, b''))
+            if (headers or {}).get('If-None-Match') == '"v1"':
+                response.status_code = 304
+                return response
+            if url not in bodies:
+                response.status_code = 404
+                return response
+            response.status_code = 200
+            response.headers['Content-Type'] = 'image/png'
+            response.headers['ETag'] = '"v1"'
+            return response
+        
+        monkeypatch.setattr(downloader.fetcher.session, 'request', fake_request)
+        return downloader
+    
+    def test_download_many_deduplicates_content(self, monkeypatch, tmp_path):
+        """相同内容只存一份，重复 URL 只请求一次，失败的 URL 不在结果中"""
+        bodies = {
+            'https://example.com/OP01-001.png': b'a' * 1000,
+            'https://example.com/ST01-001.png': b'a' * 1000,
+            'https://example.com/OP01-002.png': b'b' * 10,
+        }
+        sent = []
+        downloader = self._downloader(monkeypatch, tmp_path, bodies, sent)
+        urls = list(bodies) + ['https://example.com/OP01-001.png', 'https://example.com/missing.png']
+        
+        stored = downloader.download_many(urls)
+        assert len(sent) == 4
+        assert set(stored) == set(bodies)
+        first = stored['https://example.com/OP01-001.png']
+        assert first.sha1 == stored['https://example.com/ST01-001.png'].sha1
+        assert first.url == f'/static/images/blobs/{first.sha1[:2]}/{first.sha1}.png'
+        assert len(list((tmp_path / 'blobs').glob('*/*.png'))) == 2
+        
+        stats = downloader.last_stats
+        assert stats.downloaded + stats.deduplicated == 3 and stats.downloaded == 2
+        assert stats.failed == ['https://example.com/missing.png']
+    
+    def test_not_modified_reuses_blob(self, monkeypatch, tmp_path):
+        """已下载的 URL 发送条件请求，304 时复用 blob；blob 丢失时重新完整下载"""
+        url = 'https://example.com/OP01-001.png'
+        sent = []
+        downloader = self._downloader(monkeypatch, tmp_path, {url: b'png-data'}, sent)
+        
+        first = downloader.download(url)
+        assert first.created and sent[0][1] == {}
+        
+        second = downloader.download(url)
+        assert sent[1][1] == {'If-None-Match': '"v1"'}
+        assert second.not_modified and second.sha1 == first.sha1
+        
+        downloader.store.path_for(first.sha1, first.ext).unlink()
+        third = downloader.download(url)
+        assert sent[2][1] == {} and third.created
+
+
+class TestPriceScraper:
+    """价格爬虫测试（不请求网络）"""
+    
+    def test_concurrent_prices_keep_order_and_count_failures(self, monkeypatch):
+        """并发取价：结果顺序与输入一致，失败的卡片计入统计"""
+        import requests
+        from scrapers.price_scraper import PriceScraper
+        
+        def fake_fetch(card_number):
+            if card_number == 'OP01-002':
+                raise requests.ConnectionError('boom')
+            if card_number == 'OP01-003':
+                return []
+            return [{'card_number': card_number, 'market_price': 1.0}]
+        
+        scraper = PriceScraper(rate=0)
+        monkeypatch.setattr(scraper, '_fetch_card_price', fake_fetch)
+        
+        numbers = ['OP01-001', 'OP01-002', 'OP01-003', 'OP01-004']
+        results = scraper.get_prices_for_cards(numbers, workers=4)
+        
+        assert [r['card_number'] for r in results] == ['OP01-001', 'OP01-004']
+        assert scraper.last_stats.succeeded == 2
+        assert scraper.last_stats.empty == 1
+        assert scraper.last_stats.failed == ['OP01-002']
+    
+    def test_set_url(self):
+        """系列代码 -> 整套价格接口"""
+        from scrapers.price_scraper import PriceScraper
+        
+        scraper = PriceScraper()
+        assert scraper._set_url('OP-14') == 'https://optcgapi.com/api/sets/OP-14/'
+        assert scraper._set_url('OP14') == 'https://optcgapi.com/api/sets/OP-14/'
+        assert scraper._set_url('ST-01') == 'https://optcgapi.com/api/decks/ST-01/'
+        assert scraper._set_url('DON') is None
+    
+    def test_set_prices_with_per_card_fallback(self, monkeypatch):
+        """整套结果缺失的卡片逐张补充"""
+        from scrapers.price_scraper import PriceScraper
+        
+        scraper = PriceScraper(rate=0)
+        monkeypatch.setattr(scraper, '_fetch_set_prices', lambda code: [
+            {'card_number': 'OP14-001', 'market_price': 1.0},
+            {'card_number': 'OP14-099', 'market_price': 9.0},
+        ] if code == 'OP-14' else [])
+        fetched = []
+        
+        def fake_fetch(card_number):
+            fetched.append(card_number)
+            return [{'card_number': card_number, 'market_price': 2.0}]
+        
+        monkeypatch.setattr(scraper, '_fetch_card_price', fake_fetch)
+        
+        results = scraper.get_prices_for_sets({
+            'OP-14': ['OP14-001', 'OP14-002'],
+            'P': ['P-001'],
+        }, delay=0)
+        
+        assert sorted(fetched) == ['OP14-002', 'P-001']
+        assert sorted(r['card_number'] for r in results) == ['OP14-001', 'OP14-002', 'P-001']
+        assert scraper.last_stats.total == 3
+        assert scraper.last_stats.sets == 1
+        assert scraper.last_stats.set_hits == 1
+        assert scraper.last_stats.succeeded == 3
+    
+    def test_set_request_failure_recorded(self, monkeypatch):
+        """整套请求失败记入统计（与空系列区分），卡片逐张补充；每次调用重置统计"""
+        import requests
+        from scrapers.price_scraper import PriceScraper
+        
+        scraper = PriceScraper(rate=0)
+        
+        def fake_set(code):
+            if code == 'OP-01':
+                raise requests.HTTPError('503')
+            return []
+        
+        monkeypatch.setattr(scraper, '_fetch_set_prices', fake_set)
+        monkeypatch.setattr(scraper, '_fetch_card_price',
+                            lambda n: [{'card_number': n, 'market_price': 1.0}])
+        
+        results = scraper.get_prices_for_sets({'OP-01': ['OP01-001'], 'OP-02': ['OP02-001']}, delay=0)
+        
+        stats = scraper.last_stats
+        assert sorted(r['card_number'] for r in results) == ['OP01-001', 'OP02-001']
+        assert stats.set_failed == ['OP-01']
+        assert stats.sets == 1 and stats.set_hits == 0
+        assert stats.succeeded == 2 and stats.total == 2
+        assert '1 set requests failed' in stats.summary()
+        # 公开接口保持旧约定: 失败时返回空列表
+        assert scraper.get_set_prices('OP-01') == []
+        
+        monkeypatch.setattr(scraper, '_fetch_set_prices', lambda code: [
+            {'card_number': 'OP02-001', 'market_price': 1.0}])
+        scraper.get_prices_for_sets({'OP-02': ['OP02-001']}, delay=0)
+        assert scraper.last_stats.set_failed == []
+        assert scraper.last_stats.set_hits == 1 and scraper.last_stats.total == 1